@@ -4,6 +4,13 @@ import os
 
 from extensions import db, ma, migrate, limiter, cache, jwt
 from flask_swagger_ui import get_swaggerui_blueprint
+from utils.entity_cache import entity_cache
+from utils.metrics import request_metrics
+from utils.slow_query import slow_query_log
+from utils.profiling import profiler
+from utils.access_log import access_log
+from utils.passwords import password_hasher
+from utils.warmup import register_warmup_command
 
 
 SWAGGER_URL = '/api/docs'
@@ -35,6 +42,12 @@ def create_app(config_class=None):
     ma.init_app(app)
     migrate.init_app(app, db)
     cache.init_app(app)
+    entity_cache.init_app(app)
+    password_hasher.init_app(app)
+    request_metrics.init_app(app)
+    slow_query_log.init_app(app)
+    profiler.init_app(app)
+    access_log.init_app(app)
     limiter.init_app(app)
     jwt.init_app(app)
 
@@ -46,6 +59,7 @@ def create_app(config_class=None):
     from app.service_tickets import ticket_bp
     from app.assignments import assignment_bp
     from app.inventory import inventory_bp
+    from app.export import export_bp
 
     app.register_blueprint(user_bp, url_prefix="/users")
     app.register_blueprint(mechanic_bp, url_prefix="/mechanics")
@@ -54,7 +68,11 @@ def create_app(config_class=None):
     app.register_blueprint(ticket_bp, url_prefix="/tickets")
     app.register_blueprint(assignment_bp, url_prefix="/assignments")
     app.register_blueprint(inventory_bp, url_prefix="/inventory")
+    app.register_blueprint(export_bp, url_prefix="/export")
     app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 
+    # `flask warm-up`; servers warm up from gunicorn.conf.py, not on every create_app
+    register_warmup_command(app)
+
     # DO NOT create tables here — tests will handle it
     return app
@@ -1,20 +1,64 @@
 from flask import request, jsonify
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
 from marshmallow import ValidationError
-from extensions import db, limiter, cache
+from extensions import db, limiter
 from models import ServiceAssignment, ServiceTicket, Mechanic
-from .schemas import assignment_schema, assignments_schema
+from .schemas import (
+    ServiceAssignmentSchema, ASSIGNMENT_INCLUDES, ASSIGNMENT_DEFAULT_INCLUDES,
+    assignment_schema,
+)
 from . import assignment_bp
-from utils.decorators import auth_required   # unified decorator
+from utils.decorators import auth_required, query_budget   # unified decorator
+from utils.cache_tags import bump_tags, cached_view
+from utils.entity_cache import entity_cache
+from app.mechanics.leaderboard import adjust_ticket_counts
+from utils.includes import loader_options, parse_include, schema_for
+from utils.pagination import (
+    DEFAULT_LIMIT, MAX_LIMIT, is_cursor_request, keyset_page, offset_page, parse_int_arg,
+    set_next_page_headers,
+)
 
 @assignment_bp.route("", methods=["GET"])
-@cache.cached(timeout=45)
+@query_budget(2)
+@cached_view(timeout=300, tags=("assignments", "mechanics", "tickets", "inventory"))
 def get_assignments():
-    """GET /assignments - Cached list of all service assignments."""
-    query = select(ServiceAssignment)
-    assignments = db.session.execute(query).scalars().all()
-    return jsonify(assignments_schema.dump(assignments)), 200
+    """
+    GET /assignments - Cached list of service assignments.
+
+    Nests mechanic and ticket by default; ?include= picks the nested graph explicitly.
+    Mechanic and ticket are joined into the main query, so the number of queries
+    does not grow with the number of rows.
+
+    ?after=<cursor>&limit=<n> returns one keyset page as {"items", "next"};
+    ?page=<n>&per_page=<n> returns one OFFSET/LIMIT page as a plain list;
+    without either, the plain list stops at MAX_LIMIT rows, with X-Next-Cursor
+    and a Link rel="next" header when more rows follow.
+    """
+    try:
+        includes = parse_include(request.args, ASSIGNMENT_INCLUDES, ASSIGNMENT_DEFAULT_INCLUDES)
+        schema = schema_for(ServiceAssignmentSchema, includes, ASSIGNMENT_INCLUDES, many=True)
+        query = select(ServiceAssignment).options(*loader_options(ServiceAssignment, includes))
+
+        if is_cursor_request(request.args):
+            limit = parse_int_arg(request.args, "limit", DEFAULT_LIMIT, maximum=MAX_LIMIT)
+            assignments, next_cursor = keyset_page(
+                db.session, query, [ServiceAssignment.id],
+                after=request.args.get("after"), limit=limit
+            )
+            return jsonify({"items": schema.dump(assignments), "next": next_cursor}), 200
+
+        if "page" in request.args or "per_page" in request.args:
+            page = parse_int_arg(request.args, "page", 1)
+            per_page = parse_int_arg(request.args, "per_page", 10, maximum=MAX_LIMIT)
+            assignments = offset_page(db.session, query, ServiceAssignment.id, page, per_page)
+            return jsonify(schema.dump(assignments)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    assignments, next_cursor = keyset_page(db.session, query, [ServiceAssignment.id], limit=MAX_LIMIT)
+    return set_next_page_headers(jsonify(schema.dump(assignments)), next_cursor), 200
 
 @assignment_bp.route("", methods=["POST"])
 @auth_required("admin", "mechanic")   # restrict creation
@@ -26,6 +70,8 @@ def create_assignment(user_id, role):
     except ValidationError as e:
         return jsonify(e.messages), 400
 
+    # Validate against the database, not the per-process entity cache: a row deleted
+    # by another worker must not pass as existing
     ticket_exists = db.session.get(ServiceTicket, assignment_data.service_ticket_id)
     mechanic_exists = db.session.get(Mechanic, assignment_data.mechanic_id)
 
@@ -44,22 +90,44 @@ def create_assignment(user_id, role):
 
     db.session.add(assignment_data)
     try:
+        adjust_ticket_counts({assignment_data.mechanic_id: 1})
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
         return jsonify({"error": "Database error during assignment creation"}), 500
 
+    bump_tags("assignments", "mechanics")
     return jsonify({
         "message": f"Assignment created by {role} (user {user_id})",
         "assignment": assignment_schema.dump(assignment_data)
     }), 201
 
 @assignment_bp.route("/<int:assignment_id>", methods=["GET"])
+@query_budget(3)
 def get_assignment(assignment_id):
     """GET /assignments/<assignment_id> - Get a single service assignment."""
-    assignment = db.session.get(ServiceAssignment, assignment_id)
+    try:
+        includes = parse_include(request.args, ASSIGNMENT_INCLUDES, ASSIGNMENT_DEFAULT_INCLUDES)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if "ticket.parts" in includes:
+        assignment = db.session.get(
+            ServiceAssignment, assignment_id, options=loader_options(ServiceAssignment, includes)
+        )
+    else:
+        # Many-to-one includes are primary-key lookups too, so serve them from
+        # the entity cache and attach them as already-loaded relationships
+        assignment = entity_cache.get(ServiceAssignment, assignment_id)
+        if assignment and "mechanic" in includes:
+            set_committed_value(assignment, "mechanic",
+                                entity_cache.get(Mechanic, assignment.mechanic_id))
+        if assignment and "ticket" in includes:
+            set_committed_value(assignment, "ticket",
+                                entity_cache.get(ServiceTicket, assignment.service_ticket_id))
     if assignment:
-        return jsonify(assignment_schema.dump(assignment)), 200
+        schema = schema_for(ServiceAssignmentSchema, includes, ASSIGNMENT_INCLUDES)
+        return jsonify(schema.dump(assignment)), 200
     return jsonify({"error": "Service assignment not found."}), 404
 
 @assignment_bp.route("/<int:assignment_id>", methods=["PUT", "PATCH"])
@@ -70,6 +138,8 @@ def update_assignment(user_id, role, assignment_id):
     if not assignment:
         return jsonify({"error": "Service assignment not found."}), 404
 
+    original_mechanic_id = assignment.mechanic_id
+
     try:
         updated_assignment = assignment_schema.load(
             request.json,
@@ -100,11 +170,14 @@ def update_assignment(user_id, role, assignment_id):
         return jsonify({"error": "This combination of ticket and mechanic is already assigned."}), 409
 
     try:
+        if check_mechanic_id != original_mechanic_id:
+            adjust_ticket_counts({original_mechanic_id: -1, check_mechanic_id: 1})
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
         return jsonify({"error": "Database error during update"}), 500
 
+    bump_tags("assignments", "mechanics")
     return jsonify({
         "message": f"Assignment updated by {role} (user {user_id})",
         "assignment": assignment_schema.dump(updated_assignment)
@@ -120,9 +193,11 @@ def delete_assignment(user_id, role, assignment_id):
 
     db.session.delete(assignment)
     try:
+        adjust_ticket_counts({assignment.mechanic_id: -1})
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
         return jsonify({"error": "Database error during deletion"}), 500
 
+    bump_tags("assignments", "mechanics")
     return jsonify({"message": f"Service assignment {assignment_id} deleted by admin (user {user_id})"}), 200
\ No newline at end of file
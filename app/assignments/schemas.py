@@ -3,6 +3,10 @@ from models import ServiceAssignment
 from app.mechanics.schemas import MechanicSchema
 from app.service_tickets.schemas import ServiceTicketSchema
 
+# Relationship paths callers may request with ?include=
+ASSIGNMENT_INCLUDES = ("mechanic", "ticket", "ticket.parts")
+ASSIGNMENT_DEFAULT_INCLUDES = ("mechanic", "ticket")
+
 class ServiceAssignmentSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = ServiceAssignment
@@ -10,7 +14,7 @@ class ServiceAssignmentSchema(ma.SQLAlchemyAutoSchema):
         include_fk = True
 
     mechanic = ma.Nested(MechanicSchema)
-    ticket = ma.Nested(ServiceTicketSchema)
+    ticket = ma.Nested(ServiceTicketSchema, exclude=("line_items", "assignments"))
 
-assignment_schema = ServiceAssignmentSchema()
-assignments_schema = ServiceAssignmentSchema(many=True)
\ No newline at end of file
+assignment_schema = ServiceAssignmentSchema(exclude=("ticket.parts",))
+assignments_schema = ServiceAssignmentSchema(many=True, exclude=("ticket.parts",))
@@ -4,9 +4,17 @@ from sqlalchemy.exc import IntegrityError
 from marshmallow import ValidationError
 from extensions import db, limiter
 from models import Customer, ServiceTicket, Vehicle
-from .schemas import customer_schema, customers_schema
+from .schemas import customer_schema, customer_bulk_schema, customer_row_serializer
 from . import customer_bp
-from utils.decorators import auth_required, token_required   # unified + token decorator
+from utils.decorators import auth_required, token_required, query_budget   # unified + token decorator
+from utils.entity_cache import entity_cache
+from utils.cache_tags import bump_tags
+from app.mechanics.leaderboard import release_assignments
+from utils.bulk import BulkPayloadError, bulk_import, parse_bulk_rows, unique_check
+from utils.pagination import (
+    DEFAULT_LIMIT, MAX_LIMIT, PaginationError,
+    is_cursor_request, keyset_page, offset_page, parse_int_arg,
+)
 
 # Helper function to check for email conflict
 def _check_email_conflict(email, customer_id=None):
@@ -17,6 +25,7 @@ def _check_email_conflict(email, customer_id=None):
     return False
 
 @customer_bp.route("/my-tickets", methods=["GET"])
+@query_budget(1)
 @token_required
 def my_tickets(customer_id):
     """GET /my-tickets - Return tickets for the authenticated customer."""
@@ -35,19 +44,31 @@ def my_tickets(customer_id):
     } for t in tickets]), 200
 
 @customer_bp.route("", methods=["GET"])
+@query_budget(1)
 def get_customers():
-    """GET /customers - Paginated list of customers."""
-    page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("per_page", 10))
+    """
+    GET /customers - Paginated list of customers.
 
-    query = select(Customer)
-    customers = db.session.execute(query).scalars().all()
-
-    start = (page - 1) * per_page
-    end = start + per_page
-    paginated = customers[start:end]
-
-    return jsonify(customers_schema.dump(paginated)), 200
+    ?after=<cursor>&limit=<n> uses keyset pagination and returns {"items", "next"};
+    ?page=<n>&per_page=<n> keeps the original plain-list response.
+    """
+    try:
+        if is_cursor_request(request.args):
+            limit = parse_int_arg(request.args, "limit", DEFAULT_LIMIT, maximum=MAX_LIMIT)
+            rows, next_cursor = keyset_page(
+                db.session, customer_row_serializer.select(), [Customer.id],
+                after=request.args.get("after"), limit=limit, scalars=False
+            )
+            return customer_row_serializer.response(rows, {"next": next_cursor}), 200
+
+        page = parse_int_arg(request.args, "page", 1)
+        per_page = parse_int_arg(request.args, "per_page", 10, maximum=MAX_LIMIT)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = offset_page(db.session, customer_row_serializer.select(), Customer.id, page, per_page,
+                       scalars=False)
+    return customer_row_serializer.response(rows), 200
 
 @customer_bp.route("", methods=["POST"])
 @auth_required("admin", "mechanic")   # admins and mechanics allowed
@@ -69,15 +90,34 @@ def create_customer(user_id, role):
         db.session.rollback()
         return jsonify({"error": "Database error during customer creation."}), 500
 
+    bump_tags("customers")
     return jsonify({
         "message": f"Customer created by {role} (user {user_id})",
         "customer": customer_schema.dump(new_customer)
     }), 201
 
+@customer_bp.route("/bulk", methods=["POST"])
+@auth_required("admin")
+@limiter.limit("20 per hour")
+def bulk_create_customers(user_id, role):
+    """POST /customers/bulk - Import customers from a JSON array or CSV (admin only)."""
+    try:
+        rows = parse_bulk_rows(request)
+    except BulkPayloadError as e:
+        return jsonify({"error": str(e)}), 400
+
+    report = bulk_import(Customer, customer_bulk_schema, rows, checks=[
+        unique_check(Customer.email, "email", "Email already associated with an account"),
+    ])
+    if report["inserted"]:
+        bump_tags("customers")
+    return jsonify(report), (201 if not report["failed"] else 207)
+
 @customer_bp.route("/<int:customer_id>", methods=["GET"])
+@query_budget(1)
 def get_customer(customer_id):
     """GET /customers/<customer_id> - Get a single customer."""
-    customer = db.session.get(Customer, customer_id)
+    customer = entity_cache.get(Customer, customer_id)
     if customer:
         return jsonify(customer_schema.dump(customer)), 200
     return jsonify({"error": "Customer not found."}), 404
@@ -111,6 +151,7 @@ def update_customer(user_id, role, customer_id):
         db.session.rollback()
         return jsonify({"error": "Database integrity error during update."}), 500
 
+    bump_tags("customers")
     return jsonify({
         "message": f"Customer updated by {role} (user {user_id})",
         "customer": customer_schema.dump(updated_customer)
@@ -124,6 +165,7 @@ def delete_customer(user_id, role, customer_id):
     if not customer:
         return jsonify({"error": "Customer not found."}), 404
 
+    release_assignments(Vehicle.customer_id == customer_id)
     db.session.delete(customer)
     try:
         db.session.commit()
@@ -131,4 +173,5 @@ def delete_customer(user_id, role, customer_id):
         db.session.rollback()
         return jsonify({"error": "Cannot delete customer due to existing associated records."}), 409
 
+    bump_tags("customers", "vehicles", "tickets", "assignments", "mechanics")
     return jsonify({"message": f"Customer {customer_id} deleted by admin (user {user_id})"}), 200
\ No newline at end of file
@@ -1,5 +1,6 @@
 # app/customers/schemas.py
 from extensions import ma
+from utils.serializers import RowSerializer
 from models import Customer
 
 class CustomerSchema(ma.SQLAlchemyAutoSchema):
@@ -10,3 +11,5 @@ class CustomerSchema(ma.SQLAlchemyAutoSchema):
 
 customer_schema = CustomerSchema()
 customers_schema = CustomerSchema(many=True)
+customer_row_serializer = RowSerializer(customers_schema)  # list endpoints: Core rows, no per-object dump
+customer_bulk_schema = CustomerSchema(load_instance=False)  # plain dicts for executemany
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+export_bp = Blueprint("export", __name__)
+
+from . import routes  # import routes after blueprint is defined
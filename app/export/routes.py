@@ -0,0 +1,61 @@
+from flask import Response, current_app, jsonify, stream_with_context
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, raiseload
+
+from extensions import db
+from models import Customer, ServiceAssignment, ServiceTicket, Vehicle
+from app.assignments.schemas import assignment_schema
+from app.customers.schemas import customer_schema
+from app.service_tickets.schemas import ticket_schema
+from app.vehicles.schemas import vehicle_schema
+from . import export_bp
+from utils.decorators import auth_required
+
+# Rows fetched per server-side cursor round trip
+EXPORT_BATCH_SIZE = 1000
+
+# entity -> (statement factory, single-object schema)
+EXPORTS = {
+    "customers": (
+        lambda: select(Customer).options(raiseload("*")).order_by(Customer.id),
+        customer_schema,
+    ),
+    "vehicles": (
+        lambda: select(Vehicle).options(raiseload("*")).order_by(Vehicle.id),
+        vehicle_schema,
+    ),
+    "tickets": (
+        lambda: select(ServiceTicket).options(raiseload("*")).order_by(ServiceTicket.id),
+        ticket_schema,
+    ),
+    "assignments": (
+        lambda: select(ServiceAssignment).options(
+            joinedload(ServiceAssignment.mechanic).raiseload("*"),
+            joinedload(ServiceAssignment.ticket).raiseload("*"),
+        ).order_by(ServiceAssignment.id),
+        assignment_schema,
+    ),
+}
+
+
+def _ndjson_lines(statement, schema):
+    """Yield one NDJSON chunk per fetched batch, never holding more than a batch."""
+    dumps = current_app.json.dumps
+    result = db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for batch in result.scalars().partitions():
+        yield "".join(dumps(schema.dump(obj)) + "\n" for obj in batch)
+
+
+@export_bp.route("/<entity>.ndjson", methods=["GET"])
+@auth_required("admin")
+def export_entity(user_id, role, entity):
+    """GET /export/<entity>.ndjson - Stream every row of an entity as NDJSON (admin only)."""
+    if entity not in EXPORTS:
+        return jsonify({"error": f"Unknown export '{entity}'."}), 404
+
+    make_statement, schema = EXPORTS[entity]
+    return Response(
+        stream_with_context(_ndjson_lines(make_statement(), schema)),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={entity}.ndjson"},
+    )
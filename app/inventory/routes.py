@@ -1,17 +1,33 @@
 from flask import request, jsonify
 from sqlalchemy.exc import IntegrityError
-from extensions import db
+from extensions import db, limiter
 from models import Inventory
 from . import inventory_bp
-from .schemas import inventory_schema, inventories_schema
-from utils.decorators import auth_required
+from .schemas import (
+    InventorySchema, INVENTORY_INCLUDES, inventory_schema, inventory_bulk_schema, inventory_row_serializer,
+)
+from utils.decorators import auth_required, query_budget
+from utils.cache_tags import bump_tags
+from utils.bulk import BulkPayloadError, bulk_import, parse_bulk_rows
+from utils.includes import loader_options, parse_include, schema_for
 
 # READ all inventory items
 @inventory_bp.route("", methods=["GET"])
+@query_budget(2)
 @auth_required("admin", "mechanic")
 def get_inventory(user_id, role):
-    items = db.session.query(Inventory).all()
-    return jsonify(inventories_schema.dump(items)), 200
+    try:
+        includes = parse_include(request.args, INVENTORY_INCLUDES)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not includes:
+        rows = db.session.execute(inventory_row_serializer.select()).all()
+        return inventory_row_serializer.response(rows), 200
+
+    items = db.session.query(Inventory).options(*loader_options(Inventory, includes)).all()
+    schema = schema_for(InventorySchema, includes, INVENTORY_INCLUDES, many=True)
+    return jsonify(schema.dump(items)), 200
 
 # CREATE new inventory item
 @inventory_bp.route("", methods=["POST"])
@@ -29,8 +45,24 @@ def add_inventory(user_id, role):
         db.session.rollback()
         return jsonify({"error": "Database error during inventory creation"}), 500
 
+    bump_tags("inventory")
     return jsonify(inventory_schema.dump(item)), 201
 
+# BULK CREATE inventory items (JSON array or CSV)
+@inventory_bp.route("/bulk", methods=["POST"])
+@auth_required("admin")
+@limiter.limit("20 per hour")
+def bulk_add_inventory(user_id, role):
+    try:
+        rows = parse_bulk_rows(request)
+    except BulkPayloadError as e:
+        return jsonify({"error": str(e)}), 400
+
+    report = bulk_import(Inventory, inventory_bulk_schema, rows)
+    if report["inserted"]:
+        bump_tags("inventory")
+    return jsonify(report), (201 if not report["failed"] else 207)
+
 # UPDATE existing inventory item
 @inventory_bp.route("/<int:item_id>", methods=["PUT"])
 @auth_required("admin")
@@ -50,6 +82,7 @@ def update_inventory(user_id, role, item_id):
         db.session.rollback()
         return jsonify({"error": "Database error during update"}), 500
 
+    bump_tags("inventory")
     return jsonify(inventory_schema.dump(updated_item)), 200
 
 # DELETE inventory item
@@ -67,4 +100,5 @@ def delete_inventory(user_id, role, item_id):
         db.session.rollback()
         return jsonify({"error": "Database error during deletion"}), 500
 
+    bump_tags("inventory", "tickets")
     return jsonify({"message": f"Inventory item {item_id} deleted"}), 200
\ No newline at end of file
@@ -1,13 +1,21 @@
 # app/inventory/schemas.py
 from extensions import ma
+from utils.serializers import RowSerializer
 from models import Inventory
 
+# Relationship paths callers may request with ?include=
+INVENTORY_INCLUDES = ("tickets",)
+
 class InventorySchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Inventory
         load_instance = True
         include_fk = True
-        exclude = ("tickets",)  # avoid nesting service tickets unless explicitly needed
 
-inventory_schema = InventorySchema()
-inventories_schema = InventorySchema(many=True)
+    # Only dumped when requested via ?include= (see utils/includes.py)
+    tickets = ma.Nested("ServiceTicketSchema", many=True, exclude=("line_items", "parts", "assignments"), dump_only=True)
+
+inventory_schema = InventorySchema(exclude=("tickets",))
+inventories_schema = InventorySchema(many=True, exclude=("tickets",))
+inventory_row_serializer = RowSerializer(inventories_schema)  # list endpoints: Core rows, no per-object dump
+inventory_bulk_schema = InventorySchema(load_instance=False, exclude=("tickets",))  # plain dicts for executemany
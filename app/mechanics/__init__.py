@@ -5,3 +5,6 @@ mechanic_bp = Blueprint("mechanics", __name__)
 
 # Import routes after blueprint is defined
 from . import routes
+
+# Import leaderboard helpers so the rebuild-rankings CLI command is registered
+from . import leaderboard
@@ -0,0 +1,74 @@
+# app/mechanics/leaderboard.py
+"""
+Maintained per-mechanic ticket counters backing GET /mechanics/ranked.
+
+Routes that create or delete service assignments call these helpers before
+committing, so the counter changes land in the same transaction as the
+assignment rows themselves.
+"""
+import click
+from sqlalchemy import select, update, func
+
+from extensions import db
+from utils.cache_tags import bump_tags
+from models import Mechanic, ServiceAssignment, ServiceTicket, Vehicle
+from . import mechanic_bp
+
+
+def adjust_ticket_counts(deltas):
+    """
+    Apply {mechanic_id: delta} to Mechanic.ticket_count in the current transaction.
+
+    Issues one UPDATE ... WHERE id IN (...) per distinct delta value, so a bulk
+    edit of many mechanics by +1/-1 costs at most two statements.
+    """
+    by_delta = {}
+    for mechanic_id, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(mechanic_id)
+
+    for delta, mechanic_ids in by_delta.items():
+        db.session.execute(
+            update(Mechanic)
+            .where(Mechanic.id.in_(mechanic_ids))
+            .values(ticket_count=Mechanic.ticket_count + delta)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def release_assignments(*criteria):
+    """
+    Decrement counters for every assignment matching `criteria` (expressed on
+    ServiceAssignment, ServiceTicket or Vehicle). Call before the cascading delete.
+    """
+    rows = db.session.execute(
+        select(ServiceAssignment.mechanic_id, func.count(ServiceAssignment.id))
+        .join(ServiceTicket, ServiceTicket.id == ServiceAssignment.service_ticket_id)
+        .join(Vehicle, Vehicle.id == ServiceTicket.vehicle_id)
+        .where(*criteria)
+        .group_by(ServiceAssignment.mechanic_id)
+    ).all()
+    adjust_ticket_counts({mechanic_id: -count for mechanic_id, count in rows})
+
+
+def rebuild_ticket_counts():
+    """Recompute every counter from service_assignment (reconciles any drift)."""
+    counts = (
+        select(func.count(ServiceAssignment.id))
+        .where(ServiceAssignment.mechanic_id == Mechanic.id)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(Mechanic)
+        .values(ticket_count=counts)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    bump_tags("mechanics")
+
+
+@mechanic_bp.cli.command("rebuild-rankings")
+def rebuild_rankings_command():
+    """Recompute mechanic ticket counters from scratch."""
+    rebuild_ticket_counts()
+    click.echo("Mechanic ticket counters rebuilt.")
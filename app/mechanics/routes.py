@@ -1,40 +1,71 @@
+import datetime
+
 from flask import request, jsonify
 from sqlalchemy import select, func
 from sqlalchemy.exc import IntegrityError
 from marshmallow import ValidationError
-from extensions import db, limiter, cache
-from models import Mechanic, ServiceAssignment
-from .schemas import mechanic_schema, mechanics_schema, mechanic_update_schema
+from extensions import db, limiter
+from models import Mechanic, ServiceAssignment, ServiceTicket
+from .schemas import mechanic_schema, mechanic_update_schema, mechanic_row_serializer
 from . import mechanic_bp
-from utils.decorators import auth_required   # unified decorator
+from utils.decorators import auth_required, query_budget   # unified decorator
+from utils.entity_cache import entity_cache
+from utils.cache_tags import bump_tags, cached_view
+from utils.pagination import MAX_LIMIT, parse_int_arg
 
 
 # GET ranked mechanics
 @mechanic_bp.route("/ranked", methods=["GET"])
+@query_budget(1)
 def ranked_mechanics():
-    """GET /mechanics/ranked - List mechanics ordered by ticket count."""
-    query = (
-        db.session.query(Mechanic, func.count(ServiceAssignment.id).label("ticket_count"))
-        .join(ServiceAssignment, Mechanic.id == ServiceAssignment.mechanic_id)
-        .group_by(Mechanic.id)
-        .order_by(func.count(ServiceAssignment.id).desc())
-    )
-    results = query.all()
+    """
+    GET /mechanics/ranked - List mechanics ordered by ticket count.
+
+    Reads the maintained Mechanic.ticket_count counter (indexed ORDER BY).
+    ?days=<n> ranks by assignments on tickets dated in the last n days instead;
+    ?limit=<n> returns only the top n.
+    """
+    try:
+        limit = parse_int_arg(request.args, "limit", None, maximum=MAX_LIMIT)
+        days = parse_int_arg(request.args, "days", None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if days is None:
+        query = (
+            select(Mechanic.id, Mechanic.name, Mechanic.ticket_count)
+            .where(Mechanic.ticket_count > 0)
+            .order_by(Mechanic.ticket_count.desc(), Mechanic.id)
+        )
+    else:
+        cutoff = datetime.date.today() - datetime.timedelta(days=days)
+        ticket_count = func.count(ServiceAssignment.id)
+        query = (
+            select(Mechanic.id, Mechanic.name, ticket_count)
+            .join(ServiceAssignment, Mechanic.id == ServiceAssignment.mechanic_id)
+            .join(ServiceTicket, ServiceTicket.id == ServiceAssignment.service_ticket_id)
+            .where(ServiceTicket.date >= cutoff)
+            .group_by(Mechanic.id, Mechanic.name)
+            .order_by(ticket_count.desc(), Mechanic.id)
+        )
+
+    if limit is not None:
+        query = query.limit(limit)
 
     return jsonify([
-        {"id": mech.id, "name": mech.name, "ticket_count": count}
-        for mech, count in results
+        {"id": mechanic_id, "name": name, "ticket_count": count}
+        for mechanic_id, name, count in db.session.execute(query)
     ]), 200
 
 
 # GET all mechanics
 @mechanic_bp.route("", methods=["GET"])
-@cache.cached(timeout=60)
+@query_budget(1)
+@cached_view(timeout=600, tags=("mechanics",), stale_ttl=60, early_refresh=1.0)
 def get_mechanics():
     """GET /mechanics - Get all mechanics."""
-    query = select(Mechanic)
-    mechanics = db.session.execute(query).scalars().all()
-    return jsonify(mechanics_schema.dump(mechanics)), 200
+    rows = db.session.execute(mechanic_row_serializer.select()).all()
+    return mechanic_row_serializer.response(rows), 200
 
 
 # CREATE mechanic (admin only)
@@ -60,6 +91,7 @@ def create_mechanic(user_id, role):
         db.session.rollback()
         return jsonify({"error": "Database error during mechanic creation"}), 500
 
+    bump_tags("mechanics")
     return jsonify({
         "message": f"Mechanic created by admin (user {user_id})",
         "mechanic": mechanic_schema.dump(mechanic_data)
@@ -68,9 +100,10 @@ def create_mechanic(user_id, role):
 
 # GET single mechanic
 @mechanic_bp.route("/<int:mechanic_id>", methods=["GET"])
+@query_budget(1)
 def get_mechanic(mechanic_id):
     """GET /mechanics/<mechanic_id> - Get a single mechanic."""
-    mechanic = db.session.get(Mechanic, mechanic_id)
+    mechanic = entity_cache.get(Mechanic, mechanic_id)
     if mechanic:
         return jsonify(mechanic_schema.dump(mechanic)), 200
     return jsonify({"error": "Mechanic not found."}), 404
@@ -106,6 +139,7 @@ def update_mechanic(user_id, role, mechanic_id):
         db.session.rollback()
         return jsonify({"error": "Database error during update"}), 500
 
+    bump_tags("mechanics")
     return jsonify({
         "message": f"Mechanic updated by admin (user {user_id})",
         "mechanic": mechanic_schema.dump(mechanic)
@@ -128,4 +162,5 @@ def delete_mechanic(user_id, role, mechanic_id):
         db.session.rollback()
         return jsonify({"error": "Database error during deletion"}), 500
 
+    bump_tags("mechanics", "assignments")
     return jsonify({"message": f"Mechanic {mechanic_id} deleted by admin (user {user_id})"}), 200
\ No newline at end of file
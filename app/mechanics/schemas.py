@@ -1,5 +1,6 @@
 # app/mechanics/schemas.py
 from extensions import ma
+from utils.serializers import RowSerializer
 from models import Mechanic
 from marshmallow import fields
 
@@ -10,8 +11,11 @@ class MechanicSchema(ma.SQLAlchemyAutoSchema):
         include_fk = True
         exclude = ("assignments",)  # avoid nesting service assignments unless needed
 
+    ticket_count = ma.auto_field(dump_only=True)  # maintained by the leaderboard, never client-set
+
 mechanic_schema = MechanicSchema()
 mechanics_schema = MechanicSchema(many=True)
+mechanic_row_serializer = RowSerializer(mechanics_schema)  # list endpoints: Core rows, no per-object dump
 
 
 # Proper partial update schema
@@ -1,55 +1,205 @@
+import datetime
+
 from flask import request, jsonify
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from marshmallow import ValidationError
 
-from extensions import db, limiter, cache
-from models import ServiceTicket, Mechanic, ServiceAssignment, Inventory
-from .schemas import ticket_schema, tickets_schema
+from extensions import db, limiter
+from models import ServiceTicket, Mechanic, ServiceAssignment, Inventory, TicketPart
+from .schemas import (
+    ServiceTicketSchema, TICKET_INCLUDES, ticket_schema, line_item_schema, ticket_row_serializer,
+)
 from . import ticket_bp
-from utils.decorators import auth_required
+from utils.decorators import auth_required, query_budget
+from utils.cache_tags import bump_tags, cached_view, normalized_query_string, tag_versions
+from utils.conditional import make_etag, not_modified, set_validators
+from utils.includes import loader_options, parse_include, schema_for
+from app.mechanics.leaderboard import adjust_ticket_counts, release_assignments
+from utils.pagination import (
+    DEFAULT_LIMIT, MAX_LIMIT, is_cursor_request, keyset_page, parse_int_arg, set_next_page_headers,
+)
 
 # ADD PART TO TICKET
 @ticket_bp.route("/<int:ticket_id>/add_part", methods=["POST"])
 @auth_required("admin", "mechanic")
 def add_part_to_ticket(user_id, role, ticket_id):
+    """
+    POST /tickets/<id>/add_part - Add `quantity` of a part to the ticket's line items.
+
+    Stock is taken with a single conditional UPDATE (quantity >= :n), so concurrent
+    requests for the same part can never oversell it.
+    """
     data = request.json or {}
 
     # FIRST: validate required fields (test expects 400 here)
     if "part_id" not in data or "quantity" not in data:
         return jsonify({"error": "Missing required fields"}), 400
 
-    part_id = data["part_id"]
-    quantity = data["quantity"]
+    try:
+        part_id = int(data["part_id"])
+        quantity = int(data["quantity"])
+    except (TypeError, ValueError):
+        return jsonify({"error": "part_id and quantity must be integers"}), 400
+    if quantity < 1:
+        return jsonify({"error": "quantity must be at least 1"}), 400
 
     # THEN: check if ticket exists
     ticket = db.session.get(ServiceTicket, ticket_id)
     if not ticket:
         return jsonify({"error": "Service Ticket not found"}), 404
 
-    # Check part exists
-    part = db.session.get(Inventory, part_id)
-    if not part:
-        return jsonify({"error": "Inventory part not found"}), 404
+    try:
+        # Take stock atomically; no rows matched means missing part or not enough stock
+        taken = db.session.execute(
+            update(Inventory)
+            .where(Inventory.id == part_id, Inventory.quantity >= quantity)
+            .values(quantity=Inventory.quantity - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if taken.rowcount == 0:
+            db.session.rollback()
+            if not db.session.get(Inventory, part_id):
+                return jsonify({"error": "Inventory part not found"}), 404
+            return jsonify({"error": f"Insufficient stock for part {part_id}"}), 409
 
-    # Add part to ticket
-    ticket.parts.append(part)
+        part = db.session.execute(
+            select(Inventory.price, Inventory.quantity).where(Inventory.id == part_id)
+        ).one()
+
+        # Grow an existing line item, otherwise create it with a price snapshot
+        grown = db.session.execute(
+            update(TicketPart)
+            .where(TicketPart.ticket_id == ticket_id, TicketPart.part_id == part_id)
+            .values(quantity=TicketPart.quantity + quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if grown.rowcount == 0:
+            db.session.execute(insert(TicketPart).values(
+                ticket_id=ticket_id, part_id=part_id, quantity=quantity, unit_price=part.price
+            ))
 
-    try:
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
         return jsonify({"error": "Database error adding part"}), 500
 
-    return jsonify({"message": f"Part {part_id} added to ticket {ticket_id}"}), 200
+    bump_tags("tickets", "inventory")
+    line_item = db.session.get(TicketPart, (ticket_id, part_id), populate_existing=True)
+    return jsonify({
+        "message": f"Part {part_id} added to ticket {ticket_id}",
+        "line_item": line_item_schema.dump(line_item),
+        "remaining_stock": part.quantity
+    }), 200
+
+# Sort orders accepted by GET /tickets -> (keyset columns, descending)
+TICKET_SORTS = {
+    "id": ([ServiceTicket.id], False),
+    "-id": ([ServiceTicket.id], True),
+    "date": ([ServiceTicket.date, ServiceTicket.id], False),
+    "-date": ([ServiceTicket.date, ServiceTicket.id], True),
+}
+
+
+def _parse_date_arg(args, name):
+    raw = args.get(name)
+    if not raw:
+        return None
+    try:
+        return datetime.date.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an ISO date (YYYY-MM-DD)")
+
+
+def _filtered_tickets_query(args, query=None):
+    """Translate GET /tickets filter params into WHERE clauses evaluated in SQL."""
+    if query is None:
+        query = select(ServiceTicket)
+
+    statuses = [s for raw in args.getlist("status") for s in raw.split(",") if s]
+    if statuses:
+        query = query.where(ServiceTicket.status.in_(statuses))
+
+    vehicle_id = args.get("vehicle_id")
+    if vehicle_id:
+        try:
+            query = query.where(ServiceTicket.vehicle_id == int(vehicle_id))
+        except ValueError:
+            raise ValueError("'vehicle_id' must be an integer")
+
+    date_from = _parse_date_arg(args, "date_from")
+    if date_from:
+        query = query.where(ServiceTicket.date >= date_from)
+
+    date_to = _parse_date_arg(args, "date_to")
+    if date_to:
+        query = query.where(ServiceTicket.date <= date_to)
+
+    return query
+
+
+def _ticket_tags():
+    """Cache tags for ticket reads: tickets, plus whatever ?include= nests."""
+    include = request.args.get("include", "")
+    tags = ["tickets"]
+    if "parts" in include or "line_items" in include:
+        tags.append("inventory")
+    if "assignments" in include:
+        tags.extend(["assignments", "mechanics"])
+    return tags
+
 
 # GET ALL TICKETS
 @ticket_bp.route("", methods=["GET"])
-@cache.cached(timeout=30)
+@query_budget(4)
+@cached_view(timeout=600, tags=_ticket_tags, stale_ttl=60, early_refresh=1.0)
 def get_tickets():
-    query = select(ServiceTicket)
-    tickets = db.session.execute(query).scalars().all()
-    return jsonify(tickets_schema.dump(tickets)), 200
+    """
+    GET /tickets - Service tickets filtered by ?status=, ?vehicle_id=,
+    ?date_from=, ?date_to= and ordered by ?sort= (id, -id, date, -date).
+
+    ?after=<cursor>&limit=<n> returns one keyset page as {"items", "next"};
+    without it the plain list stops at MAX_LIMIT rows, with X-Next-Cursor and
+    a Link rel="next" header when more rows follow.
+    ?include=parts,assignments.mechanic loads and nests those relationships.
+    """
+    sort = request.args.get("sort", "id")
+    if sort not in TICKET_SORTS:
+        return jsonify({"error": f"'sort' must be one of {', '.join(TICKET_SORTS)}"}), 400
+    columns, descending = TICKET_SORTS[sort]
+
+    try:
+        includes = parse_include(request.args, TICKET_INCLUDES)
+        # Without nesting, dump plain column rows instead of hydrating ORM objects
+        if includes:
+            base = select(ServiceTicket).options(*loader_options(ServiceTicket, includes))
+        else:
+            base = ticket_row_serializer.select()
+        query = _filtered_tickets_query(request.args, base)
+
+        if is_cursor_request(request.args):
+            limit = parse_int_arg(request.args, "limit", DEFAULT_LIMIT, maximum=MAX_LIMIT)
+            tickets, next_cursor = keyset_page(
+                db.session, query, columns,
+                after=request.args.get("after"), limit=limit, descending=descending,
+                scalars=bool(includes)
+            )
+            return _tickets_response(tickets, includes, {"next": next_cursor}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    tickets, next_cursor = keyset_page(
+        db.session, query, columns, limit=MAX_LIMIT, descending=descending, scalars=bool(includes)
+    )
+    return set_next_page_headers(_tickets_response(tickets, includes), next_cursor), 200
+
+
+def _tickets_response(tickets, includes, envelope=None):
+    if not includes:
+        return ticket_row_serializer.response(tickets, envelope)
+    data = schema_for(ServiceTicketSchema, includes, TICKET_INCLUDES, many=True).dump(tickets)
+    return jsonify(data if envelope is None else dict(envelope, items=data))
 
 # CREATE TICKET-
 @ticket_bp.route("", methods=["POST"])
@@ -69,6 +219,7 @@ def create_ticket(user_id, role):
         db.session.rollback()
         return jsonify({"error": "Database error during ticket creation"}), 500
 
+    bump_tags("tickets")
     return jsonify({
         "message": f"Ticket created by {role} (user {user_id})",
         "ticket": ticket_schema.dump(ticket_data)
@@ -76,11 +227,41 @@ def create_ticket(user_id, role):
 
 # GET SINGLE TICKET
 @ticket_bp.route("/<int:ticket_id>", methods=["GET"])
+@query_budget(4)
 def get_ticket(ticket_id):
-    ticket = db.session.get(ServiceTicket, ticket_id)
-    if ticket:
-        return jsonify(ticket_schema.dump(ticket)), 200
-    return jsonify({"error": "Service ticket not found."}), 404
+    """
+    GET /tickets/<id> - A single ticket; ?include= nests its relationships.
+
+    The ETag is built from the row's version_id (plus the cache tag versions of
+    the nested entities when ?include= is used). The row is always read from the
+    database, so the ETag and the body come from the same, current row.
+    """
+    try:
+        includes = parse_include(request.args, TICKET_INCLUDES)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    ticket = db.session.get(
+        ServiceTicket, ticket_id,
+        options=loader_options(ServiceTicket, includes), populate_existing=True
+    )
+    if not ticket:
+        return jsonify({"error": "Service ticket not found."}), 404
+
+    etag = None
+    related = tag_versions(tuple(_ticket_tags())) if includes else {}
+    if all(v is not None for v in related.values()):
+        etag = make_etag(request.path, normalized_query_string(), ticket.version_id,
+                         sorted(related.items()))
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+
+    schema = schema_for(ServiceTicketSchema, includes, TICKET_INCLUDES)
+    response = jsonify(schema.dump(ticket))
+    if etag is not None:
+        set_validators(response, etag)
+    return response, 200
 
 # UPDATE TICKET
 @ticket_bp.route("/<int:ticket_id>", methods=["PUT"])
@@ -97,10 +278,14 @@ def update_ticket(user_id, role, ticket_id):
 
     try:
         db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({"error": "Ticket was modified by another request; reload and retry."}), 409
     except IntegrityError:
         db.session.rollback()
         return jsonify({"error": "Database error during update"}), 500
 
+    bump_tags("tickets")
     return jsonify({
         "message": f"Ticket updated by {role} (user {user_id})",
         "ticket": ticket_schema.dump(updated_ticket)
@@ -114,59 +299,87 @@ def delete_ticket(user_id, role, ticket_id):
     if not ticket:
         return jsonify({"error": "Service ticket not found."}), 404
 
+    release_assignments(ServiceTicket.id == ticket_id)
     db.session.delete(ticket)
 
     try:
         db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({"error": "Ticket was modified by another request; reload and retry."}), 409
     except IntegrityError:
         db.session.rollback()
         return jsonify({"error": "Database error during deletion"}), 500
 
+    bump_tags("tickets", "assignments", "mechanics")
     return jsonify({"message": f"Service ticket {ticket_id} deleted by admin (user {user_id})"}), 200
 
 # EDIT MECHANICS ON TICKET
 @ticket_bp.route("/<int:ticket_id>/edit", methods=["PUT"])
 @auth_required("admin", "mechanic")
 def edit_ticket(user_id, role, ticket_id):
+    """
+    PUT /tickets/<id>/edit?add_ids=..&remove_ids=.. - Sync mechanics on a ticket.
+
+    Set-based: one IN query validates mechanic ids, one query reads the current
+    assignments, then a single bulk INSERT and a single bulk DELETE apply the diff.
+    Concurrent duplicate inserts are rejected by the unique (ticket, mechanic) constraint.
+    """
     data = request.args
-    add_ids = data.getlist("add_ids")
-    remove_ids = data.getlist("remove_ids")
+    try:
+        add_ids = {int(mid) for mid in data.getlist("add_ids")}
+        remove_ids = {int(mid) for mid in data.getlist("remove_ids")}
+    except ValueError:
+        return jsonify({"error": "Mechanic ids must be integers"}), 400
 
     ticket = db.session.get(ServiceTicket, ticket_id)
     if not ticket:
         return jsonify({"error": "Ticket not found"}), 404
 
-    # Add mechanics
-    for mid in add_ids:
-        mechanic = db.session.get(Mechanic, int(mid))
-        if mechanic:
-            existing = db.session.query(ServiceAssignment).filter_by(
-                service_ticket_id=ticket.id,
-                mechanic_id=mechanic.id
-            ).first()
-            if not existing:
-                db.session.add(ServiceAssignment(
-                    service_ticket_id=ticket.id,
-                    mechanic_id=mechanic.id
-                ))
-
-    # Remove mechanics
-    for mid in remove_ids:
-        mechanic = db.session.get(Mechanic, int(mid))
-        if mechanic:
-            assignment = db.session.query(ServiceAssignment).filter_by(
-                service_ticket_id=ticket.id,
-                mechanic_id=mechanic.id
-            ).first()
-            if assignment:
-                db.session.delete(assignment)
+    known_ids = set()
+    if add_ids:
+        known_ids = set(db.session.execute(
+            select(Mechanic.id).where(Mechanic.id.in_(add_ids))
+        ).scalars())
+
+    current_ids = set(db.session.execute(
+        select(ServiceAssignment.mechanic_id)
+        .where(ServiceAssignment.service_ticket_id == ticket_id)
+    ).scalars())
+
+    # A mechanic listed in both add_ids and remove_ids ends up removed
+    to_add = (known_ids - remove_ids) - current_ids
+    to_remove = remove_ids & current_ids
 
     try:
+        if to_add:
+            db.session.execute(insert(ServiceAssignment), [
+                {"service_ticket_id": ticket_id, "mechanic_id": mid}
+                for mid in sorted(to_add)
+            ])
+        if to_remove:
+            db.session.execute(
+                delete(ServiceAssignment)
+                .where(
+                    ServiceAssignment.service_ticket_id == ticket_id,
+                    ServiceAssignment.mechanic_id.in_(to_remove)
+                )
+                .execution_options(synchronize_session=False)
+            )
+        deltas = {mid: 1 for mid in to_add}
+        deltas.update({mid: -1 for mid in to_remove})
+        adjust_ticket_counts(deltas)
         db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({"error": "Ticket was modified by another request; reload and retry."}), 409
     except IntegrityError:
         db.session.rollback()
-        return jsonify({"error": "Database error updating mechanics"}), 500
+        return jsonify({"error": "Mechanics on this ticket were changed concurrently; retry"}), 409
 
+    bump_tags("assignments", "mechanics")
     return jsonify({
-        "message": f"Ticket {ticket_id} mechanics updated by {role} (user {user_id})"
+        "message": f"Ticket {ticket_id} mechanics updated by {role} (user {user_id})",
+        "added": sorted(to_add),
+        "removed": sorted(to_remove)
     }), 200
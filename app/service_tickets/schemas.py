@@ -1,12 +1,31 @@
 # app/service_tickets/schemas.py
 from extensions import ma
-from models import ServiceTicket
+from utils.serializers import RowSerializer
+from models import ServiceTicket, TicketPart
+from app.inventory.schemas import InventorySchema
+
+# Relationship paths callers may request with ?include=
+TICKET_INCLUDES = ("line_items", "parts", "assignments", "assignments.mechanic")
+
+class TicketPartSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = TicketPart
+        include_fk = True
+
 
 class ServiceTicketSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = ServiceTicket
         load_instance = True
         include_fk = True   # include vehicle_id foreign key
+        exclude = ("version_id",)   # surfaced as the ETag instead
+
+    # Only dumped when requested via ?include= (see utils/includes.py)
+    line_items = ma.Nested(TicketPartSchema, many=True, exclude=("ticket_id",), dump_only=True)
+    parts = ma.Nested(InventorySchema, many=True, exclude=("tickets",), dump_only=True)
+    assignments = ma.Nested("ServiceAssignmentSchema", many=True, exclude=("ticket",), dump_only=True)
 
-ticket_schema = ServiceTicketSchema()
-tickets_schema = ServiceTicketSchema(many=True)
+ticket_schema = ServiceTicketSchema(exclude=("line_items", "parts", "assignments"))
+tickets_schema = ServiceTicketSchema(many=True, exclude=("line_items", "parts", "assignments"))
+ticket_row_serializer = RowSerializer(tickets_schema)  # list endpoints: Core rows, no per-object dump
+line_item_schema = TicketPartSchema()
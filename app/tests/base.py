@@ -1,4 +1,6 @@
 import unittest
+from contextlib import contextmanager
+from sqlalchemy import event
 from run import create_app
 from extensions import db
 from flask_jwt_extended import create_access_token
@@ -15,13 +17,23 @@ class TestConfig:
     CACHE_TYPE = "null"
     CACHE_NO_NULL_WARNING = True
     RATELIMIT_ENABLED = False
+    CACHE_WARMUP = False
+
+    # Fail any request that runs more SQL than its route's @query_budget
+    QUERY_BUDGET_STRICT = True
+
+    # Hash passwords inline instead of in a process pool
+    PASSWORD_HASH_WORKERS = 0
 
 
 class BaseTestCase(unittest.TestCase):
 
+    # Subclasses may point this at a TestConfig subclass (e.g. to enable caching)
+    config_class = TestConfig
+
     def setUp(self):
         # Create app using test config BEFORE extensions initialize
-        self.app = create_app(TestConfig)
+        self.app = create_app(self.config_class)
 
         # Push context
         self.app_context = self.app.app_context()
@@ -57,3 +69,55 @@ class BaseTestCase(unittest.TestCase):
     # Helper: Authorization header
     def auth_header(self, user_id=1, role="admin"):
         return {"Authorization": f"Bearer {self.get_token(user_id, role)}"}
+
+    # Helper: count SQL statements executed inside the block
+    @contextmanager
+    def count_queries(self):
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "after_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "after_cursor_execute", _record)
+
+    # Helper: fail if the block runs more than `limit` SQL statements
+    @contextmanager
+    def assertMaxQueries(self, limit):
+        with self.count_queries() as statements:
+            yield statements
+        self.assertLessEqual(
+            len(statements), limit,
+            f"{len(statements)} queries, expected at most {limit}:\n" + "\n".join(statements)
+        )
+
+    # Helper: the @query_budget declared on the view serving `path`
+    def route_budget(self, path, method="GET"):
+        endpoint, _ = self.app.url_map.bind("localhost").match(path.split("?")[0], method)
+        return getattr(self.app.view_functions[endpoint], "query_budget", None)
+
+    # Helper: GET `path` and check it stays within its route's declared budget
+    def assertWithinBudget(self, path, headers=None):
+        budget = self.route_budget(path)
+        self.assertIsNotNone(budget, f"No @query_budget declared for {path}")
+        db.session.expunge_all()
+        with self.assertMaxQueries(budget):
+            response = self.client.get(path, headers=headers)
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return response
+
+    # Helper: GET `path` before and after `seed()` adds rows; the query count must not change
+    def assertQueriesConstant(self, path, seed, headers=None):
+        counts = []
+        for step in range(2):
+            if step:
+                seed()
+            db.session.expunge_all()
+            with self.count_queries() as statements:
+                response = self.client.get(path, headers=headers)
+            self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+            counts.append(len(statements))
+        self.assertEqual(counts[0], counts[1], f"{path} query count grew with rows: {counts}")
@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+import queue
+import tempfile
+
+from app import create_app
+from app.tests.base import BaseTestCase, TestConfig
+from extensions import db
+from models import Mechanic
+from utils.access_log import DroppingQueueHandler, access_log
+from utils.auth import encode_token
+
+
+class AccessLogConfig(TestConfig):
+    ACCESS_LOG_ENABLED = True
+
+
+class TestAccessLog(BaseTestCase):
+
+    def setUp(self):
+        fd, self.log_path = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+        self.config_class = type("FileAccessLogConfig", (AccessLogConfig,), {"ACCESS_LOG_FILE": self.log_path})
+        super().setUp()
+        db.session.add(Mechanic(name="John Mechanic", email="john@shop.com", salary=55000))
+        db.session.commit()
+
+    def tearDown(self):
+        super().tearDown()
+        writer = self.app.extensions["access_log"]
+        writer.stop()
+        writer.handler.close()
+        os.remove(self.log_path)
+
+    def lines(self):
+        with self.app.app_context():
+            access_log.flush()
+        with open(self.log_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_request_fields(self):
+        self.client.get("/mechanics")
+        [entry] = self.lines()
+        self.assertEqual(entry["route"], "/mechanics")
+        self.assertEqual(entry["blueprint"], "mechanics")
+        self.assertEqual((entry["method"], entry["status"]), ("GET", 200))
+        self.assertGreaterEqual(entry["sql_queries"], 1)
+        self.assertIsInstance(entry["latency_ms"], float)
+        self.assertIn("ts", entry)
+        self.assertIsNone(entry["user_id"])
+
+    def test_user_from_auth_decorator(self):
+        token = encode_token(7, role="customer")
+        self.client.get("/customers/my-tickets", headers={"Authorization": f"Bearer {token}"})
+        self.client.get("/mechanics")
+
+        authed, anonymous = self.lines()
+        self.assertEqual((authed["user_id"], authed["role"]), ("7", "customer"))
+        self.assertIsNone(anonymous["user_id"])
+
+    def test_sampling_keeps_errors_and_slow_requests(self):
+        @self.app.route("/boom")
+        def boom():
+            return "boom", 500
+
+        self.app.config["ACCESS_LOG_SAMPLE_RATE"] = 0.0
+        self.client.get("/mechanics")
+        self.client.get("/boom")
+        self.assertEqual([entry["status"] for entry in self.lines()], [500])
+
+        self.app.config["ACCESS_LOG_SLOW_MS"] = 0
+        self.client.get("/mechanics")
+        self.assertEqual(self.lines()[-1]["sample_rate"], 1.0)
+
+    def test_new_app_stops_previous_listener(self):
+        self.client.get("/mechanics")
+        writer = self.app.extensions["access_log"]
+        thread = writer._listener._thread
+
+        other = create_app(self.config_class).extensions["access_log"]
+        try:
+            self.assertIsNone(writer._listener)
+            self.assertFalse(thread.is_alive())
+            self.assertEqual(len(self.lines()), 1)   # queued lines were written first
+        finally:
+            other.stop()
+            other.handler.close()
+
+
+class TestDroppingQueueHandler(BaseTestCase):
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        record = logging.makeLogRecord({"msg": "access"})
+        for _ in range(3):
+            handler.handle(record)
+        self.assertEqual(handler.dropped, 2)
+        self.assertEqual(handler.queue.qsize(), 1)
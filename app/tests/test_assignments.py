@@ -1,6 +1,9 @@
+from sqlalchemy import select, func
+
 from app.tests.base import BaseTestCase
 from extensions import db
-from models import Customer, Vehicle, ServiceTicket, Mechanic
+from utils.pagination import MAX_LIMIT
+from models import Customer, Vehicle, ServiceTicket, Mechanic, ServiceAssignment
 
 
 class TestAssignments(BaseTestCase):
@@ -71,3 +74,87 @@ class TestAssignments(BaseTestCase):
         payload = {"mechanic_id": self.mechanic.id}
         response = self.client.put("/assignments/999999", json=payload, headers=self.headers)
         self.assertEqual(response.status_code, 404)
+
+    # CONSTANT QUERY COUNT
+    def _seed_assignments(self, count):
+        # Rows are expunged afterwards so the request cannot lean on the identity map
+        vehicle_id = db.session.execute(select(Vehicle.id)).scalar_one()
+        offset = db.session.execute(select(func.count(Mechanic.id))).scalar_one()
+        for i in range(offset, offset + count):
+            ticket = ServiceTicket(
+                vehicle_id=vehicle_id,
+                description=f"Seeded ticket {i}",
+                status="open",
+                cost=0
+            )
+            mechanic = Mechanic(name=f"Mechanic {i}", email=f"m{i}@shop.com", salary=50000)
+            db.session.add_all([ticket, mechanic])
+            db.session.flush()
+            db.session.add(ServiceAssignment(service_ticket_id=ticket.id, mechanic_id=mechanic.id))
+        db.session.commit()
+        db.session.expunge_all()
+
+    def _queries_for(self, url):
+        with self.count_queries() as statements:
+            response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return len(statements)
+
+    def test_get_assignments_query_count_is_constant(self):
+        self._seed_assignments(2)
+        small = self._queries_for("/assignments?include=mechanic,ticket.parts")
+
+        self._seed_assignments(20)
+        large = self._queries_for("/assignments?include=mechanic,ticket.parts")
+
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 2)
+
+    def test_get_assignments_nested_payload(self):
+        self._seed_assignments(1)
+        response = self.client.get("/assignments", headers=self.headers)
+        row = response.json[0]
+        self.assertEqual(row["mechanic"]["name"], "Mechanic 1")
+        self.assertEqual(row["ticket"]["description"], "Seeded ticket 1")
+        self.assertNotIn("parts", row["ticket"])
+
+    def test_get_assignments_cursor(self):
+        self._seed_assignments(5)
+        ids = []
+        url = "/assignments?limit=2"
+        while url:
+            response = self.client.get(url, headers=self.headers)
+            ids.extend(a["id"] for a in response.json["items"])
+            cursor = response.json["next"]
+            url = f"/assignments?limit=2&after={cursor}" if cursor else None
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(ids, sorted(ids))
+
+    def test_get_assignments_without_paging_links_to_the_rest(self):
+        self._seed_assignments(MAX_LIMIT + 5)
+        expected = db.session.execute(select(ServiceAssignment.id).order_by(ServiceAssignment.id)).scalars().all()
+
+        response = self.client.get("/assignments", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), MAX_LIMIT)
+        ids = [a["id"] for a in response.json]
+        cursor = response.headers["X-Next-Cursor"]
+        self.assertEqual(response.headers["Link"], f'</assignments?after={cursor}&limit={MAX_LIMIT}>; rel="next"')
+
+        while cursor:
+            page = self.client.get(f"/assignments?after={cursor}&limit={MAX_LIMIT}", headers=self.headers).json
+            ids.extend(a["id"] for a in page["items"])
+            cursor = page["next"]
+        self.assertEqual(ids, expected)
+
+    def test_short_assignment_list_has_no_continuation(self):
+        self._seed_assignments(2)
+        response = self.client.get("/assignments", headers=self.headers)
+        self.assertNotIn("X-Next-Cursor", response.headers)
+        self.assertNotIn("Link", response.headers)
+
+    def test_get_assignments_page(self):
+        self._seed_assignments(5)
+        response = self.client.get("/assignments?page=2&per_page=2", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), 2)
@@ -0,0 +1,131 @@
+import time
+from unittest import mock
+
+from jose import jwt
+
+from app.tests.base import BaseTestCase, TestConfig
+from utils import auth
+from utils.auth import (
+    ALGORITHM, SECRET_KEY, clear_token_cache, decode_token, encode_token, revoke_token,
+    token_cache_stats,
+)
+
+
+class TestVerifiedTokenCache(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        clear_token_cache()
+
+    def tearDown(self):
+        clear_token_cache()
+        super().tearDown()
+
+    def bearer(self, token):
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_repeat_token_skips_verification(self):
+        token = encode_token(1, role="customer")
+        self.assertEqual(decode_token(token)["sub"], "1")
+
+        with mock.patch.object(auth.jwt, "decode", side_effect=AssertionError("verified twice")):
+            payload = decode_token(token)
+        self.assertEqual(payload["sub"], "1")
+        self.assertEqual(token_cache_stats()["hits"], 1)
+
+    def test_cached_payload_is_a_copy(self):
+        token = encode_token(1)
+        decode_token(token)["sub"] = "tampered"
+        self.assertEqual(decode_token(token)["sub"], "1")
+
+    def test_entry_expires_with_token(self):
+        token = jwt.encode({"sub": "1", "exp": int(time.time()) + 1}, SECRET_KEY, algorithm=ALGORITHM)
+        decode_token(token)
+
+        with mock.patch.object(auth.time, "time", return_value=time.time() + 5):
+            self.assertIsNone(auth._token_cache.get(auth._digest(token), auth.time.time()))
+        self.assertEqual(token_cache_stats()["size"], 0)
+
+    def test_invalid_tokens_are_not_cached(self):
+        self.assertEqual(decode_token("not-a-token"), {"error": "Invalid token"})
+        self.assertEqual(token_cache_stats()["size"], 0)
+
+    def test_revoked_token_is_rejected(self):
+        token = encode_token(1)
+        self.assertEqual(self.client.get("/customers/my-tickets", headers=self.bearer(token)).status_code, 200)
+
+        revoke_token(token)
+        response = self.client.get("/customers/my-tickets", headers=self.bearer(token))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json(), {"error": "Token has been revoked"})
+
+        # Other tokens are unaffected
+        other = encode_token(2)
+        self.assertEqual(self.client.get("/customers/my-tickets", headers=self.bearer(other)).status_code, 200)
+
+    def test_logout_revokes_presented_token(self):
+        token = encode_token(1, role="admin")
+        self.assertEqual(self.client.post("/users/logout", headers=self.bearer(token)).status_code, 200)
+        self.assertEqual(decode_token(token), {"error": "Token has been revoked"})
+
+    def test_cache_is_bounded(self):
+        with mock.patch.object(auth._token_cache, "maxsize", 2):
+            for user_id in range(3):
+                decode_token(encode_token(user_id))
+            self.assertEqual(token_cache_stats()["size"], 2)
+
+    def test_expired_revocations_are_purged(self):
+        token = jwt.encode({"sub": "1", "exp": int(time.time()) + 1}, SECRET_KEY, algorithm=ALGORITHM)
+        revoke_token(token)
+        self.assertEqual(token_cache_stats()["revoked"], 1)
+
+        with mock.patch.object(auth.time, "time", return_value=time.time() + 5):
+            decode_token(encode_token(2))
+        self.assertEqual(token_cache_stats()["revoked"], 0)
+
+
+class SharedCacheConfig(TestConfig):
+    CACHE_TYPE = "SimpleCache"
+
+
+class TestSharedRevocation(BaseTestCase):
+
+    config_class = SharedCacheConfig
+
+    def setUp(self):
+        super().setUp()
+        clear_token_cache()
+
+    def tearDown(self):
+        clear_token_cache()
+        super().tearDown()
+
+    def test_revocation_is_seen_by_other_workers(self):
+        token = encode_token(1)
+        self.assertEqual(decode_token(token)["sub"], "1")
+        revoke_token(token)
+
+        # Another worker: its own verified payload for the token, no local revocation
+        clear_token_cache()
+        auth._token_cache.put(auth._digest(token), time.time() + 60, {"sub": "1"})
+        self.assertEqual(decode_token(token), {"error": "Token has been revoked"})
+        self.assertEqual(token_cache_stats()["size"], 0)
+
+    def test_cache_hits_do_not_read_shared_cache(self):
+        token = encode_token(1)
+        decode_token(token)
+        with mock.patch.object(auth.cache, "get", side_effect=AssertionError("shared read")):
+            for _ in range(3):
+                self.assertEqual(decode_token(token)["sub"], "1")
+
+    def test_other_workers_revocation_seen_after_sync_interval(self):
+        token = encode_token(1)
+        decode_token(token)
+        # Another worker revokes the token: only the shared cache changes
+        auth.cache.set(auth.REVOKED_PREFIX + auth._digest(token), 1)
+        auth.cache.set(auth.REVOCATION_GENERATION_KEY, "other-worker")
+
+        self.assertEqual(decode_token(token)["sub"], "1")   # within the sync interval
+        later = time.time() + auth.REVOCATION_SYNC_SECONDS
+        with mock.patch.object(auth.time, "time", return_value=later):
+            self.assertEqual(decode_token(token), {"error": "Token has been revoked"})
@@ -0,0 +1,413 @@
+import threading
+import time
+from unittest import mock
+
+from flask import g, jsonify
+from sqlalchemy import text
+from werkzeug.http import http_date
+
+from app.tests.base import BaseTestCase, TestConfig
+from run import create_app
+from extensions import db, cache
+from models import Mechanic, Customer, Vehicle, ServiceTicket
+from utils.cache_tags import LOCK_PREFIX, bump_tags, cached_view, tag_versions, view_cache_key
+from utils.warmup import warm_up, warm_up_worker
+
+
+class CachingConfig(TestConfig):
+    CACHE_TYPE = "SimpleCache"
+
+
+class TestTaggedCache(BaseTestCase):
+
+    config_class = CachingConfig
+
+    def setUp(self):
+        super().setUp()
+        db.session.add(Mechanic(name="John Mechanic", email="john@shop.com", salary=55000))
+        db.session.commit()
+        self.headers = self.auth_header()
+
+    def test_hit_skips_database(self):
+        self.client.get("/mechanics")
+        with self.count_queries() as statements:
+            response = self.client.get("/mechanics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statements, [])
+
+    def test_write_invalidates_list(self):
+        self.assertEqual(len(self.client.get("/mechanics").json), 1)
+
+        response = self.client.post("/mechanics", json={
+            "name": "Second Mechanic", "email": "second@shop.com", "salary": "50000.00"
+        }, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(len(self.client.get("/mechanics").json), 2)
+
+    def test_unrelated_write_keeps_entry(self):
+        self.client.get("/mechanics")
+        self.client.post("/customers", json={"name": "Jane", "email": "jane@customer.com"},
+                         headers=self.headers)
+        with self.count_queries() as statements:
+            self.client.get("/mechanics")
+        self.assertEqual(statements, [])
+
+    def test_query_strings_are_normalized(self):
+        self.client.get("/tickets?status=open&sort=id")
+        with self.count_queries() as statements:
+            self.client.get("/tickets?sort=id&status=open")
+        self.assertEqual(statements, [])
+
+    def test_bump_changes_version(self):
+        before = tag_versions(("tickets",))["tickets"]
+        bump_tags("tickets")
+        self.assertNotEqual(tag_versions(("tickets",))["tickets"], before)
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+
+class TestConditionalGet(BaseTestCase):
+
+    config_class = CachingConfig
+
+    def setUp(self):
+        super().setUp()
+        customer = Customer(name="Jane", email="jane@customer.com")
+        db.session.add(customer)
+        db.session.flush()
+        vehicle = Vehicle(vin="123456789ABCDEFG", make="Toyota", model="Camry",
+                          year=2020, customer_id=customer.id)
+        db.session.add(vehicle)
+        db.session.flush()
+        ticket = ServiceTicket(vehicle_id=vehicle.id, description="Oil change", status="Open", cost=100)
+        db.session.add(ticket)
+        db.session.commit()
+        self.ticket_id = ticket.id
+        self.headers = self.auth_header()
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def later(self, *paths, seconds=2):
+        """Run the block as if `seconds` had passed since the tag versions behind `paths` were created."""
+        for path in paths:
+            self.client.get(path)
+        # time is shared, so this also stamps any version created inside the block
+        return mock.patch("utils.conditional.time.time_ns",
+                          return_value=time.time_ns() + int(seconds * 1_000_000_000))
+
+    def test_list_if_none_match_skips_view(self):
+        with self.later("/mechanics"):
+            first = self.client.get("/mechanics")
+        self.assertIsNotNone(first.headers.get("ETag"))
+        self.assertIsNotNone(first.headers.get("Last-Modified"))
+
+        with self.count_queries() as statements:
+            response = self.client.get("/mechanics", headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(statements, [])
+
+    def test_list_etag_changes_after_write(self):
+        etag = self.client.get("/tickets").headers["ETag"]
+        self.client.put(f"/tickets/{self.ticket_id}", json={"status": "Closed"}, headers=self.headers)
+
+        response = self.client.get("/tickets", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_list_if_modified_since(self):
+        with self.later("/tickets"):
+            last_modified = self.client.get("/tickets").headers["Last-Modified"]
+            response = self.client.get("/tickets", headers={"If-Modified-Since": last_modified})
+            self.assertEqual(response.status_code, 304)
+
+            response = self.client.get("/tickets", headers={"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"})
+            self.assertEqual(response.status_code, 200)
+
+    def test_two_bumps_within_one_second(self):
+        bump_tags("tickets")
+        first = self.client.get("/tickets")
+        # The version is under a second old: only the ETag can validate this copy
+        self.assertIsNotNone(first.headers.get("ETag"))
+        self.assertIsNone(first.headers.get("Last-Modified"))
+
+        version = int(tag_versions(("tickets",))["tickets"])
+        same_second = http_date(version // 1_000_000_000)
+        bump_tags("tickets")
+        response = self.client.get("/tickets", headers={"If-Modified-Since": same_second})
+        self.assertEqual(response.status_code, 200)
+
+    def test_ticket_detail_etag_follows_row_version(self):
+        first = self.client.get(f"/tickets/{self.ticket_id}")
+        etag = first.headers["ETag"]
+        self.assertNotIn("version_id", first.get_json())
+
+        response = self.client.get(f"/tickets/{self.ticket_id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.client.put(f"/tickets/{self.ticket_id}", json={"status": "Closed"}, headers=self.headers)
+        response = self.client.get(f"/tickets/{self.ticket_id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["status"], "Closed")
+
+    def test_ticket_detail_sees_writes_from_other_workers(self):
+        etag = self.client.get(f"/tickets/{self.ticket_id}").headers["ETag"]
+
+        # Another worker's write never reaches this process's entity cache
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE service_tickets SET status = 'Closed', version_id = version_id + 1 "
+                              "WHERE id = :id"), {"id": self.ticket_id})
+
+        response = self.client.get(f"/tickets/{self.ticket_id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["status"], "Closed")
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_ticket_detail_etag_varies_with_include(self):
+        plain = self.client.get(f"/tickets/{self.ticket_id}").headers["ETag"]
+        nested = self.client.get(f"/tickets/{self.ticket_id}?include=parts")
+        self.assertNotEqual(nested.headers["ETag"], plain)
+
+        response = self.client.get(f"/tickets/{self.ticket_id}?include=parts",
+                                   headers={"If-None-Match": plain})
+        self.assertEqual(response.status_code, 200)
+
+
+class TwoTierConfig(TestConfig):
+    CACHE_TYPE = "utils.cache_backends.TwoTierCache"
+    CACHE_L2_TYPE = "SimpleCache"
+    CACHE_L1_SIZE = 2
+    CACHE_L1_TTL = 60
+
+
+class TestTwoTierCache(BaseTestCase):
+
+    config_class = TwoTierConfig
+
+    def setUp(self):
+        super().setUp()
+        self.backend = cache.cache
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def test_l1_serves_repeat_reads(self):
+        cache.set("k", "v")
+        self.backend.l2.clear()   # only L1 can answer now
+        self.assertEqual(cache.get("k"), "v")
+        self.assertEqual(self.backend.stats()["l1_hits"], 1)
+
+    def test_l1_miss_falls_back_to_l2(self):
+        self.backend.l2.set("k", "v")
+        self.assertEqual(cache.get("k"), "v")
+        self.assertEqual(cache.get("k"), "v")
+        stats = self.backend.stats()
+        self.assertEqual((stats["l1_hits"], stats["l2_hits"]), (1, 1))
+
+    def test_l1_is_bounded(self):
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+        self.assertEqual(self.backend.stats()["l1_size"], 2)
+
+    def test_tag_versions_bypass_l1(self):
+        bump_tags("tickets")
+        before = tag_versions(("tickets",))["tickets"]
+
+        # Another worker bumps the tag directly in the shared tier
+        self.backend.l2.set("tag:tickets", "other-worker", timeout=0)
+        self.assertEqual(tag_versions(("tickets",))["tickets"], "other-worker")
+        self.assertNotEqual(before, "other-worker")
+
+    def test_delete_evicts_both_tiers(self):
+        cache.set("k", "v")
+        cache.delete("k")
+        self.assertIsNone(cache.get("k"))
+        self.assertIsNone(self.backend.l2.get("k"))
+
+    def test_cached_view_through_both_tiers(self):
+        db.session.add(Mechanic(name="John Mechanic", email="john@shop.com", salary=55000))
+        db.session.commit()
+
+        self.client.get("/mechanics")
+        with self.count_queries() as statements:
+            response = self.client.get("/mechanics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statements, [])
+        self.assertGreaterEqual(self.backend.stats()["l1_hits"], 1)
+
+
+class TestSingleFlight(BaseTestCase):
+
+    config_class = CachingConfig
+
+    def setUp(self):
+        super().setUp()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def slow_view(self):
+        self.calls += 1
+        self.release.wait(5)
+        return jsonify({"calls": self.calls})
+
+    def call(self, view, results=None):
+        with self.app.test_request_context("/things"):
+            response = view()
+            if results is not None:
+                results.append(response.get_json())
+            return response
+
+    def key(self):
+        with self.app.test_request_context("/things"):
+            return view_cache_key(tag_versions(("things",)))
+
+    def test_concurrent_misses_rebuild_once(self):
+        view = cached_view(60, ("things",), wait=5)(self.slow_view)
+        results = []
+        threads = [threading.Thread(target=self.call, args=(view, results)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{"calls": 1}] * 8)
+
+    def test_expired_entry_served_while_another_request_rebuilds(self):
+        self.release.set()
+        view = cached_view(60, ("things",), stale_ttl=60)(self.slow_view)
+        key = self.key()
+        cache.set(key, (b'{"calls":0}\n', 200, "application/json", time.time() - 1, 0.01, []))
+        cache.add(LOCK_PREFIX + key, (time.time() + 10, "other-request"))
+
+        self.assertEqual(self.call(view).get_json(), {"calls": 0})
+        self.assertEqual(self.calls, 0)
+
+    def test_lock_of_dead_holder_is_taken_over(self):
+        self.release.set()
+        view = cached_view(60, ("things",), lock_timeout=10, wait=2.0)(self.slow_view)
+        key = self.key()
+        # A worker killed mid-rebuild; the backend still holds its lock past the expiry
+        cache.set(LOCK_PREFIX + key, (time.time() - 1, "killed-worker"), timeout=0)
+
+        started = time.perf_counter()
+        response = self.call(view)
+        self.assertLess(time.perf_counter() - started, 1.0)   # did not sit out `wait`
+        self.assertEqual(response.get_json(), {"calls": 1})
+        self.assertIsNone(cache.get(LOCK_PREFIX + key))
+        self.assertEqual(self.call(view).get_json(), {"calls": 1})   # and cached it
+
+    def test_lock_reported_gone_but_not_addable_is_taken_over(self):
+        # FileSystemCache after lock_timeout: get() returns None, add() still fails
+        self.release.set()
+        view = cached_view(60, ("things",), wait=2.0)(self.slow_view)
+        with mock.patch.object(cache, "add", return_value=False):
+            started = time.perf_counter()
+            self.assertEqual(self.call(view).get_json(), {"calls": 1})
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+    def test_expired_entry_rebuilt_by_lock_winner(self):
+        self.release.set()
+        view = cached_view(60, ("things",), stale_ttl=60)(self.slow_view)
+        cache.set(self.key(), (b'{"calls":0}\n', 200, "application/json", time.time() - 1, 0.01, []))
+
+        self.assertEqual(self.call(view).get_json(), {"calls": 1})
+        self.assertIsNone(cache.get(LOCK_PREFIX + self.key()))
+
+    def test_view_headers_replayed_on_hit(self):
+        def view():
+            response = jsonify([])
+            response.headers["X-Next-Cursor"] = "abc"
+            return response
+
+        cached = cached_view(60, ("things",))(view)
+        self.call(cached)
+        with self.app.test_request_context("/things"):
+            hit = cached()
+            self.assertEqual(g.view_cache, "hit")
+        self.assertEqual(hit.headers["X-Next-Cursor"], "abc")
+        self.assertEqual(hit.headers.getlist("Content-Type"), ["application/json"])
+
+    def test_early_refresh(self):
+        self.release.set()
+        entry = (b'{"calls":0}\n', 200, "application/json", time.time() + 30, 10.0, [])
+
+        # A slow last rebuild (10s) is due for refresh 30s before expiry at an average draw
+        cache.set(self.key(), entry)
+        eager = cached_view(60, ("things",), early_refresh=10.0)(self.slow_view)
+        with mock.patch("utils.cache_tags.random.random", return_value=0.5):
+            self.assertEqual(self.call(eager).get_json(), {"calls": 1})
+
+        cache.set(self.key(), entry)
+        lazy = cached_view(60, ("things",))(self.slow_view)
+        self.assertEqual(self.call(lazy).get_json(), {"calls": 0})
+
+
+class WarmupConfig(CachingConfig):
+    CACHE_WARMUP_URLS = ("/mechanics", "/tickets")
+
+
+class TestWarmup(BaseTestCase):
+
+    config_class = WarmupConfig
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def test_warm_up_fills_view_cache(self):
+        db.session.add(Mechanic(name="John Mechanic", email="john@shop.com", salary=55000))
+        db.session.commit()
+
+        with self.assertLogs(self.app.logger, "INFO") as logs:
+            warm_up(self.app)
+        self.assertTrue(any("/mechanics -> 200" in line for line in logs.output))
+        self.assertTrue(any("/tickets -> 200" in line for line in logs.output))
+
+        with self.count_queries() as statements:
+            response = self.client.get("/mechanics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statements, [])
+
+    def test_failed_warm_up_does_not_stop_app(self):
+        class NoTablesConfig(WarmupConfig):
+            CACHE_WARMUP = True
+            CACHE_WARMUP_URLS = ("/mechanics",)
+
+        # Tables are only created by setUp, so the warm-up request fails
+        app = create_app(NoTablesConfig)
+        with self.assertLogs("app", "WARNING") as logs:
+            warm_up_worker(app)
+        self.assertIn("warm-up: /mechanics failed", logs.output[0])
+
+    def test_create_app_does_not_warm_up(self):
+        class EnabledConfig(WarmupConfig):
+            CACHE_WARMUP = True
+
+        # `flask db upgrade` and other CLI commands build the app too
+        with mock.patch("utils.warmup.warm_up") as warm:
+            app = create_app(EnabledConfig)
+        warm.assert_not_called()
+
+        with mock.patch("utils.warmup.warm_up") as warm:
+            warm_up_worker(app)
+        warm.assert_called_once_with(app)
+
+    def test_warm_up_command(self):
+        with mock.patch("utils.warmup.warm_up") as warm:
+            result = self.app.test_cli_runner().invoke(args=["warm-up"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        warm.assert_called_once_with(self.app)
\ No newline at end of file
@@ -1,6 +1,12 @@
+from unittest import mock
+
+from sqlalchemy.exc import IntegrityError
+
+from app.customers.schemas import customer_bulk_schema
 from app.tests.base import BaseTestCase
 from extensions import db
 from models import Customer
+from utils.bulk import bulk_import, unique_check
 
 
 class TestCustomers(BaseTestCase):
@@ -52,3 +58,81 @@ class TestCustomers(BaseTestCase):
     def test_delete_customer_not_found(self):
         response = self.client.delete("/customers/999999", headers=self.headers)
         self.assertEqual(response.status_code, 404)
+
+    # PAGE PAGINATION IS APPLIED IN SQL
+    def test_get_customers_page_two(self):
+        for i in range(3):
+            db.session.add(Customer(name=f"Customer {i}", email=f"c{i}@customer.com"))
+        db.session.commit()
+
+        response = self.client.get("/customers?page=2&per_page=2", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c["email"] for c in response.json], ["c1@customer.com", "c2@customer.com"])
+
+    # CURSOR PAGINATION
+    def test_get_customers_cursor(self):
+        for i in range(4):
+            db.session.add(Customer(name=f"Customer {i}", email=f"c{i}@customer.com"))
+        db.session.commit()
+
+        seen = []
+        url = "/customers?limit=2"
+        while url:
+            response = self.client.get(url, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(c["id"] for c in response.json["items"])
+            cursor = response.json["next"]
+            url = f"/customers?limit=2&after={cursor}" if cursor else None
+
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(len(seen), 5)
+
+    def test_get_customers_invalid_cursor(self):
+        response = self.client.get("/customers?after=not-a-cursor", headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    # BULK IMPORT
+    def test_bulk_create_customers_json(self):
+        payload = [
+            {"name": "New One", "email": "one@customer.com"},
+            {"name": "Taken", "email": "jane@customer.com"},     # already exists
+            {"name": "Repeat", "email": "one@customer.com"},     # duplicate within upload
+            {"email": "noname@customer.com"},                    # fails schema validation
+            {"name": "New Two", "email": "two@customer.com", "phone": "555-0000"},
+        ]
+        response = self.client.post("/customers/bulk", json=payload, headers=self.headers)
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json["inserted"], 2)
+        self.assertEqual([e["row"] for e in response.json["errors"]], [1, 2, 3])
+        self.assertEqual(db.session.query(Customer).count(), 3)
+
+    def test_bulk_create_customers_csv(self):
+        body = "name,email,phone\nCsv One,csv1@customer.com,\nCsv Two,csv2@customer.com,555-1111\n"
+        response = self.client.post(
+            "/customers/bulk", data=body, content_type="text/csv", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json, {"inserted": 2, "failed": 0, "errors": []})
+
+    def test_bulk_rolled_back_chunk_does_not_block_later_rows(self):
+        commit = db.session.commit
+        failures = [IntegrityError("INSERT", {}, Exception("conflict"))]
+
+        def flaky_commit():
+            if failures:
+                raise failures.pop()
+            commit()
+
+        rows = [{"name": "First Try", "email": "retry@customer.com"},
+                {"name": "Second Try", "email": "retry@customer.com"}]
+        with mock.patch.object(db.session, "commit", side_effect=flaky_commit):
+            report = bulk_import(Customer, customer_bulk_schema, rows, chunk_size=1, checks=[
+                unique_check(Customer.email, "email", "Email already associated with an account"),
+            ])
+
+        self.assertEqual((report["inserted"], [e["row"] for e in report["errors"]]), (1, [0]))
+        self.assertEqual(db.session.query(Customer).filter_by(email="retry@customer.com").count(), 1)
+
+    def test_bulk_create_customers_bad_body(self):
+        response = self.client.post("/customers/bulk", json={"name": "x"}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,188 @@
+from sqlalchemy import text
+
+from app.tests.base import BaseTestCase, TestConfig
+from extensions import db
+from models import Customer, Vehicle, ServiceTicket, Mechanic, ServiceAssignment
+from utils.entity_cache import entity_cache
+
+
+class TestEntityCache(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.customer = Customer(name="Jane Customer", email="jane@customer.com", phone="555-1234")
+        db.session.add(self.customer)
+        db.session.flush()
+
+        self.vehicle = Vehicle(vin="123456789ABCDEFG", make="Toyota", model="Camry",
+                               year=2020, customer_id=self.customer.id)
+        self.mechanic = Mechanic(name="John Mechanic", email="john@shop.com", salary=55000)
+        db.session.add_all([self.vehicle, self.mechanic])
+        db.session.flush()
+
+        self.ticket = ServiceTicket(vehicle_id=self.vehicle.id, description="Oil change", status="Open", cost=100)
+        db.session.add(self.ticket)
+        db.session.commit()
+
+        self.customer_id = self.customer.id
+        self.vehicle_id = self.vehicle.id
+        self.mechanic_id = self.mechanic.id
+        self.ticket_id = self.ticket.id
+        self.headers = self.auth_header()
+
+    def fresh_session(self):
+        # Requests share the test's app context, so drop the identity map to
+        # simulate the next request arriving with an empty session
+        db.session.expunge_all()
+
+    def test_repeat_detail_lookup_served_from_cache(self):
+        first = self.client.get(f"/customers/{self.customer_id}")
+        self.fresh_session()
+
+        with self.count_queries() as statements:
+            second = self.client.get(f"/customers/{self.customer_id}")
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual(statements, [])
+        stats = entity_cache.stats()
+        self.assertEqual((stats["size"], stats["hits"]), (1, 1))
+
+    def test_cache_hit_returns_persistent_clean_instance(self):
+        entity_cache.get(Customer, self.customer_id)
+        self.fresh_session()
+
+        customer = entity_cache.get(Customer, self.customer_id)
+        self.assertIn(customer, db.session)
+        self.assertFalse(db.session.is_modified(customer))
+
+        customer.phone = "555-9999"
+        db.session.commit()
+        self.fresh_session()
+        self.assertEqual(db.session.get(Customer, self.customer_id).phone, "555-9999")
+
+    def test_update_evicts_entry(self):
+        self.client.get(f"/customers/{self.customer_id}")
+        self.fresh_session()
+
+        response = self.client.put(f"/customers/{self.customer_id}",
+                                   json={"phone": "555-0000"}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.fresh_session()
+
+        response = self.client.get(f"/customers/{self.customer_id}")
+        self.assertEqual(response.get_json()["phone"], "555-0000")
+
+    def test_delete_evicts_entry(self):
+        self.client.get(f"/vehicles/{self.vehicle_id}")
+        self.fresh_session()
+
+        self.client.delete(f"/vehicles/{self.vehicle_id}", headers=self.headers)
+        self.fresh_session()
+
+        self.assertEqual(self.client.get(f"/vehicles/{self.vehicle_id}").status_code, 404)
+
+    def test_bulk_update_evicts_model(self):
+        self.client.get(f"/mechanics/{self.mechanic_id}")
+        self.fresh_session()
+
+        # Creating an assignment bumps ticket_count with a bulk UPDATE
+        response = self.client.post("/assignments", json={
+            "service_ticket_id": self.ticket_id,
+            "mechanic_id": self.mechanic_id,
+        }, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.fresh_session()
+
+        response = self.client.get(f"/mechanics/{self.mechanic_id}")
+        self.assertEqual(response.get_json()["ticket_count"], 1)
+
+    def test_uncommitted_changes_are_not_published(self):
+        customer = db.session.get(Customer, self.customer_id)
+        customer.phone = "555-0000"
+        db.session.flush()
+        entity_cache.get(Customer, self.customer_id)
+        db.session.rollback()
+        self.fresh_session()
+
+        self.assertEqual(entity_cache.get(Customer, self.customer_id).phone, "555-1234")
+        self.assertEqual(entity_cache.stats()["hits"], 0)
+
+    def test_assignment_default_includes_served_from_cache(self):
+        assignment = ServiceAssignment(service_ticket_id=self.ticket_id, mechanic_id=self.mechanic_id)
+        db.session.add(assignment)
+        db.session.commit()
+        assignment_id = assignment.id
+
+        first = self.client.get(f"/assignments/{assignment_id}")
+        self.fresh_session()
+
+        with self.count_queries() as statements:
+            second = self.client.get(f"/assignments/{assignment_id}")
+
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual(second.get_json()["mechanic"]["name"], "John Mechanic")
+        self.assertEqual(statements, [])
+
+    def test_assignment_writes_check_the_database(self):
+        self.client.get(f"/mechanics/{self.mechanic_id}", headers=self.headers)
+        self.fresh_session()
+        # Another worker deletes the mechanic; this process's cache still holds it
+        with db.engine.begin() as conn:
+            conn.execute(text("DELETE FROM mechanics WHERE id = :id"), {"id": self.mechanic_id})
+
+        response = self.client.post("/assignments", headers=self.headers, json={
+            "service_ticket_id": self.ticket_id, "mechanic_id": self.mechanic_id,
+        })
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(db.session.query(ServiceAssignment).count(), 0)
+
+    def test_missing_row_is_not_cached(self):
+        self.assertIsNone(entity_cache.get(Customer, 999))
+        self.assertEqual(entity_cache.stats()["size"], 0)
+
+
+class SmallEntityCacheConfig(TestConfig):
+    ENTITY_CACHE_SIZE = 2
+
+
+class TestEntityCacheEviction(BaseTestCase):
+
+    config_class = SmallEntityCacheConfig
+
+    def test_lru_is_bounded(self):
+        customers = [Customer(name=f"C{i}", email=f"c{i}@example.com") for i in range(3)]
+        db.session.add_all(customers)
+        db.session.commit()
+        ids = [c.id for c in customers]
+
+        for customer_id in ids:
+            entity_cache.get(Customer, customer_id)
+        db.session.expunge_all()
+
+        stats = entity_cache.stats()
+        self.assertEqual((stats["size"], stats["evictions"]), (2, 1))
+
+        # The least recently used entry went first
+        with self.count_queries() as statements:
+            entity_cache.get(Customer, ids[0])
+        self.assertEqual(len(statements), 1)
+
+
+class DisabledEntityCacheConfig(TestConfig):
+    ENTITY_CACHE_ENABLED = False
+
+
+class TestEntityCacheDisabled(BaseTestCase):
+
+    config_class = DisabledEntityCacheConfig
+
+    def test_falls_back_to_session_get(self):
+        db.session.add(Customer(name="C", email="c@example.com"))
+        db.session.commit()
+        db.session.expunge_all()
+
+        self.assertIsNotNone(entity_cache.get(Customer, 1))
+        self.assertEqual(entity_cache.stats(), {})
@@ -0,0 +1,63 @@
+import json
+
+from app.tests.base import BaseTestCase
+from extensions import db
+from models import Customer, Vehicle, ServiceTicket, Mechanic, ServiceAssignment
+
+
+class TestExport(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.customer = Customer(name="Jane Customer", email="jane@customer.com")
+        db.session.add(self.customer)
+        db.session.flush()
+
+        self.vehicle = Vehicle(
+            customer_id=self.customer.id,
+            make="Toyota",
+            model="Camry",
+            year=2020,
+            vin="123456789ABCDEFG"
+        )
+        self.mechanic = Mechanic(name="John Mechanic", email="john@shop.com", salary=55000)
+        db.session.add_all([self.vehicle, self.mechanic])
+        db.session.flush()
+
+        self.ticket = ServiceTicket(vehicle_id=self.vehicle.id, status="open", cost=12.5)
+        db.session.add(self.ticket)
+        db.session.flush()
+
+        db.session.add(ServiceAssignment(
+            service_ticket_id=self.ticket.id,
+            mechanic_id=self.mechanic.id
+        ))
+        db.session.commit()
+
+        self.headers = self.auth_header()
+
+    def _lines(self, response):
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    # EXPORT EACH ENTITY
+    def test_export_entities(self):
+        for entity in ["customers", "vehicles", "tickets", "assignments"]:
+            response = self.client.get(f"/export/{entity}.ndjson", headers=self.headers)
+            self.assertEqual(response.status_code, 200, entity)
+            self.assertEqual(response.mimetype, "application/x-ndjson")
+            self.assertEqual(len(self._lines(response)), 1, entity)
+
+    def test_export_matches_list_serialization(self):
+        response = self.client.get("/export/tickets.ndjson", headers=self.headers)
+        self.assertEqual(self._lines(response), self.client.get("/tickets").json)
+
+    def test_export_assignments_nested(self):
+        response = self.client.get("/export/assignments.ndjson", headers=self.headers)
+        row = self._lines(response)[0]
+        self.assertEqual(row["mechanic"]["email"], "john@shop.com")
+        self.assertEqual(row["ticket"]["id"], self.ticket.id)
+
+    def test_export_unknown_entity(self):
+        response = self.client.get("/export/users.ndjson", headers=self.headers)
+        self.assertEqual(response.status_code, 404)
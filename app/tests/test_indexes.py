@@ -0,0 +1,116 @@
+import datetime
+
+from sqlalchemy import event
+
+from app.tests.base import BaseTestCase
+from extensions import db
+from models import Customer, Inventory, Mechanic, ServiceAssignment, ServiceTicket, TicketPart, Vehicle
+from utils.auth import encode_token
+
+
+class TestIndexUsage(BaseTestCase):
+    """
+    EXPLAIN QUERY PLAN on each hot route's main query must show an index being used.
+
+    The statements are captured from a real request to the route, so the test
+    follows the route's query as it changes.
+    """
+
+    def setUp(self):
+        super().setUp()
+        customer = Customer(name="Jane Customer", email="jane@customer.com")
+        other = Customer(name="Other Customer", email="other@customer.com")
+        db.session.add_all([customer, other])
+        db.session.flush()
+        vehicle = Vehicle(vin="123456789ABCDEFG", make="Toyota", model="Camry",
+                          year=2020, customer_id=customer.id)
+        mechanic = Mechanic(name="John Mechanic", email="john@shop.com", salary=55000)
+        part = Inventory(name="Oil filter", price=10, quantity=5)
+        db.session.add_all([vehicle, mechanic, part])
+        db.session.flush()
+        ticket = ServiceTicket(vehicle_id=vehicle.id, description="Oil change", status="open",
+                               cost=100, date=datetime.date(2024, 1, 15))
+        db.session.add(ticket)
+        db.session.flush()
+        db.session.add_all([
+            ServiceAssignment(service_ticket_id=ticket.id, mechanic_id=mechanic.id),
+            TicketPart(ticket_id=ticket.id, part_id=part.id, quantity=1),
+        ])
+        db.session.commit()
+        self.customer_id = customer.id
+        self.ticket_id = ticket.id
+
+    def route_plan(self, method, path, match, **kwargs):
+        """Request `path` and return the query plans of the statements containing `match`."""
+        executed = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            if match in statement and not executemany:
+                executed.append((statement, parameters))
+
+        event.listen(db.engine, "after_cursor_execute", _record)
+        try:
+            response = self.client.open(path, method=method, **kwargs)
+        finally:
+            event.remove(db.engine, "after_cursor_execute", _record)
+        self.assertLess(response.status_code, 400, response.get_data(as_text=True))
+        self.assertTrue(executed, f"{method} {path} ran no statement containing {match!r}")
+
+        connection = db.session.connection()
+        plans = []
+        for statement, parameters in executed:
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            plans.append("\n".join(row[-1] for row in rows))
+        db.session.rollback()
+        return "\n\n".join(plans)
+
+    def assertRouteUsesIndex(self, method, path, match, *index_names, **kwargs):
+        plan = self.route_plan(method, path, match, **kwargs)
+        for index_name in index_names:
+            self.assertIn(index_name, plan, f"expected {index_name} in plan of {method} {path}:\n{plan}")
+
+    def test_my_tickets(self):
+        headers = {"Authorization": f"Bearer {encode_token(self.customer_id, role='customer')}"}
+        self.assertRouteUsesIndex("GET", "/customers/my-tickets", "FROM service_tickets JOIN vehicle",
+                                  "ix_vehicle_customer_id", "ix_service_tickets_vehicle_id",
+                                  headers=headers)
+
+    def test_customers_cursor(self):
+        cursor = self.client.get("/customers?after=&limit=1").get_json()["next"]
+        self.assertRouteUsesIndex("GET", f"/customers?after={cursor}&limit=1", "FROM customers",
+                                  "INTEGER PRIMARY KEY")
+
+    def test_tickets_by_status_and_date(self):
+        self.assertRouteUsesIndex("GET", "/tickets?status=open&date_from=2024-01-01",
+                                  "FROM service_tickets", "ix_service_tickets_status_date")
+
+    def test_tickets_by_vehicle(self):
+        self.assertRouteUsesIndex("GET", "/tickets?vehicle_id=1", "FROM service_tickets",
+                                  "ix_service_tickets_vehicle_id")
+
+    def test_tickets_by_date_range(self):
+        self.assertRouteUsesIndex("GET", "/tickets?date_from=2024-01-01&date_to=2024-02-01&sort=date",
+                                  "FROM service_tickets", "ix_service_tickets_date")
+
+    def test_ranked_mechanics(self):
+        self.assertRouteUsesIndex("GET", "/mechanics/ranked", "FROM mechanics",
+                                  "ix_mechanics_ticket_count")
+
+    def test_ranked_mechanics_window(self):
+        days = (datetime.date.today() - datetime.date(2024, 1, 1)).days
+        self.assertRouteUsesIndex("GET", f"/mechanics/ranked?days={days}", "FROM mechanics",
+                                  "ix_service_tickets_date")
+
+    def test_ticket_assignments(self):
+        self.assertRouteUsesIndex("PUT", f"/tickets/{self.ticket_id}/edit",
+                                  "FROM service_assignment", "sqlite_autoindex_service_assignment")
+
+    def test_release_assignments(self):
+        # DELETE /customers/<id> (and /vehicles/<id>) release the leaderboard counters first
+        self.assertRouteUsesIndex("DELETE", f"/customers/{self.customer_id}",
+                                  "FROM service_assignment JOIN service_tickets",
+                                  "ix_vehicle_customer_id", "ix_service_tickets_vehicle_id")
+
+    def test_part_line_items(self):
+        self.assertRouteUsesIndex("GET", "/inventory?include=tickets", "JOIN ticket_parts",
+                                  "ix_ticket_parts_part_id")
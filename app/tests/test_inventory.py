@@ -0,0 +1,69 @@
+from app.tests.base import BaseTestCase
+from extensions import db
+from models import Customer, Vehicle, ServiceTicket, Inventory, TicketPart
+
+
+class TestInventory(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        # Create a part used on one ticket
+        customer = Customer(name="Jane Customer", email="jane@customer.com")
+        db.session.add(customer)
+        db.session.flush()
+
+        vehicle = Vehicle(
+            customer_id=customer.id,
+            make="Toyota",
+            model="Camry",
+            year=2020,
+            vin="123456789ABCDEFG"
+        )
+        db.session.add(vehicle)
+        db.session.flush()
+
+        self.part = Inventory(name="Oil Filter", price=15.99, quantity=10)
+        self.ticket = ServiceTicket(vehicle_id=vehicle.id, status="open", cost=0)
+        self.ticket.line_items.append(TicketPart(part=self.part, quantity=1, unit_price=15.99))
+        db.session.add_all([self.part, self.ticket])
+        db.session.commit()
+
+        self.headers = self.auth_header()  # admin token
+
+    # GET ALL INVENTORY
+    def test_get_inventory(self):
+        response = self.client.get("/inventory", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("tickets", response.json[0])
+
+    def test_get_inventory_include_tickets(self):
+        response = self.client.get("/inventory?include=tickets", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t["id"] for t in response.json[0]["tickets"]], [self.ticket.id])
+
+    # CREATE INVENTORY
+    def test_add_inventory_missing_fields(self):
+        response = self.client.post("/inventory", json={"quantity": 3}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    # UPDATE INVENTORY
+    def test_update_inventory_not_found(self):
+        response = self.client.put("/inventory/999999", json={"quantity": 3}, headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    # DELETE INVENTORY
+    def test_delete_inventory_not_found(self):
+        response = self.client.delete("/inventory/999999", headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    # BULK IMPORT
+    def test_bulk_add_inventory(self):
+        payload = [{"name": f"Part {i}", "price": "4.50", "quantity": i} for i in range(5)]
+        payload.append({"name": "No Quantity", "price": "1.00"})
+        response = self.client.post("/inventory/bulk", json=payload, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["inserted"], 6)
+
+        item = db.session.query(Inventory).filter_by(name="No Quantity").one()
+        self.assertEqual(item.quantity, 0)
@@ -1,6 +1,6 @@
 from app.tests.base import BaseTestCase
 from extensions import db
-from models import Mechanic
+from models import Mechanic, Customer, Vehicle, ServiceTicket, ServiceAssignment
 
 
 class TestMechanics(BaseTestCase):
@@ -50,3 +50,58 @@ class TestMechanics(BaseTestCase):
     def test_delete_mechanic_not_found(self):
         response = self.client.delete("/mechanics/999999", headers=self.headers)
         self.assertEqual(response.status_code, 404)
+
+    # MAINTAINED LEADERBOARD
+    def _make_ticket(self):
+        customer = Customer(name="Jane Customer", email=f"jane{db.session.query(Customer).count()}@customer.com")
+        db.session.add(customer)
+        db.session.flush()
+        vehicle = Vehicle(customer_id=customer.id, make="Toyota", model="Camry",
+                          year=2020, vin=f"VIN{customer.id:014d}")
+        db.session.add(vehicle)
+        db.session.flush()
+        ticket = ServiceTicket(vehicle_id=vehicle.id, status="open", cost=0)
+        db.session.add(ticket)
+        db.session.commit()
+        return ticket.id
+
+    def test_ranked_counter_follows_assignment_writes(self):
+        other = Mechanic(name="Second Mechanic", email="second@example.com", salary=50000)
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+        ticket_ids = [self._make_ticket() for _ in range(3)]
+
+        for ticket_id in ticket_ids:
+            self.client.post("/assignments", json={
+                "service_ticket_id": ticket_id, "mechanic_id": self.mechanic.id
+            }, headers=self.headers)
+        self.client.put(f"/tickets/{ticket_ids[0]}/edit?add_ids={other_id}", headers=self.headers)
+
+        ranked = self.client.get("/mechanics/ranked").json
+        self.assertEqual([(m["id"], m["ticket_count"]) for m in ranked],
+                         [(self.mechanic.id, 3), (other_id, 1)])
+
+        self.client.delete(f"/tickets/{ticket_ids[1]}", headers=self.headers)
+        self.client.put(f"/tickets/{ticket_ids[0]}/edit?remove_ids={other_id}", headers=self.headers)
+
+        ranked = self.client.get("/mechanics/ranked?limit=5").json
+        self.assertEqual([(m["id"], m["ticket_count"]) for m in ranked], [(self.mechanic.id, 2)])
+
+    def test_ranked_time_window_and_rebuild(self):
+        ticket_id = self._make_ticket()
+        db.session.add(ServiceAssignment(service_ticket_id=ticket_id, mechanic_id=self.mechanic.id))
+        db.session.commit()
+
+        # Inserted behind the routes' back: counters drift until rebuilt
+        self.assertEqual(self.client.get("/mechanics/ranked").json, [])
+        self.assertEqual(len(self.client.get("/mechanics/ranked?days=7").json), 1)
+
+        result = self.app.test_cli_runner().invoke(args=["mechanics", "rebuild-rankings"])
+        self.assertEqual(result.exit_code, 0)
+        ranked = self.client.get("/mechanics/ranked").json
+        self.assertEqual(ranked[0]["ticket_count"], 1)
+
+    def test_ranked_invalid_limit(self):
+        response = self.client.get("/mechanics/ranked?limit=abc")
+        self.assertEqual(response.status_code, 400)
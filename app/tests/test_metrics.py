@@ -0,0 +1,113 @@
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.tests.base import BaseTestCase, TestConfig
+from extensions import db, cache
+from models import Mechanic
+from utils.auth import encode_token
+from utils.metrics import request_metrics
+from utils.sql_timing import on_timed_statement
+
+
+def bearer(role):
+    return {"Authorization": f"Bearer {encode_token(1, role=role)}"}
+
+
+class CachingConfig(TestConfig):
+    CACHE_TYPE = "SimpleCache"
+
+
+class TestRequestMetrics(BaseTestCase):
+
+    config_class = CachingConfig
+
+    def setUp(self):
+        super().setUp()
+        db.session.add(Mechanic(name="John Mechanic", email="john@shop.com", salary=55000))
+        db.session.commit()
+
+    def tearDown(self):
+        cache.clear()
+        request_metrics.clear()
+        super().tearDown()
+
+    def test_server_timing_header(self):
+        miss = self.client.get("/mechanics").headers["Server-Timing"]
+        self.assertIn("app;dur=", miss)
+        self.assertRegex(miss, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('cache;desc="miss"', miss)
+
+        hit = self.client.get("/mechanics").headers["Server-Timing"]
+        self.assertIn('desc="0 queries"', hit)
+        self.assertIn('cache;desc="hit"', hit)
+
+    def test_metrics_endpoint(self):
+        self.client.get("/mechanics")
+        self.client.get("/mechanics")
+        self.client.get("/mechanics/999")
+
+        response = self.client.get("/metrics", headers=bearer("admin"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+
+        body = response.get_data(as_text=True)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="/mechanics"} 2', body)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",route="/mechanics",le="+Inf"} 2', body)
+        self.assertIn('http_requests_total{method="GET",route="/mechanics/<int:mechanic_id>",status="404"} 1',
+                      body)
+        self.assertIn('view_cache_requests_total{route="/mechanics",result="hit"} 1', body)
+        self.assertIn('view_cache_requests_total{route="/mechanics",result="miss"} 1', body)
+        self.assertRegex(body, r'sql_queries_total\{method="GET",route="/mechanics"\} [1-9]')
+        self.assertNotIn('route="/mechanics/<int:mechanic_id>",result=', body)
+        self.assertIn("entity_cache_hits", body)
+
+    def test_metrics_endpoint_needs_admin(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/metrics", headers=bearer("mechanic")).status_code, 403)
+        # Without METRICS_TOKEN configured, no static token is accepted
+        self.assertEqual(self.client.get("/metrics", headers={"Authorization": "Bearer "}).status_code, 401)
+
+    def test_failed_statement_leaves_no_timing_state(self):
+        timed = []
+        on_timed_statement(db.engine, lambda conn, statement, *args: timed.append((statement, args[-1])))
+
+        with self.assertRaises(OperationalError):
+            db.session.execute(text("SELECT * FROM no_such_table"))
+        db.session.rollback()
+        db.session.execute(text("SELECT 1"))
+
+        self.assertEqual([statement for statement, _ in timed], ["SELECT 1"])
+        self.assertLess(timed[0][1], 1)
+        self.assertFalse(any("start" in key for key in db.session.connection().info))
+
+
+class ScrapeTokenConfig(TestConfig):
+    METRICS_TOKEN = "scrape-secret"
+
+
+class TestMetricsScrapeToken(BaseTestCase):
+
+    config_class = ScrapeTokenConfig
+
+    def test_scrape_token(self):
+        response = self.client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("http_requests_total", response.get_data(as_text=True))
+
+        self.assertEqual(self.client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code,
+                         401)
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/metrics", headers=bearer("admin")).status_code, 200)
+
+
+class DisabledConfig(TestConfig):
+    METRICS_ENABLED = False
+
+
+class TestMetricsDisabled(BaseTestCase):
+
+    config_class = DisabledConfig
+
+    def test_no_header_or_endpoint(self):
+        self.assertNotIn("Server-Timing", self.client.get("/mechanics").headers)
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+import time
+
+from app.tests.base import BaseTestCase, TestConfig
+from extensions import db
+from models import Mechanic
+from utils.auth import encode_token
+
+
+class ProfilingConfig(TestConfig):
+    PROFILE_KEEP = 2
+    PROFILE_SAMPLER_ENABLED = True
+    PROFILE_SAMPLER_INTERVAL = 0.005
+
+
+class TestProfiling(BaseTestCase):
+
+    config_class = ProfilingConfig
+
+    def setUp(self):
+        super().setUp()
+        self.app.config["PROFILE_DIR"] = tempfile.mkdtemp()
+        db.session.add(Mechanic(name="John Mechanic", email="john@shop.com", salary=55000))
+        db.session.commit()
+
+    def tearDown(self):
+        shutil.rmtree(self.app.config["PROFILE_DIR"], ignore_errors=True)
+        super().tearDown()
+
+    def bearer(self, role):
+        return {"Authorization": f"Bearer {encode_token(1, role=role)}"}
+
+    def test_admin_request_is_profiled(self):
+        response = self.client.get("/mechanics", headers={"X-Profile": "1", **self.bearer("admin")})
+        self.assertEqual(response.status_code, 200)
+        profile_id = response.headers["X-Profile-Id"]
+
+        report = self.client.get(f"/admin/profiles/{profile_id}", headers=self.bearer("admin"))
+        self.assertEqual(report.status_code, 200)
+        self.assertIn("cumulative", report.get_data(as_text=True))
+        self.assertIn("get_mechanics", report.get_data(as_text=True))
+
+        raw = self.client.get(f"/admin/profiles/{profile_id}?format=raw", headers=self.bearer("admin"))
+        self.assertEqual(raw.mimetype, "application/octet-stream")
+
+    def test_query_flag(self):
+        response = self.client.get("/mechanics?_profile=1", headers=self.bearer("admin"))
+        self.assertIn("X-Profile-Id", response.headers)
+
+    def test_flag_ignored_without_admin_token(self):
+        for headers in ({"X-Profile": "1"}, {"X-Profile": "1", **self.bearer("mechanic")}):
+            response = self.client.get("/mechanics", headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("X-Profile-Id", response.headers)
+
+    def test_unknown_or_malformed_profile_id(self):
+        admin = self.bearer("admin")
+        self.assertEqual(self.client.get("/admin/profiles/0123456789abcdef", headers=admin).status_code, 404)
+        self.assertEqual(self.client.get("/admin/profiles/..%2Fetc", headers=admin).status_code, 404)
+
+    def test_only_newest_reports_are_kept(self):
+        ids = [self.client.get("/mechanics", headers={"X-Profile": "1", **self.bearer("admin")})
+               .headers["X-Profile-Id"] for _ in range(3)]
+        admin = self.bearer("admin")
+        self.assertEqual(self.client.get(f"/admin/profiles/{ids[0]}", headers=admin).status_code, 404)
+        self.assertEqual(self.client.get(f"/admin/profiles/{ids[2]}", headers=admin).status_code, 200)
+
+    def test_sampler_aggregates_request_stacks(self):
+        sampler = self.app.extensions["stack_sampler"]
+
+        @self.app.route("/slow")
+        def slow():
+            time.sleep(0.1)
+            return "done"
+
+        self.client.get("/slow")
+        self.assertGreater(sampler.samples, 0)
+
+        flame = self.client.get("/admin/flame?reset=1", headers=self.bearer("admin"))
+        self.assertEqual(flame.status_code, 200)
+        self.assertRegex(flame.get_data(as_text=True), r";slow \(test_profiling\.py:\d+\) \d+\n")
+        self.assertEqual(sampler.samples, 0)
+
+    def test_admin_endpoints_require_admin_token(self):
+        response = self.client.get("/mechanics", headers={"X-Profile": "1", **self.bearer("admin")})
+        profile_id = response.headers["X-Profile-Id"]
+        for path in (f"/admin/profiles/{profile_id}", "/admin/flame"):
+            self.assertEqual(self.client.get(path).status_code, 401)
+            self.assertEqual(self.client.get(path, headers=self.bearer("mechanic")).status_code, 403)
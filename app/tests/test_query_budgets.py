@@ -0,0 +1,119 @@
+from flask import jsonify
+from sqlalchemy import func, select
+
+from app.tests.base import BaseTestCase
+from extensions import db
+from models import (
+    Customer, Vehicle, ServiceTicket, Mechanic, ServiceAssignment, Inventory, TicketPart, User,
+)
+from utils.decorators import QueryBudgetExceeded, query_budget
+
+
+class TestQueryBudgets(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rows = 0
+        self.seed(3)
+        self.headers = self.auth_header()
+
+    def seed(self, count=10):
+        """Add `count` customers, each with a vehicle, ticket, mechanic, part and assignment."""
+        for _ in range(count):
+            n = self.rows = self.rows + 1
+            customer = Customer(name=f"Customer {n}", email=f"customer{n}@example.com")
+            mechanic = Mechanic(name=f"Mechanic {n}", email=f"mechanic{n}@shop.com", salary=50000)
+            part = Inventory(name=f"Part {n}", price=10, quantity=5)
+            db.session.add_all([customer, mechanic, part])
+            db.session.flush()
+
+            vehicle = Vehicle(vin=f"VIN{n:014d}", make="Toyota", model="Camry",
+                              year=2020, customer_id=customer.id)
+            db.session.add(vehicle)
+            db.session.flush()
+
+            ticket = ServiceTicket(vehicle_id=vehicle.id, description="Service", status="Open", cost=100)
+            db.session.add(ticket)
+            db.session.flush()
+
+            db.session.add_all([
+                TicketPart(ticket_id=ticket.id, part_id=part.id, quantity=1, unit_price=10),
+                ServiceAssignment(service_ticket_id=ticket.id, mechanic_id=mechanic.id),
+                User(email=f"user{n}@example.com", password_hash="x", role="mechanic"),
+            ])
+        db.session.commit()
+
+    LIST_PATHS = (
+        "/tickets",
+        "/tickets?include=parts",
+        "/tickets?include=line_items,parts,assignments.mechanic",
+        "/tickets?after=&limit=2",
+        "/assignments",
+        "/assignments?include=ticket.parts",
+        "/assignments?page=1&per_page=50",
+        "/mechanics",
+        "/mechanics/ranked",
+        "/vehicles",
+        "/customers",
+        "/inventory",
+        "/inventory?include=tickets",
+        "/users",
+    )
+
+    DETAIL_PATHS = (
+        "/tickets/1",
+        "/tickets/1?include=parts,assignments.mechanic",
+        "/assignments/1",
+        "/assignments/1?include=ticket.parts",
+        "/mechanics/1",
+        "/vehicles/1",
+        "/customers/1",
+        "/users/1",
+    )
+
+    def test_every_read_route_declares_a_budget(self):
+        missing = []
+        for rule in self.app.url_map.iter_rules():
+            if "GET" not in rule.methods or rule.endpoint in ("static", "metrics", "profile_report", "flame"):
+                continue
+            if rule.endpoint.startswith(("swagger_ui", "export")):
+                continue
+            view = self.app.view_functions[rule.endpoint]
+            if getattr(view, "query_budget", None) is None:
+                missing.append(rule.rule)
+        self.assertEqual(missing, [])
+
+    def test_list_routes_within_budget(self):
+        for path in self.LIST_PATHS:
+            with self.subTest(path=path):
+                self.assertWithinBudget(path, headers=self.headers)
+
+    def test_detail_routes_within_budget(self):
+        for path in self.DETAIL_PATHS:
+            with self.subTest(path=path):
+                self.assertWithinBudget(path, headers=self.headers)
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        for path in self.LIST_PATHS:
+            with self.subTest(path=path):
+                self.assertQueriesConstant(path, self.seed, headers=self.headers)
+
+    def add_probe(self, budget):
+        # Registered before the first request, while the app still accepts routes
+        def probe():
+            counts = [db.session.scalar(select(func.count(Mechanic.id))) for _ in range(3)]
+            return jsonify(counts)
+        self.app.add_url_rule("/budget-probe", "budget_probe", query_budget(budget)(probe))
+
+    def test_overrun_raises_in_strict_mode(self):
+        self.add_probe(2)
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get("/budget-probe")
+
+    def test_overrun_is_logged_otherwise(self):
+        self.add_probe(2)
+        self.app.config["QUERY_BUDGET_STRICT"] = False
+        with self.assertLogs(self.app.logger, "WARNING") as logs:
+            response = self.client.get("/budget-probe")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ran 3 queries (budget 2)", logs.output[0])
@@ -0,0 +1,111 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from flask import jsonify
+from sqlalchemy import select
+
+from app.tests.base import BaseTestCase
+from extensions import db
+from models import Customer, Vehicle, ServiceTicket, Mechanic, Inventory
+from app.customers.schemas import customers_schema, customer_row_serializer
+from app.vehicles.schemas import vehicles_schema
+from app.mechanics.schemas import mechanics_schema
+from app.inventory.schemas import inventories_schema
+from app.service_tickets.schemas import tickets_schema, ServiceTicketSchema
+
+
+class TestRowSerializers(BaseTestCase):
+    """Fast list responses must be byte-identical to jsonify(schema.dump(objects))."""
+
+    def setUp(self):
+        super().setUp()
+        customers = [
+            Customer(name="Jane Customer", email="jane@customer.com", phone="555-1234"),
+            Customer(name="Zoë \"Quotes\" O'Neil", email="zoe@customer.com", address="Line 1\nLine 2"),
+            Customer(name="Tab\tand DEL\x7f", email="del@customer.com"),
+        ]
+        db.session.add_all(customers)
+        db.session.flush()
+
+        vehicles = [
+            Vehicle(vin=f"VIN{i:014d}", make="Toyota", model="Camry", year=2000 + i,
+                    customer_id=customers[i % 3].id)
+            for i in range(4)
+        ]
+        db.session.add_all(vehicles)
+        db.session.flush()
+
+        db.session.add_all([
+            ServiceTicket(vehicle_id=vehicles[0].id, description="Oil change", status="Open",
+                          cost=Decimal("49.9"), date=datetime.date(2024, 1, 5)),
+            ServiceTicket(vehicle_id=vehicles[1].id, description=None, status="Closed",
+                          cost=Decimal("1200"), date=datetime.date(2024, 2, 29)),
+            ServiceTicket(vehicle_id=vehicles[2].id, description="Brakes", status="Open",
+                          cost=Decimal("0.05"), date=datetime.date(2023, 12, 31)),
+        ])
+        db.session.add_all([
+            Mechanic(name="John Mechanic", email="john@shop.com", salary=Decimal("55000")),
+            Mechanic(name="Amy Mechanic", email="amy@shop.com", phone="555", salary=Decimal("61234.5")),
+        ])
+        db.session.add_all([
+            Inventory(name="Brake pad", price=Decimal("19.99"), quantity=4),
+            Inventory(name="Filter", price=Decimal("7"), quantity=0),
+        ])
+        db.session.commit()
+        self.headers = self.auth_header()
+
+    def expected(self, schema, query):
+        objects = db.session.execute(query).scalars().all()
+        return jsonify(schema.dump(objects)).get_data()
+
+    def assertSameBytes(self, url, schema, query):
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(), self.expected(schema, query))
+
+    def test_customers(self):
+        self.assertSameBytes("/customers?page=1&per_page=10", customers_schema,
+                             select(Customer).order_by(Customer.id))
+
+    def test_customers_cursor_envelope(self):
+        response = self.client.get("/customers?limit=2")
+        objects = db.session.execute(select(Customer).order_by(Customer.id).limit(2)).scalars().all()
+        expected = jsonify({"items": customers_schema.dump(objects), "next": response.get_json()["next"]})
+        self.assertEqual(response.get_data(), expected.get_data())
+
+    def test_vehicles(self):
+        self.assertSameBytes("/vehicles", vehicles_schema, select(Vehicle))
+
+    def test_mechanics(self):
+        self.assertSameBytes("/mechanics", mechanics_schema, select(Mechanic))
+
+    def test_inventory(self):
+        self.assertSameBytes("/inventory", inventories_schema, select(Inventory))
+
+    def test_tickets(self):
+        self.assertSameBytes("/tickets", tickets_schema, select(ServiceTicket).order_by(ServiceTicket.id))
+        self.assertSameBytes("/tickets?sort=-date&status=Open", tickets_schema,
+                             select(ServiceTicket).where(ServiceTicket.status == "Open")
+                             .order_by(ServiceTicket.date.desc(), ServiceTicket.id.desc()))
+
+    def test_stdlib_fallback_is_identical(self):
+        with mock.patch("utils.serializers.orjson", None):
+            self.assertSameBytes("/customers?page=1&per_page=10", customers_schema,
+                                 select(Customer).order_by(Customer.id))
+
+    def test_debug_mode_is_identical(self):
+        self.app.debug = True
+        try:
+            self.assertSameBytes("/mechanics", mechanics_schema, select(Mechanic))
+        finally:
+            self.app.debug = False
+
+    def test_nested_schema_does_not_compile(self):
+        from utils.serializers import RowSerializer
+        with self.assertRaises(ValueError):
+            RowSerializer(ServiceTicketSchema(many=True))
+
+    def test_selects_only_dumped_columns(self):
+        columns = [c.name for c in customer_row_serializer.select().selected_columns]
+        self.assertEqual(columns, list(customers_schema.dump_fields))
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from sqlalchemy import select, text
+
+from app.tests.base import BaseTestCase, TestConfig
+from extensions import db
+from models import Customer, Mechanic
+from utils.slow_query import redact_parameters
+
+
+class SlowQueryConfig(TestConfig):
+    # Every statement counts as slow
+    SLOW_QUERY_THRESHOLD_MS = 0
+    SLOW_QUERY_LOG_LIMIT = 2
+
+
+class TestSlowQueryLog(BaseTestCase):
+
+    config_class = SlowQueryConfig
+
+    def setUp(self):
+        super().setUp()
+        db.session.add(Mechanic(name="John Mechanic", email="john@shop.com", salary=55000))
+        db.session.commit()
+        self.logger = f"{self.app.name}.slow_query"
+
+    def test_logs_route_blueprint_and_plan(self):
+        with self.assertLogs(self.logger, "WARNING") as logs:
+            self.client.get("/mechanics/ranked")
+
+        record = logs.records[-1].slow_query
+        self.assertEqual(record["route"], "/mechanics/ranked")
+        self.assertEqual(record["blueprint"], "mechanics")
+        self.assertEqual(record["method"], "GET")
+        self.assertTrue(record["statement"].lstrip().upper().startswith("SELECT"))
+        self.assertTrue(any("mechanics" in line for line in record["plan"]))
+        self.assertIn("plan:", logs.output[-1])
+
+    def test_string_parameters_are_redacted(self):
+        with self.assertLogs(self.logger, "WARNING") as logs:
+            db.session.execute(select(Customer).where(Customer.email == "secret@example.com"))
+
+        record = logs.records[-1].slow_query
+        self.assertNotIn("secret@example.com", logs.output[-1])
+        self.assertEqual(list(record["parameters"].values()), ["<str len=18>"])
+
+    def test_writes_are_not_explained(self):
+        with self.assertLogs(self.logger, "WARNING") as logs:
+            db.session.execute(text("UPDATE mechanics SET salary = salary + 1"))
+        self.assertIsNone(logs.records[-1].slow_query["plan"])
+        db.session.rollback()
+
+    def test_failed_explain_leaves_transaction_usable(self):
+        db.session.add(Mechanic(name="Pending Mechanic", email="pending@shop.com", salary=1))
+        db.session.flush()
+        with mock.patch("utils.slow_query.explain_prefix", return_value="NOT VALID SQL "), \
+                self.assertLogs(self.logger, "WARNING") as logs:
+            count = db.session.execute(text("SELECT count(*) FROM mechanics")).scalar()
+
+        self.assertEqual(count, 2)
+        self.assertTrue(logs.records[-1].slow_query["plan"][0].startswith("EXPLAIN failed"))
+        db.session.commit()
+        self.assertEqual(db.session.query(Mechanic).count(), 2)
+
+    def test_repeated_statement_is_rate_limited(self):
+        statement = text("SELECT count(*) FROM mechanics WHERE salary > :floor")
+        with self.assertLogs(self.logger, "WARNING") as logs:
+            for _ in range(5):
+                db.session.execute(statement, {"floor": 1000})
+        self.assertEqual(len(logs.records), 2)
+
+        recorder = self.app.extensions["slow_query_log"]
+        recorder._window_start -= recorder.window   # next window
+        with self.assertLogs(self.logger, "WARNING") as logs:
+            db.session.execute(statement, {"floor": 1000})
+        self.assertEqual(logs.records[0].slow_query_suppressed, {"occurrences": 3, "statements": 1})
+        self.assertIn("salary > ?", logs.records[1].slow_query["statement"])
+        self.assertEqual(recorder._suppressed, {})
+
+    def test_total_lines_per_window_are_capped(self):
+        recorder = self.app.extensions["slow_query_log"]
+        recorder._window_start -= recorder.window   # start a fresh window
+        recorder.total_limit = 3
+        with self.assertLogs(self.logger, "WARNING") as logs:
+            for floor in range(5):
+                db.session.execute(text(f"SELECT count(*) FROM mechanics WHERE salary > {floor}"))
+        self.assertEqual(len([r for r in logs.records if hasattr(r, "slow_query")]), 3)
+        self.assertEqual(len(recorder._suppressed), 2)
+
+    def test_executemany_parameters_are_summarized(self):
+        summary = redact_parameters([("a", 1), ("b", 2)], executemany=True)
+        self.assertEqual(summary, {"rows": 2, "first": ["<str len=1>", 1]})
+
+
+class TestSlowQueryThreshold(BaseTestCase):
+
+    def test_fast_queries_are_not_logged(self):
+        with self.assertNoLogs(f"{self.app.name}.slow_query", "WARNING"):
+            self.client.get("/mechanics")
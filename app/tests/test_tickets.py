@@ -1,6 +1,19 @@
-from app.tests.base import BaseTestCase
+import datetime
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.tests.base import BaseTestCase, TestConfig
+from run import create_app
 from extensions import db
-from models import ServiceTicket, Vehicle, Customer, Mechanic, Inventory
+from utils.pagination import MAX_LIMIT
+from models import ServiceTicket, Vehicle, Customer, Mechanic, Inventory, ServiceAssignment, TicketPart
 
 
 class TestTickets(BaseTestCase):
@@ -100,3 +113,298 @@ class TestTickets(BaseTestCase):
     def test_edit_mechanics_ticket_not_found(self):
         response = self.client.put("/tickets/999999/edit?add_ids=1&remove_ids=2", headers=self.headers)
         self.assertEqual(response.status_code, 404)
+
+    # FILTERED + SORTED TICKETS
+    def _add_tickets(self):
+        for day, status in [(1, "open"), (2, "closed"), (3, "open"), (4, "open")]:
+            db.session.add(ServiceTicket(
+                vehicle_id=self.vehicle.id,
+                date=datetime.date(2024, 1, day),
+                description=f"Ticket {day}",
+                status=status,
+                cost=10
+            ))
+        db.session.commit()
+
+    def test_get_tickets_filtered(self):
+        self._add_tickets()
+        response = self.client.get(
+            "/tickets?status=open&date_from=2024-01-02&date_to=2024-01-31&sort=-date",
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t["date"] for t in response.json], ["2024-01-04", "2024-01-03"])
+
+    def test_get_tickets_cursor_by_date(self):
+        self._add_tickets()
+        dates = []
+        url = "/tickets?sort=date&limit=2&date_to=2024-12-31"
+        while url:
+            response = self.client.get(url, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            dates.extend(t["date"] for t in response.json["items"])
+            cursor = response.json["next"]
+            url = f"/tickets?sort=date&limit=2&date_to=2024-12-31&after={cursor}" if cursor else None
+        self.assertEqual(dates, ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"])
+
+    def test_get_tickets_without_cursor_links_to_the_rest(self):
+        db.session.execute(insert(ServiceTicket), [
+            {"vehicle_id": self.vehicle.id, "date": datetime.date(2024, 1, 1),
+             "description": f"Bulk {i}", "status": "open", "cost": 0}
+            for i in range(MAX_LIMIT + 5)
+        ])
+        db.session.commit()
+        expected = db.session.execute(select(ServiceTicket.id).order_by(ServiceTicket.id)).scalars().all()
+
+        response = self.client.get("/tickets", headers=self.headers)
+        self.assertEqual(len(response.json), MAX_LIMIT)
+        ids = [t["id"] for t in response.json]
+        self.assertEqual(response.headers["Link"],
+                         f'</tickets?after={response.headers["X-Next-Cursor"]}&limit={MAX_LIMIT}>; rel="next"')
+
+        url = response.headers["Link"][1:response.headers["Link"].index(">")]
+        while url:
+            page = self.client.get(url, headers=self.headers).json
+            ids.extend(t["id"] for t in page["items"])
+            url = f"/tickets?after={page['next']}&limit={MAX_LIMIT}" if page["next"] else None
+        self.assertEqual(ids, expected)
+
+        # A list that fits under the cap carries no continuation
+        self.assertNotIn("X-Next-Cursor", self.client.get("/tickets?status=closed", headers=self.headers).headers)
+
+    def test_get_tickets_invalid_filters(self):
+        for query in ["sort=cost", "date_from=yesterday", "vehicle_id=abc", "limit=0"]:
+            response = self.client.get(f"/tickets?{query}", headers=self.headers)
+            self.assertEqual(response.status_code, 400, query)
+
+    # ?include= RELATIONSHIP LOADING
+    def test_get_ticket_without_include_omits_relationships(self):
+        response = self.client.get(f"/tickets/{self.ticket.id}", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("parts", response.json)
+        self.assertNotIn("assignments", response.json)
+
+    def test_get_ticket_include_parts_and_mechanics(self):
+        db.session.add(TicketPart(ticket_id=self.ticket.id, part_id=self.part.id, quantity=1))
+        db.session.add(ServiceAssignment(service_ticket_id=self.ticket.id, mechanic_id=self.mechanic.id))
+        db.session.commit()
+
+        response = self.client.get(
+            f"/tickets/{self.ticket.id}?include=parts,assignments.mechanic",
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["name"] for p in response.json["parts"]], ["Oil Filter"])
+        self.assertEqual(response.json["assignments"][0]["mechanic"]["name"], "John Mechanic")
+
+    def test_get_tickets_unknown_include(self):
+        response = self.client.get("/tickets?include=vehicle", headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+
+    # SET-BASED MECHANIC SYNC
+    def _assigned_mechanics(self):
+        return sorted(db.session.execute(
+            select(ServiceAssignment.mechanic_id)
+            .where(ServiceAssignment.service_ticket_id == self.ticket.id)
+        ).scalars())
+
+    def test_edit_mechanics_add_and_remove(self):
+        other = Mechanic(name="Other Mechanic", email="other@shop.com", salary=50000)
+        db.session.add(other)
+        db.session.commit()
+        mechanic_id, other_id = self.mechanic.id, other.id
+
+        response = self.client.put(
+            f"/tickets/{self.ticket.id}/edit?add_ids={mechanic_id}&add_ids={other_id}&add_ids=999",
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["added"], [mechanic_id, other_id])
+        self.assertEqual(self._assigned_mechanics(), [mechanic_id, other_id])
+
+        # Re-adding is a no-op; removal happens in the same call
+        response = self.client.put(
+            f"/tickets/{self.ticket.id}/edit?add_ids={mechanic_id}&remove_ids={other_id}",
+            headers=self.headers
+        )
+        self.assertEqual(response.json["added"], [])
+        self.assertEqual(response.json["removed"], [other_id])
+        self.assertEqual(self._assigned_mechanics(), [mechanic_id])
+
+    def test_edit_mechanics_constant_queries(self):
+        mechanics = [Mechanic(name=f"M{i}", email=f"m{i}@shop.com", salary=1) for i in range(10)]
+        db.session.add_all(mechanics)
+        db.session.commit()
+        ids = "&".join(f"add_ids={m.id}" for m in mechanics)
+
+        with self.count_queries() as statements:
+            response = self.client.put(f"/tickets/{self.ticket.id}/edit?{ids}", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len([s for s in statements if "mechanics" in s or "service_assignment" in s]), 5)
+
+    def test_edit_mechanics_invalid_id(self):
+        response = self.client.put(f"/tickets/{self.ticket.id}/edit?add_ids=abc", headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_duplicate_assignment_rejected_by_database(self):
+        db.session.add(ServiceAssignment(service_ticket_id=self.ticket.id, mechanic_id=self.mechanic.id))
+        db.session.commit()
+        db.session.add(ServiceAssignment(service_ticket_id=self.ticket.id, mechanic_id=self.mechanic.id))
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+    # LINE ITEMS + STOCK
+    def test_add_part_creates_and_grows_line_item(self):
+        url = f"/tickets/{self.ticket.id}/add_part"
+        response = self.client.post(url, json={"part_id": self.part.id, "quantity": 3}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["line_item"]["quantity"], 3)
+        self.assertEqual(response.json["line_item"]["unit_price"], "15.99")
+        self.assertEqual(response.json["remaining_stock"], 7)
+
+        response = self.client.post(url, json={"part_id": self.part.id, "quantity": 2}, headers=self.headers)
+        self.assertEqual(response.json["line_item"]["quantity"], 5)
+        self.assertEqual(response.json["remaining_stock"], 5)
+
+        response = self.client.get(f"/tickets/{self.ticket.id}?include=line_items", headers=self.headers)
+        self.assertEqual(response.json["line_items"], [{"part_id": self.part.id, "quantity": 5, "unit_price": "15.99"}])
+
+    def test_add_part_insufficient_stock(self):
+        response = self.client.post(
+            f"/tickets/{self.ticket.id}/add_part",
+            json={"part_id": self.part.id, "quantity": 11},
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(db.session.get(Inventory, self.part.id).quantity, 10)
+
+    def test_add_part_unknown_part_and_bad_quantity(self):
+        url = f"/tickets/{self.ticket.id}/add_part"
+        response = self.client.post(url, json={"part_id": 999999, "quantity": 1}, headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(url, json={"part_id": self.part.id, "quantity": 0}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_update_ticket_concurrent_edit_conflicts(self):
+        # Load the ticket, then let "another request" bump its row version
+        db.session.get(ServiceTicket, self.ticket.id)
+        db.session.execute(text("UPDATE service_tickets SET version_id = version_id + 1"))
+
+        response = self.client.put(f"/tickets/{self.ticket.id}", json={"status": "Closed"},
+                                   headers=self.auth_header())
+        self.assertEqual(response.status_code, 409)
+
+    def test_delete_ticket_concurrent_edit_conflicts(self):
+        ticket_id = self.ticket.id
+        db.session.get(ServiceTicket, ticket_id)
+        db.session.execute(text("UPDATE service_tickets SET version_id = version_id + 1"))
+
+        response = self.client.delete(f"/tickets/{ticket_id}", headers=self.auth_header())
+        self.assertEqual(response.status_code, 409)
+        self.assertIsNotNone(db.session.get(ServiceTicket, ticket_id))
+
+    def test_edit_mechanics_concurrent_edit_conflicts(self):
+        ticket_id, mechanic_id = self.ticket.id, self.mechanic.id
+        with mock.patch.object(db.session, "commit", side_effect=StaleDataError("version mismatch")):
+            response = self.client.put(f"/tickets/{ticket_id}/edit?add_ids={mechanic_id}",
+                                       headers=self.headers)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self._assigned_mechanics(), [])
+
+
+class CachedTicketsConfig(TestConfig):
+    CACHE_TYPE = "SimpleCache"
+
+
+class TestCachedTickets(BaseTestCase):
+
+    config_class = CachedTicketsConfig
+
+    def test_filtered_views_cached_independently(self):
+        customer = Customer(name="Jane Customer", email="jane@customer.com")
+        db.session.add(customer)
+        db.session.flush()
+        vehicle = Vehicle(customer_id=customer.id, make="Toyota", model="Camry",
+                          year=2020, vin="123456789ABCDEFG")
+        db.session.add(vehicle)
+        db.session.flush()
+        db.session.add_all([
+            ServiceTicket(vehicle_id=vehicle.id, status="open", cost=0),
+            ServiceTicket(vehicle_id=vehicle.id, status="closed", cost=0),
+        ])
+        db.session.commit()
+
+        open_tickets = self.client.get("/tickets?status=open").json
+        closed_tickets = self.client.get("/tickets?status=closed").json
+        self.assertEqual([t["status"] for t in open_tickets], ["open"])
+        self.assertEqual([t["status"] for t in closed_tickets], ["closed"])
+
+
+class FileDatabaseConfig(TestConfig):
+    # Set per test run in TestConcurrentStock.setUp
+    SQLALCHEMY_DATABASE_URI = None
+    SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 30, "check_same_thread": False}}
+
+
+class TestConcurrentStock(unittest.TestCase):
+    """Many threads pulling the same part against a real (file-backed) SQLite database."""
+
+    THREADS = 24
+    STOCK = 10
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        config = type("Config", (FileDatabaseConfig,), {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(self.tmpdir.name, 'stock.db')}"
+        })
+        self.app = create_app(config)
+
+        with self.app.app_context():
+            db.create_all()
+            customer = Customer(name="Jane Customer", email="jane@customer.com")
+            db.session.add(customer)
+            db.session.flush()
+            vehicle = Vehicle(customer_id=customer.id, make="Toyota", model="Camry",
+                              year=2020, vin="123456789ABCDEFG")
+            db.session.add(vehicle)
+            db.session.flush()
+            ticket = ServiceTicket(vehicle_id=vehicle.id, status="open", cost=0)
+            part = Inventory(name="Oil Filter", price=15.99, quantity=self.STOCK)
+            db.session.add_all([ticket, part])
+            db.session.commit()
+            self.ticket_id, self.part_id = ticket.id, part.id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def test_concurrent_add_part_never_oversells(self):
+        barrier = threading.Barrier(self.THREADS)
+        statuses = []
+
+        def pull_one():
+            client = self.app.test_client()
+            barrier.wait()
+            response = client.post(
+                f"/tickets/{self.ticket_id}/add_part",
+                json={"part_id": self.part_id, "quantity": 1}
+            )
+            statuses.append(response.status_code)
+
+        threads = [threading.Thread(target=pull_one) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses.count(200), self.STOCK)
+        self.assertEqual(statuses.count(409), self.THREADS - self.STOCK)
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Inventory, self.part_id).quantity, 0)
+            line = db.session.get(TicketPart, (self.ticket_id, self.part_id))
+            self.assertEqual(line.quantity, self.STOCK)
@@ -1,4 +1,7 @@
-from app.tests.base import BaseTestCase
+from flask import current_app
+from werkzeug.security import generate_password_hash
+
+from app.tests.base import BaseTestCase, TestConfig
 from extensions import db
 from models import User
 
@@ -72,3 +75,46 @@ class TestUsers(BaseTestCase):
     def test_delete_user_not_found(self):
         response = self.client.delete("/users/999999", headers=self.headers)
         self.assertEqual(response.status_code, 404)
+
+    # LOGIN REHASHES OUTDATED PASSWORD HASHES
+    def test_login_rehashes_outdated_hash(self):
+        self.user.password_hash = generate_password_hash("password123", method="pbkdf2:sha256:1000")
+        db.session.commit()
+
+        response = self.client.post("/users/login", json={"email": "john@example.com", "password": "password123"})
+        self.assertEqual(response.status_code, 200)
+
+        db.session.refresh(self.user)
+        self.assertTrue(self.user.password_hash.startswith("scrypt:32768:8:1$"))
+        self.assertFalse(self.user.password_needs_rehash())
+        self.assertTrue(self.user.check_password("password123"))
+
+    # HASHING SATURATED -> 503
+    def test_login_sheds_load_when_hasher_saturated(self):
+        pool = current_app.extensions["password_hasher"]
+        pool.wait = 0
+        for _ in range(current_app.config["PASSWORD_HASH_CONCURRENCY"]):
+            pool._slots.acquire()
+
+        response = self.client.post("/users/login", json={"email": "john@example.com", "password": "password123"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+
+class PooledHashingConfig(TestConfig):
+    PASSWORD_HASH_WORKERS = 1
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+
+
+class TestPooledPasswordHashing(BaseTestCase):
+
+    config_class = PooledHashingConfig
+
+    def test_hash_and_verify_in_pool(self):
+        user = self.create_user(email="pool@example.com", password="secret123")
+        self.assertTrue(user.password_hash.startswith("pbkdf2:sha256:1000$"))
+
+        response = self.client.post("/users/login", json={"email": "pool@example.com", "password": "secret123"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post("/users/login", json={"email": "pool@example.com", "password": "wrong"})
+        self.assertEqual(response.status_code, 401)
@@ -56,3 +56,21 @@ class TestVehicles(BaseTestCase):
     def test_delete_vehicle_not_found(self):
         response = self.client.delete("/vehicles/999999", headers=self.headers)
         self.assertEqual(response.status_code, 404)
+
+    # BULK IMPORT
+    def test_bulk_create_vehicles_csv(self):
+        body = (
+            "vin,make,model,year,customer_id\n"
+            f"VINBULK0000000001,Honda,Civic,2019,{self.customer.id}\n"
+            f"123456789ABCDEFG,Ford,Focus,2018,{self.customer.id}\n"   # VIN already registered
+            "VINBULK0000000002,Kia,Rio,2021,999999\n"                  # unknown customer
+        )
+        response = self.client.post(
+            "/vehicles/bulk", data=body, content_type="text/csv", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json["inserted"], 1)
+        self.assertEqual(
+            {e["row"]: list(e["errors"]) for e in response.json["errors"]},
+            {1: ["vin"], 2: ["customer_id"]}
+        )
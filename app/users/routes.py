@@ -6,8 +6,16 @@ from extensions import db
 from models import User
 from .schemas import user_schema, users_schema, login_schema
 from . import user_bp
-from utils.auth import encode_token
-from utils.decorators import auth_required
+from utils.auth import encode_token, revoke_token
+from utils.decorators import auth_required, bearer_token, query_budget
+from utils.entity_cache import entity_cache
+from utils.passwords import PasswordHasherBusy
+
+
+@user_bp.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(e):
+    """register/login/update_user hash passwords; shed load instead of queueing forever."""
+    return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
 
 
 # REGISTER USER
@@ -58,6 +66,11 @@ def login():
     if not user or not user.check_password(creds["password"]):
         return jsonify({"error": "Invalid credentials"}), 401
 
+    # Upgrade hashes made with an older PASSWORD_HASH_METHOD while we have the password
+    if user.password_needs_rehash():
+        user.set_password(creds["password"])
+        db.session.commit()
+
     token = encode_token(user.id, role=user.role)
 
     return jsonify({
@@ -66,8 +79,20 @@ def login():
     }), 200
 
 
+# LOGOUT USER
+@user_bp.route("/logout", methods=["POST"])
+@auth_required()
+def logout(requester_id, role):
+    """POST /users/logout - Revoke the presented JWT."""
+    token = bearer_token()
+    if token:
+        revoke_token(token)
+    return jsonify({"message": "Logged out"}), 200
+
+
 # GET ALL USERS (ADMIN ONLY)
 @user_bp.route("", methods=["GET"])
+@query_budget(1)
 @auth_required("admin")
 def get_users(requester_id, role):
     """GET /users - List all users (admin only)."""
@@ -77,10 +102,11 @@ def get_users(requester_id, role):
 
 # GET SINGLE USER (ADMIN + MECHANIC)
 @user_bp.route("/<int:user_id>", methods=["GET"])
+@query_budget(1)
 @auth_required("admin", "mechanic")
 def get_user(requester_id, role, user_id):
     """GET /users/<id> - Get a single user."""
-    user = db.session.get(User, user_id)
+    user = entity_cache.get(User, user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -3,34 +3,29 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from marshmallow import ValidationError
 
-from extensions import db, limiter, cache
-from models import Vehicle
-from .schemas import vehicle_schema, vehicles_schema
+from extensions import db, limiter
+from models import Customer, Vehicle
+from .schemas import vehicle_schema, vehicle_bulk_schema, vehicle_row_serializer
 from . import vehicle_bp
-from utils.decorators import auth_required
+from utils.decorators import auth_required, query_budget
+from utils.entity_cache import entity_cache
+from utils.cache_tags import bump_tags, cached_view
+from app.mechanics.leaderboard import release_assignments
+from utils.bulk import BulkPayloadError, bulk_import, exists_check, parse_bulk_rows, unique_check
 
 
 # GET /vehicles
 @vehicle_bp.route("", methods=["GET"])
+@query_budget(1)
+@cached_view(timeout=600, tags=("vehicles",))
 def get_vehicles():
     """
     GET /vehicles
     Returns all vehicles.
-    Caching is DISABLED during tests to prevent request freezing.
+    Cached until a vehicle write bumps the "vehicles" tag.
     """
-    if not current_app.config.get("TESTING"):
-        # Only apply caching in production
-        @cache.cached(timeout=120)
-        def _cached():
-            query = select(Vehicle)
-            vehicles = db.session.execute(query).scalars().all()
-            return jsonify(vehicles_schema.dump(vehicles)), 200
-        return _cached()
-
-    # Test mode: no caching wrapper
-    query = select(Vehicle)
-    vehicles = db.session.execute(query).scalars().all()
-    return jsonify(vehicles_schema.dump(vehicles)), 200
+    rows = db.session.execute(vehicle_row_serializer.select()).all()
+    return vehicle_row_serializer.response(rows), 200
 
 
 # POST /vehicles
@@ -66,16 +61,41 @@ def create_vehicle(user_id, role):
         db.session.rollback()
         return jsonify({"error": "Database error during vehicle creation."}), 500
 
+    bump_tags("vehicles")
     return jsonify({
         "message": f"Vehicle created by {role} (user {user_id})",
         "vehicle": vehicle_schema.dump(vehicle_data)
     }), 201
 
 
+# POST /vehicles/bulk
+@vehicle_bp.route("/bulk", methods=["POST"])
+@auth_required("admin")
+@limiter.limit("20 per hour")
+def bulk_create_vehicles(user_id, role):
+    """
+    POST /vehicles/bulk
+    Import vehicles from a JSON array or CSV (admin only).
+    """
+    try:
+        rows = parse_bulk_rows(request)
+    except BulkPayloadError as e:
+        return jsonify({"error": str(e)}), 400
+
+    report = bulk_import(Vehicle, vehicle_bulk_schema, rows, checks=[
+        exists_check(Customer.id, "customer_id", "Customer not found."),
+        unique_check(Vehicle.vin, "vin", "VIN already registered."),
+    ])
+    if report["inserted"]:
+        bump_tags("vehicles")
+    return jsonify(report), (201 if not report["failed"] else 207)
+
+
 # GET /vehicles/<id>
 @vehicle_bp.route("/<int:vehicle_id>", methods=["GET"])
+@query_budget(1)
 def get_vehicle(vehicle_id):
-    vehicle = db.session.get(Vehicle, vehicle_id)
+    vehicle = entity_cache.get(Vehicle, vehicle_id)
     if not vehicle:
         return jsonify({"error": "Vehicle not found."}), 404
     return jsonify(vehicle_schema.dump(vehicle)), 200
@@ -117,6 +137,7 @@ def update_vehicle(user_id, role, vehicle_id):
         db.session.rollback()
         return jsonify({"error": "Database integrity error during update."}), 500
 
+    bump_tags("vehicles")
     return jsonify({
         "message": f"Vehicle updated by {role} (user {user_id})",
         "vehicle": vehicle_schema.dump(updated_vehicle)
@@ -131,6 +152,7 @@ def delete_vehicle(user_id, role, vehicle_id):
     if not vehicle:
         return jsonify({"error": "Vehicle not found."}), 404
 
+    release_assignments(Vehicle.id == vehicle_id)
     db.session.delete(vehicle)
     try:
         db.session.commit()
@@ -138,4 +160,5 @@ def delete_vehicle(user_id, role, vehicle_id):
         db.session.rollback()
         return jsonify({"error": "Database error during deletion."}), 500
 
+    bump_tags("vehicles", "tickets", "assignments", "mechanics")
     return jsonify({"message": f"Vehicle {vehicle_id} deleted by admin (user {user_id})"}), 200
\ No newline at end of file
@@ -1,5 +1,6 @@
 # app/vehicles/schemas.py
 from extensions import ma
+from utils.serializers import RowSerializer
 from models import Vehicle
 
 class VehicleSchema(ma.SQLAlchemyAutoSchema):
@@ -10,3 +11,5 @@ class VehicleSchema(ma.SQLAlchemyAutoSchema):
 
 vehicle_schema = VehicleSchema()
 vehicles_schema = VehicleSchema(many=True)
+vehicle_row_serializer = RowSerializer(vehicles_schema)  # list endpoints: Core rows, no per-object dump
+vehicle_bulk_schema = VehicleSchema(load_instance=False)  # plain dicts for executemany
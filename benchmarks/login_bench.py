@@ -0,0 +1,101 @@
+# benchmarks/login_bench.py
+"""
+Login throughput under concurrent load, inline hashing vs the hashing pool.
+
+    python -m benchmarks.login_bench [--logins 64] [--threads 16] [--workers 0 2 4]
+
+Each run creates a fresh app on a temporary SQLite file, registers one user,
+then fires --logins concurrent POST /users/login from --threads threads while
+another thread keeps requesting GET /mechanics. Reported: logins/second and
+the p50/p95 latency of the unrelated GET while logins are in flight.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from extensions import db
+from models import User
+
+
+def _config(workers, db_path):
+    class BenchConfig:
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        CACHE_TYPE = "NullCache"
+        RATELIMIT_ENABLED = False
+        PASSWORD_HASH_WORKERS = workers
+        PASSWORD_HASH_CONCURRENCY = max(workers, 1) * 4
+        PASSWORD_HASH_WAIT = 60
+    return BenchConfig
+
+
+def run(workers, logins, threads):
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    app = create_app(_config(workers, db_path))
+    with app.app_context():
+        db.create_all()
+        user = User(email="bench@example.com", role="mechanic")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.commit()
+
+    # Warm the pool so process start-up is not counted
+    app.test_client().post("/users/login", json={"email": "bench@example.com", "password": "password123"})
+
+    done = threading.Event()
+    side_latencies = []
+
+    def side_traffic():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get("/mechanics")
+            side_latencies.append(time.perf_counter() - start)
+
+    def login(_):
+        response = app.test_client().post(
+            "/users/login", json={"email": "bench@example.com", "password": "password123"}
+        )
+        assert response.status_code == 200, response.status_code
+
+    side = threading.Thread(target=side_traffic)
+    side.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    side.join()
+    os.remove(db_path)
+
+    side_latencies.sort()
+    p95 = side_latencies[int(len(side_latencies) * 0.95) - 1] if side_latencies else 0.0
+    return {
+        "workers": workers,
+        "logins_per_s": logins / elapsed,
+        "side_p50_ms": statistics.median(side_latencies) * 1000 if side_latencies else 0.0,
+        "side_p95_ms": p95 * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    args = parser.parse_args()
+
+    print(f"{'workers':>7}  {'logins/s':>9}  {'GET p50 ms':>10}  {'GET p95 ms':>10}")
+    for workers in args.workers:
+        r = run(workers, args.logins, args.threads)
+        print(f"{r['workers']:>7}  {r['logins_per_s']:>9.1f}  {r['side_p50_ms']:>10.2f}  {r['side_p95_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
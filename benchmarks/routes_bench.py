@@ -0,0 +1,229 @@
+# benchmarks/routes_bench.py
+"""
+Latency, queries and memory for every GET route at a seeded scale.
+
+    python -m benchmarks.routes_bench [--scale 0.01] [--iterations 20]
+                                      [--output routes.json] [--baseline old.json]
+
+A fresh app on a temporary SQLite file (or --database-url) is filled by
+benchmarks/seed.py. Then every GET rule registered by create_app is requested
+through the test client, along with the query-string variants in VARIANTS.
+Path arguments come from PATH_VALUES (integers default to 1), and requests
+carry an admin token.
+
+Per case the JSON report holds p50/p95/p99 latency in ms, SQL statements per
+request, and the tracemalloc peak of one extra request in KiB. The view cache
+is NullCache unless --cache says otherwise, and the per-process entity cache
+and the warm-up are off, so the numbers describe the database path. Write routes are listed under "skipped": they would change the data the
+later cases read.
+
+With --baseline, cases whose p95 or peak memory grew by more than
+--threshold (default 20%), or whose query count grew at all, are printed.
+The exit status is then 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import sqlalchemy
+from sqlalchemy import event
+
+from app import create_app
+from benchmarks.seed import seed_database
+from extensions import db
+from utils.auth import encode_token
+
+SKIPPED_ENDPOINTS = ("static",)
+SKIPPED_PREFIXES = ("swagger_ui.",)
+
+# Values for path arguments that are not plain integer ids
+PATH_VALUES = {"entity": "customers"}
+
+# Extra query strings timed on top of the bare route
+VARIANTS = {
+    "/tickets": ("?include=parts", "?after=&limit=50", "?status=Open&sort=-date&after=&limit=50"),
+    "/tickets/<int:ticket_id>": ("?include=parts,assignments.mechanic",),
+    "/assignments": ("?page=1&per_page=50", "?include=ticket.parts&after=&limit=50"),
+    "/assignments/<int:assignment_id>": ("?include=ticket.parts",),
+    "/inventory": ("?include=tickets",),
+}
+
+
+def _config(database_url, cache_type):
+    class BenchConfig:
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        CACHE_TYPE = cache_type
+        CACHE_NO_NULL_WARNING = True
+        RATELIMIT_ENABLED = False
+        PASSWORD_HASH_WORKERS = 0
+        # Detail routes would otherwise be served from the entity cache with 0 queries
+        ENTITY_CACHE_ENABLED = False
+        CACHE_WARMUP = False
+    return BenchConfig
+
+
+def _cases(app):
+    cases, skipped = [], []
+    adapter = app.url_map.bind("localhost")
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if rule.endpoint in SKIPPED_ENDPOINTS or rule.endpoint.startswith(SKIPPED_PREFIXES):
+            continue
+        for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+            if method != "GET":
+                skipped.append(f"{method} {rule.rule}")
+                continue
+            values = {arg: PATH_VALUES.get(arg, 1) for arg in rule.arguments}
+            path = adapter.build(rule.endpoint, values, method="GET")
+            for query in ("",) + VARIANTS.get(rule.rule, ()):
+                cases.append(path + query)
+    return cases, skipped
+
+
+def _percentile(sorted_values, pct):
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _get(client, path, headers):
+    # Read the body so streamed responses (the NDJSON exports) are generated in full
+    response = client.get(path, headers=headers)
+    response.get_data()
+    response.close()
+    return response.status_code
+
+
+def _measure(client, path, headers, iterations, statements):
+    status = _get(client, path, headers)   # warm-up, not timed
+
+    latencies = []
+    statements.clear()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        _get(client, path, headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+    queries = len(statements) / iterations
+
+    tracemalloc.start()
+    try:
+        _get(client, path, headers)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "status": status,
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "queries": queries,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(scale, iterations, database_url=None, cache_type="NullCache", seed=1234):
+    db_path = None
+    if database_url is None:
+        fd, db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{db_path}"
+
+    app = create_app(_config(database_url, cache_type))
+    try:
+        with app.app_context():
+            start = time.perf_counter()
+            counts = seed_database(scale, seed)
+            seed_seconds = time.perf_counter() - start
+
+            statements = []
+            event.listen(db.engine, "after_cursor_execute",
+                         lambda *args: statements.append(args[2]))
+
+            headers = {"Authorization": f"Bearer {encode_token(1, role='admin')}"}
+            client = app.test_client()
+            cases, skipped = _cases(app)
+            results = {}
+            for path in cases:
+                results[path] = _measure(client, path, headers, iterations, statements)
+                print(f"{path:<60} p95 {results[path]['p95_ms']:9.2f} ms  "
+                      f"{results[path]['queries']:6.1f} q  {results[path]['peak_kib']:10.1f} KiB",
+                      file=sys.stderr)
+            db.session.remove()
+    finally:
+        if db_path:
+            os.remove(db_path)
+
+    return {
+        "meta": {
+            "scale": scale,
+            "seed": seed,
+            "iterations": iterations,
+            "cache": cache_type,
+            "rows": counts,
+            "seed_seconds": round(seed_seconds, 2),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "database": database_url.split(":", 1)[0],
+        },
+        "routes": results,
+        "skipped": skipped,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Human-readable regressions of `report` against `baseline`."""
+    regressions = []
+    for path, new in report["routes"].items():
+        old = baseline.get("routes", {}).get(path)
+        if old is None:
+            continue
+        if new["queries"] > old["queries"]:
+            regressions.append(f"{path}: queries {old['queries']} -> {new['queries']}")
+        for metric in ("p95_ms", "peak_kib"):
+            if old[metric] and new[metric] > old[metric] * (1 + threshold):
+                regressions.append(f"{path}: {metric} {old[metric]} -> {new[metric]} "
+                                   f"(+{(new[metric] / old[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=float, default=0.01)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--cache", default="NullCache", help="Flask-Caching CACHE_TYPE")
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--output", default="routes_bench.json")
+    parser.add_argument("--baseline", help="earlier --output file to diff against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    report = run(args.scale, args.iterations, args.database_url, args.cache, args.seed)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"wrote {args.output} ({len(report['routes'])} cases)")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("scale") != args.scale:
+            print("warning: baseline was recorded at a different scale")
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
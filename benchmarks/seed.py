@@ -0,0 +1,111 @@
+# benchmarks/seed.py
+"""
+Deterministic synthetic data for the route benchmarks.
+
+    seed_database(scale=0.1, seed=1234)
+
+Row counts are FULL_SCALE multiplied by `scale` (at least one row each); 1.0
+is a mid-sized shop chain. The same scale and seed always produce the same
+rows with the same primary keys, so runs on different commits compare like
+for like. Rows are written with Core executemany inserts in chunks, bypassing
+the ORM unit of work.
+"""
+import datetime
+import random
+from collections import Counter
+
+from sqlalchemy import insert
+
+from extensions import db
+from models import (
+    Customer, Inventory, Mechanic, ServiceAssignment, ServiceTicket, TicketPart, User, Vehicle,
+)
+
+FULL_SCALE = {
+    "customers": 10_000,
+    "vehicles": 30_000,
+    "tickets": 200_000,
+    "assignments": 500_000,
+    "parts": 5_000,
+    "mechanics": 500,
+    "users": 100,
+}
+
+INSERT_CHUNK_SIZE = 10_000
+STATUSES = ("Open", "In Progress", "Closed")
+MAKES = ("Toyota", "Honda", "Ford", "Chevrolet", "Subaru", "Nissan")
+# Any valid hash will do: the benchmarks never log in
+PASSWORD_HASH = "pbkdf2:sha256:1000$benchmark$" + "0" * 64
+
+
+def scaled_counts(scale):
+    counts = {name: max(1, int(full * scale)) for name, full in FULL_SCALE.items()}
+    # Each ticket gets distinct mechanics, so assignments are capped by the pairs available
+    counts["assignments"] = min(counts["assignments"], counts["tickets"] * counts["mechanics"])
+    return counts
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(insert(model), rows[start:start + INSERT_CHUNK_SIZE])
+
+
+def seed_database(scale=0.01, seed=1234):
+    """Create all tables and fill them; returns the row count per entity."""
+    rng = random.Random(seed)
+    counts = scaled_counts(scale)
+    today = datetime.date(2025, 1, 1)
+
+    db.create_all()
+
+    _insert(Customer, [
+        {"id": i, "name": f"Customer {i}", "email": f"customer{i}@example.com",
+         "phone": f"555-{i:07d}", "address": f"{i} Main St"}
+        for i in range(1, counts["customers"] + 1)
+    ])
+    _insert(Vehicle, [
+        {"id": i, "vin": f"BENCH{i:012d}", "make": rng.choice(MAKES), "model": "Model",
+         "year": rng.randint(2000, 2024), "customer_id": rng.randint(1, counts["customers"])}
+        for i in range(1, counts["vehicles"] + 1)
+    ])
+    _insert(Inventory, [
+        {"id": i, "name": f"Part {i}", "price": rng.randint(500, 50_000) / 100,
+         "quantity": rng.randint(0, 200)}
+        for i in range(1, counts["parts"] + 1)
+    ])
+    _insert(ServiceTicket, [
+        {"id": i, "vehicle_id": rng.randint(1, counts["vehicles"]),
+         "date": today - datetime.timedelta(days=rng.randint(0, 730)),
+         "description": f"Service visit {i}", "status": rng.choice(STATUSES),
+         "cost": rng.randint(2_000, 200_000) / 100}
+        for i in range(1, counts["tickets"] + 1)
+    ])
+    _insert(TicketPart, [
+        {"ticket_id": i, "part_id": rng.randint(1, counts["parts"]),
+         "quantity": rng.randint(1, 4), "unit_price": rng.randint(500, 50_000) / 100}
+        for i in range(1, counts["tickets"] + 1)
+    ])
+
+    # Round r assigns ticket t to mechanic (offset_t + r) mod M: distinct per ticket
+    offsets = [rng.randrange(counts["mechanics"]) for _ in range(counts["tickets"])]
+    assignments = []
+    for n in range(counts["assignments"]):
+        round_, ticket_index = divmod(n, counts["tickets"])
+        mechanic_id = (offsets[ticket_index] + round_) % counts["mechanics"] + 1
+        assignments.append({"id": n + 1, "service_ticket_id": ticket_index + 1, "mechanic_id": mechanic_id})
+    per_mechanic = Counter(a["mechanic_id"] for a in assignments)
+
+    _insert(Mechanic, [
+        {"id": i, "name": f"Mechanic {i}", "email": f"mechanic{i}@shop.com",
+         "salary": rng.randint(40_000, 90_000), "ticket_count": per_mechanic[i]}
+        for i in range(1, counts["mechanics"] + 1)
+    ])
+    _insert(ServiceAssignment, assignments)
+    _insert(User, [
+        {"id": i, "email": f"user{i}@example.com", "password_hash": PASSWORD_HASH,
+         "role": "admin" if i == 1 else rng.choice(("mechanic", "customer"))}
+        for i in range(1, counts["users"] + 1)
+    ])
+
+    db.session.commit()
+    return counts
@@ -6,3 +6,41 @@ class ProductionConfig:
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
     SECRET_KEY = os.environ.get("SECRET_KEY")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Per-worker LRU in front of a cache shared by all workers (utils/cache_backends.py)
+    CACHE_TYPE = "utils.cache_backends.TwoTierCache"
+    CACHE_L2_TYPE = os.environ.get("CACHE_L2_TYPE", "FileSystemCache")
+    CACHE_DIR = os.environ.get("CACHE_DIR", "/tmp/mechanicshop-cache")
+    CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
+    CACHE_L1_SIZE = int(os.environ.get("CACHE_L1_SIZE", 256))
+    CACHE_L1_TTL = int(os.environ.get("CACHE_L1_TTL", 5))
+    CACHE_DEFAULT_TIMEOUT = 300
+
+    # Pre-populate hot list endpoints at gunicorn worker start (gunicorn.conf.py, utils/warmup.py)
+    CACHE_WARMUP = os.environ.get("CACHE_WARMUP", "1") == "1"
+    CACHE_WARMUP_URLS = tuple(
+        os.environ.get("CACHE_WARMUP_URLS", "/tickets,/mechanics,/vehicles,/assignments").split(",")
+    )
+
+    # Password hashing pool (utils/passwords.py)
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_CONCURRENCY = int(os.environ.get("PASSWORD_HASH_CONCURRENCY", 4))
+
+    # Slow-query log with query plans (utils/slow_query.py)
+    SLOW_QUERY_THRESHOLD_MS = int(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 250))
+    SLOW_QUERY_LOG_LIMIT = int(os.environ.get("SLOW_QUERY_LOG_LIMIT", 5))
+    SLOW_QUERY_LOG_TOTAL_LIMIT = int(os.environ.get("SLOW_QUERY_LOG_TOTAL_LIMIT", 50))
+
+    # Admin-triggered profiling and the optional stack sampler (utils/profiling.py)
+    PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp/mechanicshop-profiles")
+    PROFILE_SAMPLER_ENABLED = os.environ.get("PROFILE_SAMPLER_ENABLED") == "1"
+
+    # JSON access log through a background writer (utils/access_log.py)
+    ACCESS_LOG_ENABLED = os.environ.get("ACCESS_LOG_ENABLED", "1") == "1"
+    ACCESS_LOG_FILE = os.environ.get("ACCESS_LOG_FILE")
+    ACCESS_LOG_SAMPLE_RATE = float(os.environ.get("ACCESS_LOG_SAMPLE_RATE", 1.0))
+    ACCESS_LOG_SLOW_MS = int(os.environ.get("ACCESS_LOG_SLOW_MS", 1000))
+
+    # Bearer token for Prometheus scrapes of /metrics; admins can always read it (utils/metrics.py)
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
@@ -0,0 +1,9 @@
+# gunicorn.conf.py
+# Read by gunicorn from the working directory (gunicorn flask_app:app).
+
+
+def post_worker_init(worker):
+    # Each worker has loaded the app by now; warm it up before it takes requests
+    # (utils/warmup.py). Not done in create_app, which CLI commands also run.
+    from utils.warmup import warm_up_worker
+    warm_up_worker(worker.wsgi)
@@ -0,0 +1,35 @@
+"""Add maintained ticket_count to mechanics
+
+Revision ID: 3c9e51d7b2a4
+Revises: a14f0070f38c
+Create Date: 2026-10-18 09:12:41.208311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e51d7b2a4'
+down_revision = 'a14f0070f38c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('mechanics', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('ticket_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_mechanics_ticket_count'), ['ticket_count'], unique=False)
+
+    # Backfill counters from existing assignments
+    op.execute(
+        "UPDATE mechanics SET ticket_count = ("
+        "SELECT COUNT(*) FROM service_assignment "
+        "WHERE service_assignment.mechanic_id = mechanics.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('mechanics', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_mechanics_ticket_count'))
+        batch_op.drop_column('ticket_count')
@@ -0,0 +1,26 @@
+"""Add row version to service_tickets
+
+Revision ID: 5b8e2c71d9a0
+Revises: e7a0f3b95c12
+Create Date: 2026-10-18 14:05:12.733190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2c71d9a0'
+down_revision = 'e7a0f3b95c12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('service_tickets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version_id', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('service_tickets', schema=None) as batch_op:
+        batch_op.drop_column('version_id')
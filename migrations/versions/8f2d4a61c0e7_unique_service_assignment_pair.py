@@ -0,0 +1,40 @@
+"""Unique (service_ticket_id, mechanic_id) on service_assignment
+
+Revision ID: 8f2d4a61c0e7
+Revises: 3c9e51d7b2a4
+Create Date: 2026-10-18 10:03:17.554920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2d4a61c0e7'
+down_revision = '3c9e51d7b2a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop duplicate pairs left by the old read-then-write check, keeping the oldest row
+    op.execute(
+        "DELETE FROM service_assignment WHERE id NOT IN ("
+        "SELECT id FROM (SELECT MIN(id) AS id FROM service_assignment "
+        "GROUP BY service_ticket_id, mechanic_id) AS keep)"
+    )
+    op.execute(
+        "UPDATE mechanics SET ticket_count = ("
+        "SELECT COUNT(*) FROM service_assignment "
+        "WHERE service_assignment.mechanic_id = mechanics.id)"
+    )
+
+    with op.batch_alter_table('service_assignment', schema=None) as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_service_assignment_ticket_mechanic', ['service_ticket_id', 'mechanic_id']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('service_assignment', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_service_assignment_ticket_mechanic', type_='unique')
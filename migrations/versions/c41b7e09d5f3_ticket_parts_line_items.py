@@ -0,0 +1,34 @@
+"""Turn ticket_parts into line items (quantity + unit price snapshot)
+
+Revision ID: c41b7e09d5f3
+Revises: 8f2d4a61c0e7
+Create Date: 2026-10-18 11:26:02.871344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41b7e09d5f3'
+down_revision = '8f2d4a61c0e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ticket_parts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('quantity', sa.Integer(), server_default='1', nullable=False))
+        batch_op.add_column(sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=True))
+
+    # Snapshot today's price for existing line items
+    op.execute(
+        "UPDATE ticket_parts SET unit_price = ("
+        "SELECT price FROM inventory WHERE inventory.id = ticket_parts.part_id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('ticket_parts', schema=None) as batch_op:
+        batch_op.drop_column('unit_price')
+        batch_op.drop_column('quantity')
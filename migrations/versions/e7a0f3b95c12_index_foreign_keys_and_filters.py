@@ -0,0 +1,51 @@
+"""Index foreign keys and hot filter columns
+
+Revision ID: e7a0f3b95c12
+Revises: c41b7e09d5f3
+Create Date: 2026-10-18 12:40:55.019467
+
+service_assignment.service_ticket_id is served by the leading column of
+uq_service_assignment_ticket_mechanic (revision 8f2d4a61c0e7), so it gets
+no separate index.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a0f3b95c12'
+down_revision = 'c41b7e09d5f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('vehicle', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vehicle_customer_id'), ['customer_id'], unique=False)
+
+    with op.batch_alter_table('service_tickets', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_service_tickets_vehicle_id'), ['vehicle_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_service_tickets_date'), ['date'], unique=False)
+        batch_op.create_index('ix_service_tickets_status_date', ['status', 'date'], unique=False)
+
+    with op.batch_alter_table('service_assignment', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_service_assignment_mechanic_id'), ['mechanic_id'], unique=False)
+
+    with op.batch_alter_table('ticket_parts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ticket_parts_part_id'), ['part_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ticket_parts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ticket_parts_part_id'))
+
+    with op.batch_alter_table('service_assignment', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_service_assignment_mechanic_id'))
+
+    with op.batch_alter_table('service_tickets', schema=None) as batch_op:
+        batch_op.drop_index('ix_service_tickets_status_date')
+        batch_op.drop_index(batch_op.f('ix_service_tickets_date'))
+        batch_op.drop_index(batch_op.f('ix_service_tickets_vehicle_id'))
+
+    with op.batch_alter_table('vehicle', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicle_customer_id'))
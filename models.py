@@ -1,13 +1,7 @@
 import datetime
 from extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.passwords import password_hasher
 
-# Junction table: ServiceTicket ↔ Inventory
-ticket_parts = db.Table(
-    'ticket_parts',
-    db.Column('ticket_id', db.Integer, db.ForeignKey('service_tickets.id'), primary_key=True),
-    db.Column('part_id', db.Integer, db.ForeignKey('inventory.id'), primary_key=True)
-)
 
 class Customer(db.Model):
     __tablename__ = 'customers'
@@ -31,7 +25,7 @@ class Vehicle(db.Model):
     make = db.Column(db.String(50), nullable=False)
     model = db.Column(db.String(50), nullable=False)
     year = db.Column(db.Integer, nullable=False)
-    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False, index=True)
 
     service_tickets = db.relationship(
         'ServiceTicket',
@@ -42,16 +36,25 @@ class Vehicle(db.Model):
 
 class ServiceTicket(db.Model):
     __tablename__ = 'service_tickets'
+    __table_args__ = (
+        # Dashboard filter: ?status=open&date_from=...
+        db.Index('ix_service_tickets_status_date', 'status', 'date'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicle.id'), nullable=False)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicle.id'), nullable=False, index=True)
 
     # FIXED: must be a pure date, not a timestamp
-    date = db.Column(db.Date, default=datetime.date.today, nullable=False)
+    date = db.Column(db.Date, default=datetime.date.today, nullable=False, index=True)
 
     description = db.Column(db.Text)
     status = db.Column(db.String(50), nullable=False)
     cost = db.Column(db.Numeric(8, 2), nullable=False)
 
+    # Bumped by the ORM on every UPDATE of the row; feeds the detail ETag and
+    # makes concurrent edits fail with StaleDataError instead of overwriting
+    version_id = db.Column(db.Integer, nullable=False, server_default='1')
+    __mapper_args__ = {"version_id_col": version_id}
+
     assignments = db.relationship(
         'ServiceAssignment',
         backref='ticket',
@@ -59,11 +62,20 @@ class ServiceTicket(db.Model):
         lazy=True
     )
 
+    line_items = db.relationship(
+        'TicketPart',
+        back_populates='ticket',
+        cascade="all, delete-orphan",
+        lazy=True
+    )
+
+    # Read-only shortcut over ticket_parts; write line items through TicketPart
     parts = db.relationship(
         'Inventory',
-        secondary=ticket_parts,
+        secondary='ticket_parts',
         back_populates='tickets',
-        lazy='subquery'
+        viewonly=True,
+        lazy=True
     )
 
 class Mechanic(db.Model):
@@ -75,6 +87,9 @@ class Mechanic(db.Model):
     address = db.Column(db.Text)
     salary = db.Column(db.Numeric(10, 2), nullable=False)
 
+    # Maintained by app/mechanics/leaderboard.py alongside assignment writes
+    ticket_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
+
     assignments = db.relationship(
         'ServiceAssignment',
         backref='mechanic',
@@ -84,9 +99,14 @@ class Mechanic(db.Model):
 
 class ServiceAssignment(db.Model):
     __tablename__ = 'service_assignment'
+    __table_args__ = (
+        # A mechanic is assigned to a ticket at most once; enforced by the database
+        db.UniqueConstraint('service_ticket_id', 'mechanic_id', name='uq_service_assignment_ticket_mechanic'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # service_ticket_id lookups use the leading column of the unique constraint above
     service_ticket_id = db.Column(db.Integer, db.ForeignKey('service_tickets.id'), nullable=False)
-    mechanic_id = db.Column(db.Integer, db.ForeignKey('mechanics.id'), nullable=False)
+    mechanic_id = db.Column(db.Integer, db.ForeignKey('mechanics.id'), nullable=False, index=True)
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -99,11 +119,15 @@ class User(db.Model):
         nullable=False
     )
 
+    # Hashing runs in utils/passwords.py's process pool, off the request thread
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
 class Inventory(db.Model):
     __tablename__ = 'inventory'
@@ -112,9 +136,31 @@ class Inventory(db.Model):
     price = db.Column(db.Numeric(10, 2), nullable=False)
     quantity = db.Column(db.Integer, default=0)
 
+    line_items = db.relationship(
+        'TicketPart',
+        back_populates='part',
+        cascade="all, delete-orphan",
+        lazy=True
+    )
+
+    # Read-only shortcut over ticket_parts; write line items through TicketPart
     tickets = db.relationship(
         'ServiceTicket',
-        secondary=ticket_parts,
+        secondary='ticket_parts',
         back_populates='parts',
-        lazy='subquery'
+        viewonly=True,
+        lazy=True
     )
+
+# Line item: a part used on a ticket (ServiceTicket ↔ Inventory)
+class TicketPart(db.Model):
+    __tablename__ = 'ticket_parts'
+    ticket_id = db.Column(db.Integer, db.ForeignKey('service_tickets.id'), primary_key=True)
+    part_id = db.Column(db.Integer, db.ForeignKey('inventory.id'), primary_key=True, index=True)
+    quantity = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    # Price per unit when the part was first added, so later price changes don't rewrite history
+    unit_price = db.Column(db.Numeric(10, 2))
+
+    ticket = db.relationship('ServiceTicket', back_populates='line_items')
+    part = db.relationship('Inventory', back_populates='line_items')
@@ -0,0 +1,194 @@
+# utils/access_log.py
+"""
+Structured access log written off the request thread.
+
+One JSON object per request goes to the "<app>.access" logger. Its only
+handler is a QueueHandler, so a request pays for building a dict and a
+put_nowait. A QueueListener thread formats the lines and writes them to
+stdout or ACCESS_LOG_FILE. When the queue is full, records are dropped and
+counted instead of blocking the response.
+
+Fields: ts, method, path, route, blueprint, status, latency_ms, sql_queries
+and sql_ms (from utils/metrics.py), cache (the cached_view outcome), remote,
+user_id and role. user_id and role are set by the auth decorators on a valid
+token. Per-route latency histograms are on /metrics (utils/metrics.py) and
+are not repeated here.
+
+Sampling: ordinary requests are logged with probability ACCESS_LOG_SAMPLE_RATE
+and each line carries the rate so counts can be scaled back up. Responses
+with status >= ACCESS_LOG_ALWAYS_STATUS and requests slower than
+ACCESS_LOG_SLOW_MS are always logged.
+
+    ACCESS_LOG_ENABLED = False
+    ACCESS_LOG_FILE = None            # default: stdout
+    ACCESS_LOG_SAMPLE_RATE = 1.0
+    ACCESS_LOG_ALWAYS_STATUS = 500
+    ACCESS_LOG_SLOW_MS = 1000
+    ACCESS_LOG_QUEUE_SIZE = 10000
+"""
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import current_app, g, request
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking on a full queue."""
+
+    def __init__(self, record_queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The message is built by the listener's formatter; skip QueueHandler's eager formatting
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = getattr(record, "access", None) or {"message": record.getMessage()}
+        ts = datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc)
+        return json.dumps({"ts": ts.isoformat(timespec="milliseconds"), **entry},
+                          separators=(",", ":"), default=str)
+
+
+class _AccessLogWriter:
+    def __init__(self, logger, handler, queue_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = DroppingQueueHandler(self.queue)
+        self.queue_handler.writer = self
+        self.handler = handler
+        self.logger = logger
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        # The logger is shared by every app with this name; replace (and stop) a previous app's writer
+        for existing in list(self.logger.handlers):
+            if isinstance(existing, DroppingQueueHandler):
+                self.logger.removeHandler(existing)
+                existing.writer.stop()
+        self.logger.addHandler(self.queue_handler)
+        self._listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        # The writer thread does not survive fork; start it lazily in each worker process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._listener = QueueListener(self.queue, self.handler, respect_handler_level=False)
+            self._listener.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """Write what is queued, then end the listener thread (in this process)."""
+        with self._lock:
+            listener, self._listener = self._listener, None
+            if listener is None or self._pid != os.getpid():
+                return
+            self._pid = None
+            atexit.unregister(self.stop)
+        listener.stop()
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        self.queue.join()
+        self.handler.flush()
+
+
+class AccessLog:
+    """Flask extension emitting one sampled JSON line per request."""
+
+    def init_app(self, app):
+        app.config.setdefault("ACCESS_LOG_ENABLED", False)
+        app.config.setdefault("ACCESS_LOG_FILE", None)
+        app.config.setdefault("ACCESS_LOG_SAMPLE_RATE", 1.0)
+        app.config.setdefault("ACCESS_LOG_ALWAYS_STATUS", 500)
+        app.config.setdefault("ACCESS_LOG_SLOW_MS", 1000)
+        app.config.setdefault("ACCESS_LOG_QUEUE_SIZE", 10000)
+        if not app.config["ACCESS_LOG_ENABLED"]:
+            return
+
+        if app.config["ACCESS_LOG_FILE"]:
+            handler = logging.FileHandler(app.config["ACCESS_LOG_FILE"])
+        else:
+            handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter())
+
+        app.extensions["access_log"] = _AccessLogWriter(
+            logging.getLogger(f"{app.name}.access"), handler, app.config["ACCESS_LOG_QUEUE_SIZE"]
+        )
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    @property
+    def writer(self):
+        return current_app.extensions.get("access_log")
+
+    def _start(self):
+        self.writer.ensure_running()
+        g.access_started = time.perf_counter()
+        # Set by the auth decorators; clear anything left from an earlier request in this context
+        g.pop("user_id", None)
+        g.pop("user_role", None)
+
+    def _finish(self, response):
+        started = g.pop("access_started", None)
+        if started is None:
+            return response
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        config = current_app.config
+        rate = config["ACCESS_LOG_SAMPLE_RATE"]
+        always = (response.status_code >= config["ACCESS_LOG_ALWAYS_STATUS"]
+                  or latency_ms >= config["ACCESS_LOG_SLOW_MS"])
+        if not always and random.random() >= rate:
+            return response
+
+        sql_seconds = g.get("metrics_sql_seconds")
+        self.writer.logger.info("access", extra={"access": {
+            "method": request.method,
+            "path": request.path,
+            "route": request.url_rule.rule if request.url_rule is not None else None,
+            "blueprint": request.blueprint,
+            "status": response.status_code,
+            "latency_ms": round(latency_ms, 2),
+            "sql_queries": g.get("metrics_queries"),
+            "sql_ms": round(sql_seconds * 1000, 2) if sql_seconds is not None else None,
+            "cache": g.get("view_cache"),
+            "remote": request.remote_addr,
+            "user_id": g.get("user_id"),
+            "role": g.get("user_role"),
+            "sample_rate": 1.0 if always else rate,
+        }})
+        return response
+
+    def flush(self):
+        writer = self.writer
+        if writer is not None:
+            writer.flush()
+
+    def dropped(self):
+        writer = self.writer
+        return writer.queue_handler.dropped if writer is not None else 0
+
+
+access_log = AccessLog()
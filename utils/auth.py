@@ -1,10 +1,117 @@
 import os
+import math
+import time
 import datetime
+import hashlib
+import heapq
+import threading
+from collections import OrderedDict
+from flask import current_app, has_app_context
 from jose import jwt, JWTError, ExpiredSignatureError
 
+from extensions import cache
+
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
 ALGORITHM = "HS256"
 
+# Verified-token cache: the same 8-hour token is presented on every request,
+# so its verified payload is kept (per process) until the token's own exp.
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 4096))
+
+# Revocations are also written to the shared Flask-Caching backend, so a logout
+# handled by one worker is seen by all of them (with a shared CACHE_TYPE). Each
+# revocation bumps a generation key; a process reads it at most once per
+# REVOCATION_SYNC_SECONDS and drops its cached payloads when it has moved, so
+# cache hits cost no shared-cache read. Misses check the token's own key.
+REVOKED_PREFIX = "revoked:"
+REVOCATION_GENERATION_KEY = REVOKED_PREFIX + "generation"
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", 1))
+
+
+class _VerifiedTokenCache:
+    """Bounded LRU of {sha256(token): (exp, payload)} plus revoked token digests."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._payloads = OrderedDict()
+        self._revoked = {}
+        self._revoked_expiry = []   # heap of (exp, digest), for purging _revoked in order
+        self._generation = None     # shared revocation generation last seen
+        self._synced_at = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest, now):
+        with self._lock:
+            entry = self._payloads.get(digest)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._payloads[digest]
+                self.misses += 1
+                return None
+            self._payloads.move_to_end(digest)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, digest, exp, payload):
+        with self._lock:
+            self._payloads[digest] = (exp, payload)
+            self._payloads.move_to_end(digest)
+            while len(self._payloads) > self.maxsize:
+                self._payloads.popitem(last=False)
+
+    def revoke(self, digest, exp):
+        with self._lock:
+            self._payloads.pop(digest, None)
+            self._revoked[digest] = exp
+            heapq.heappush(self._revoked_expiry, (exp, digest))
+
+    def sync_due(self, now, interval):
+        with self._lock:
+            if self._synced_at is not None and now - self._synced_at < interval:
+                return False
+            self._synced_at = now
+            return True
+
+    def sync(self, generation):
+        """Drop every cached payload if another worker revoked a token since the last sync."""
+        with self._lock:
+            if generation != self._generation:
+                self._generation = generation
+                self._payloads.clear()
+
+    def is_revoked(self, digest, now):
+        with self._lock:
+            # Revocations only matter until the token would have expired anyway
+            expiry = self._revoked_expiry
+            while expiry and expiry[0][0] <= now:
+                exp, stale = heapq.heappop(expiry)
+                if self._revoked.get(stale) == exp:
+                    del self._revoked[stale]
+            return digest in self._revoked
+
+    def clear(self):
+        with self._lock:
+            self._payloads.clear()
+            self._revoked.clear()
+            self._revoked_expiry.clear()
+            self._generation = self._synced_at = None
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._payloads), "revoked": len(self._revoked),
+                    "hits": self.hits, "misses": self.misses}
+
+
+_token_cache = _VerifiedTokenCache(TOKEN_CACHE_SIZE)
+
+
+def _digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def encode_token(user_id, role=None):
     payload = {
         "sub": str(user_id),  # ensure subject is a string
@@ -14,10 +121,59 @@ def encode_token(user_id, role=None):
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
+def _shared_cache():
+    # Outside an app, or in an app without Flask-Caching, revocations stay per process
+    return has_app_context() and "cache" in current_app.extensions
+
 def decode_token(token):
+    digest = _digest(token)
+    now = time.time()
+    if _token_cache.is_revoked(digest, now):
+        return {"error": "Token has been revoked"}
+
+    shared = _shared_cache()
+    if shared and _token_cache.sync_due(now, REVOCATION_SYNC_SECONDS):
+        _token_cache.sync(cache.get(REVOCATION_GENERATION_KEY))
+
+    cached = _token_cache.get(digest, now)
+    if cached is not None:
+        return dict(cached)
+
+    if shared and cache.get(REVOKED_PREFIX + digest) is not None:
+        return {"error": "Token has been revoked"}
+
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except ExpiredSignatureError:
         return {"error": "Token has expired"}
     except JWTError:
-        return {"error": "Invalid token"}
\ No newline at end of file
+        return {"error": "Invalid token"}
+
+    # Tokens without exp are verified every time rather than cached forever
+    if isinstance(payload.get("exp"), (int, float)):
+        _token_cache.put(digest, payload["exp"], dict(payload))
+    return payload
+
+def revoke_token(token):
+    """
+    Reject `token` from now on (e.g. on logout), even though its signature is valid.
+    Recorded in this process and, inside an app context, in the shared cache
+    until the token's exp. Other workers reject it within REVOCATION_SYNC_SECONDS.
+    """
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return
+    if not isinstance(exp, (int, float)):
+        exp = time.time() + datetime.timedelta(hours=8).total_seconds()
+    digest = _digest(token)
+    _token_cache.revoke(digest, exp)
+    if _shared_cache():
+        cache.set(REVOKED_PREFIX + digest, 1, timeout=max(1, math.ceil(exp - time.time())))
+        cache.set(REVOCATION_GENERATION_KEY, str(time.time_ns()), timeout=0)
+
+def token_cache_stats():
+    return _token_cache.stats()
+
+def clear_token_cache():
+    _token_cache.clear()
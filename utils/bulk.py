@@ -0,0 +1,115 @@
+# utils/bulk.py
+"""
+Helpers for the POST /<entity>/bulk import endpoints.
+
+Rows arrive as a JSON array or CSV, are validated with the entity's existing
+schema, checked for conflicts with one set-based query per chunk, and inserted
+with executemany in one transaction per chunk. The caller gets a per-row report.
+"""
+import csv
+import io
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from marshmallow import ValidationError
+
+from extensions import db
+
+BULK_CHUNK_SIZE = 500
+MAX_BULK_ROWS = 10000
+
+
+class BulkPayloadError(ValueError):
+    """Raised when the request body is not a JSON array or CSV of rows."""
+
+
+def parse_bulk_rows(req):
+    """Read rows from a JSON array body or a text/csv body (header row required)."""
+    if req.mimetype == "text/csv":
+        reader = csv.DictReader(io.StringIO(req.get_data(as_text=True)))
+        # Empty CSV cells mean "not provided", not empty strings
+        rows = [{k: v for k, v in row.items() if v != ""} for row in reader]
+    else:
+        rows = req.get_json(silent=True)
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise BulkPayloadError("Body must be a JSON array of objects or a text/csv document")
+
+    if not rows:
+        raise BulkPayloadError("No rows to import")
+    if len(rows) > MAX_BULK_ROWS:
+        raise BulkPayloadError(f"At most {MAX_BULK_ROWS} rows per request")
+    return rows
+
+
+def unique_check(column, field, message):
+    """Reject rows whose `field` already exists in `column` or repeats within the upload."""
+    def check(chunk):
+        # Earlier chunks' values are caught by the query once committed; a rolled-back
+        # chunk's values are not in the table and must not block later rows
+        seen = set()
+        values = {data[field] for _, data in chunk if data.get(field) is not None}
+        taken = set(db.session.execute(select(column).where(column.in_(values))).scalars()) if values else set()
+        errors = {}
+        for index, data in chunk:
+            value = data.get(field)
+            if value in taken or value in seen:
+                errors[index] = {field: [message]}
+            else:
+                seen.add(value)
+        return errors
+
+    return check
+
+
+def exists_check(column, field, message):
+    """Reject rows whose `field` does not reference an existing `column` value."""
+    def check(chunk):
+        values = {data[field] for _, data in chunk}
+        found = set(db.session.execute(select(column).where(column.in_(values))).scalars())
+        return {index: {field: [message]} for index, data in chunk if data[field] not in found}
+
+    return check
+
+
+def bulk_import(model, schema, rows, checks=(), chunk_size=BULK_CHUNK_SIZE):
+    """
+    Validate and insert `rows`; returns {"inserted", "failed", "errors"} where
+    each error is {"row": <0-based index>, "errors": {...}}.
+    """
+    errors = {}
+    valid = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, schema.load(row)))
+        except ValidationError as e:
+            errors[index] = e.messages
+
+    inserted = 0
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        for check in checks:
+            failed = check(chunk)
+            errors.update(failed)
+            chunk = [(index, data) for index, data in chunk if index not in failed]
+        if not chunk:
+            continue
+
+        try:
+            # executemany needs a uniform column set, so group rows by their keys
+            by_columns = {}
+            for _, data in chunk:
+                by_columns.setdefault(frozenset(data), []).append(data)
+            for batch in by_columns.values():
+                db.session.execute(insert(model), batch)
+            db.session.commit()
+            inserted += len(chunk)
+        except IntegrityError:
+            db.session.rollback()
+            for index, _ in chunk:
+                errors[index] = {"_schema": ["Database integrity error; chunk rolled back"]}
+
+    return {
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": [{"row": index, "errors": errors[index]} for index in sorted(errors)],
+    }
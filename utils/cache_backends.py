@@ -0,0 +1,160 @@
+# utils/cache_backends.py
+"""
+Flask-Caching backends.
+
+TwoTierCache keeps a small per-process LRU (L1) in front of a store shared by
+all workers (L2: filesystem, redis or memcached; SimpleCache in tests).
+Enable it with
+
+    CACHE_TYPE = "utils.cache_backends.TwoTierCache"
+    CACHE_L2_TYPE = "FileSystemCache"   # any Flask-Caching CACHE_TYPE
+    CACHE_L1_SIZE = 256                 # entries per process
+    CACHE_L1_TTL = 5                    # seconds an L1 copy may be served
+
+Coherence: writes go through to L2 and replace the local L1 copy. Tag version,
+rebuild-lock and token revocation keys (utils/cache_tags.py, utils/auth.py)
+never enter L1, so a bump in one worker changes the view keys every worker
+computes on its next request; only non-tagged keys can be served stale by
+another worker, for at most CACHE_L1_TTL seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask_caching.backends.base import BaseCache
+from werkzeug.utils import import_string
+
+from utils.auth import REVOKED_PREFIX
+from utils.cache_tags import LOCK_PREFIX, TAG_PREFIX
+
+# Keys that must always be read from the shared tier
+L1_BYPASS_PREFIXES = (TAG_PREFIX, LOCK_PREFIX, REVOKED_PREFIX)
+
+
+class TwoTierCache(BaseCache):
+    """Per-process LRU (L1) over a shared Flask-Caching backend (L2)."""
+
+    def __init__(self, l2, l1_size=256, l1_ttl=5, default_timeout=300):
+        super().__init__(default_timeout=default_timeout)
+        self.l2 = l2
+        self.l1_size = l1_size
+        self.l1_ttl = l1_ttl
+        self._l1 = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        l2_type = config.get("CACHE_L2_TYPE", "SimpleCache")
+        if "." not in l2_type:
+            l2_type = "flask_caching.backends." + l2_type
+        l2 = import_string(l2_type).factory(app, config, list(args), dict(kwargs))
+        return cls(
+            l2,
+            l1_size=config.get("CACHE_L1_SIZE", 256),
+            l1_ttl=config.get("CACHE_L1_TTL", 5),
+            **kwargs,
+        )
+
+    # L1 bookkeeping
+
+    def _bypass(self, key):
+        return key.startswith(L1_BYPASS_PREFIXES)
+
+    def _l1_get(self, key):
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._l1[key]
+                self._stats["l1_misses"] += 1
+                return None
+            self._l1.move_to_end(key)
+            self._stats["l1_hits"] += 1
+            return entry[1]
+
+    def _l1_set(self, key, value, timeout):
+        timeout = self._normalize_timeout(timeout)
+        ttl = self.l1_ttl if not timeout else min(self.l1_ttl, timeout)
+        with self._lock:
+            self._l1[key] = (time.monotonic() + ttl, value)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_size:
+                self._l1.popitem(last=False)
+
+    def _l1_discard(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._l1.pop(key, None)
+
+    def _l2_get(self, key):
+        value = self.l2.get(key)
+        with self._lock:
+            self._stats["l2_hits" if value is not None else "l2_misses"] += 1
+        return value
+
+    # Cache API
+
+    def get(self, key):
+        if self._bypass(key):
+            return self._l2_get(key)
+
+        value = self._l1_get(key)
+        if value is not None:
+            return value
+        value = self._l2_get(key)
+        if value is not None:
+            self._l1_set(key, value, None)
+        return value
+
+    def get_many(self, *keys):
+        return [self.get(key) for key in keys]
+
+    def has(self, key):
+        if not self._bypass(key) and self._l1_get(key) is not None:
+            return True
+        return self.l2.has(key)
+
+    def set(self, key, value, timeout=None):
+        stored = self.l2.set(key, value, timeout=timeout)
+        if self._bypass(key) or not stored:
+            self._l1_discard(key)
+        else:
+            self._l1_set(key, value, timeout)
+        return stored
+
+    def add(self, key, value, timeout=None):
+        added = self.l2.add(key, value, timeout=timeout)
+        if added and not self._bypass(key):
+            self._l1_set(key, value, timeout)
+        return added
+
+    def delete(self, key):
+        self._l1_discard(key)
+        return self.l2.delete(key)
+
+    def delete_many(self, *keys):
+        self._l1_discard(*keys)
+        return self.l2.delete_many(*keys)
+
+    def inc(self, key, delta=1):
+        self._l1_discard(key)
+        return self.l2.inc(key, delta=delta)
+
+    def dec(self, key, delta=1):
+        self._l1_discard(key)
+        return self.l2.dec(key, delta=delta)
+
+    def clear(self):
+        with self._lock:
+            self._l1.clear()
+        return self.l2.clear()
+
+    def stats(self):
+        """Per-tier hit/miss counters and hit rates."""
+        with self._lock:
+            stats = dict(self._stats, l1_size=len(self._l1))
+        for tier in ("l1", "l2"):
+            lookups = stats[f"{tier}_hits"] + stats[f"{tier}_misses"]
+            stats[f"{tier}_hit_rate"] = stats[f"{tier}_hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,207 @@
+# utils/cache_tags.py
+"""
+Tag-based invalidation on top of extensions.cache.
+
+Every cached view is tagged with the entity types it renders ("tickets",
+"mechanics", ...). Each tag has a version token stored in the cache, and the
+version tokens are part of the view's cache key. Write routes call bump_tags()
+after committing, which swaps the token and so orphans every cached response
+carrying that tag; orphaned entries simply age out.
+"""
+import hashlib
+import math
+import random
+import time
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, g, make_response, request
+
+from extensions import cache
+from utils.conditional import last_modified_from_versions, not_modified, set_validators
+
+TAG_PREFIX = "tag:"
+VIEW_PREFIX = "view:"
+LOCK_PREFIX = "lock:"
+LOCK_POLL_INTERVAL = 0.05
+
+# Rebuilt from the stored body; any other header the view set (e.g. X-Next-Cursor) is replayed
+ENTRY_SKIPPED_HEADERS = ("Content-Type", "Content-Length")
+
+
+def _tag_key(tag):
+    return f"{TAG_PREFIX}{tag}"
+
+
+def _new_version():
+    # Nanosecond timestamps are unique enough per bump and double as "changed at"
+    return str(time.time_ns())
+
+
+def tag_versions(tags):
+    """Current version token per tag, creating tokens for tags never seen before."""
+    keys = [_tag_key(tag) for tag in tags]
+    values = cache.get_many(*keys) if keys else []
+
+    versions = {}
+    for tag, key, value in zip(tags, keys, values):
+        if value is None:
+            # add() keeps a token another worker created first
+            cache.add(key, _new_version(), timeout=0)
+            value = cache.get(key)
+        versions[tag] = value
+    return versions
+
+
+def bump_tags(*tags):
+    """Invalidate every cached view carrying any of `tags`. Call after commit."""
+    for tag in tags:
+        cache.set(_tag_key(tag), _new_version(), timeout=0)
+
+
+def normalized_query_string():
+    """Query string with parameters sorted, so equivalent URLs share one cache entry."""
+    return urlencode(sorted(request.args.items(multi=True)))
+
+
+def view_cache_key(versions):
+    raw = "|".join([
+        request.path,
+        normalized_query_string(),
+        ",".join(f"{tag}={versions[tag]}" for tag in sorted(versions)),
+    ])
+    return VIEW_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def cached_view(timeout, tags, stale_ttl=0, early_refresh=None, lock_timeout=10, wait=2.0):
+    """
+    Cache a view's 200 responses under a key built from the path, the normalized
+    query string and the current versions of `tags`.
+
+    `tags` is a tuple of tag names, or a callable receiving the view kwargs and
+    returning one (for views whose dependencies vary with ?include=).
+
+    The outcome (hit, miss, stale or not_modified) is left in g.view_cache for
+    utils/metrics.py.
+
+    The same key doubles as the response's ETag and the newest tag version, once
+    it is a second old, as its Last-Modified, so conditional requests get a 304
+    without running the view.
+
+    Rebuilds are single-flight: only the request that wins a short cache lock
+    runs the view. Others serve the expired copy, which is kept for `stale_ttl`
+    seconds past `timeout`. Without such a copy, they poll up to `wait` seconds
+    for the winner's result. The lock records its own expiry, so a lock left by
+    a worker killed mid-rebuild is taken over once `lock_timeout` has passed,
+    even on backends that keep it longer (FileSystemCache's add() does). `early_refresh` (XFetch beta, e.g. 1.0) lets a
+    request rebuild shortly before expiry. The chance rises as expiry nears
+    and with how long the last rebuild took, so the entry rarely lapses under load.
+    """
+    def decorator(fn):
+        def rebuild(key, args, kwargs):
+            started = time.time()
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                finished = time.time()
+                headers = [(name, value) for name, value in response.headers
+                           if name not in ENTRY_SKIPPED_HEADERS]
+                entry = (response.get_data(), response.status_code, response.mimetype,
+                         finished + timeout, finished - started, headers)
+                cache.set(key, entry, timeout=timeout + stale_ttl)
+            return response
+
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            view_tags = tags(**kwargs) if callable(tags) else tags
+            versions = tag_versions(tuple(view_tags))
+            key = view_cache_key(versions)
+
+            # Without a shared cache backend there are no versions to validate against
+            validators = None
+            if versions and all(v is not None for v in versions.values()):
+                validators = (key[len(VIEW_PREFIX):], last_modified_from_versions(versions))
+                unchanged = not_modified(*validators)
+                if unchanged is not None:
+                    g.view_cache = "not_modified"
+                    return unchanged
+
+            entry = cache.get(key)
+            g.view_cache = "hit"
+            fresh = entry is not None and not _needs_refresh(entry, early_refresh)
+            lock = None if fresh else _acquire_lock(key, lock_timeout)
+            if fresh:
+                response = _entry_response(entry)
+            elif lock is not None:
+                g.view_cache = "miss"
+                try:
+                    response = rebuild(key, args, kwargs)
+                finally:
+                    _release_lock(key, lock)
+            elif entry is not None:
+                # Another request is rebuilding; the expired copy will do meanwhile
+                g.view_cache = "stale"
+                response = _entry_response(entry)
+            else:
+                entry = _wait_for_entry(key, wait)
+                if entry is None:
+                    g.view_cache = "miss"
+                response = _entry_response(entry) if entry else rebuild(key, args, kwargs)
+
+            if validators is not None and response.status_code == 200:
+                set_validators(response, *validators)
+            return response
+        return inner
+    return decorator
+
+
+def _acquire_lock(key, lock_timeout):
+    """The lock value (expiry, owner) if this request may rebuild `key`, else None."""
+    lock_key = LOCK_PREFIX + key
+    now = time.time()
+    lock = (now + lock_timeout, uuid.uuid4().hex)
+    if cache.add(lock_key, lock, timeout=lock_timeout):
+        return lock
+
+    held = cache.get(lock_key)
+    if held is not None and held[0] > now:
+        return None
+    # The holder died without releasing, or the backend reports the lock as both
+    # gone (get) and taken (add). Take it over; re-reading picks one winner among
+    # takers that race here, except on backends whose writes are not atomic.
+    cache.set(lock_key, lock, timeout=lock_timeout)
+    return lock if cache.get(lock_key) == lock else None
+
+
+def _release_lock(key, lock):
+    # A rebuild that outran lock_timeout may have been taken over; leave the new lock alone
+    if cache.get(LOCK_PREFIX + key) == lock:
+        cache.delete(LOCK_PREFIX + key)
+
+
+def _needs_refresh(entry, early_refresh):
+    expires_at, delta = entry[3], entry[4]
+    now = time.time()
+    if now >= expires_at:
+        return True
+    if early_refresh:
+        # XFetch: -log(U) is exponential, so early rebuilds are rare until expiry nears
+        return now - delta * early_refresh * math.log(1.0 - random.random()) >= expires_at
+    return False
+
+
+def _wait_for_entry(key, wait):
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and time.time() < entry[3]:
+            return entry
+    return None
+
+
+def _entry_response(entry):
+    body, status, mimetype, _, _, headers = entry
+    response = current_app.response_class(body, status=status, mimetype=mimetype)
+    response.headers.extend(headers)
+    return response
@@ -0,0 +1,59 @@
+# utils/conditional.py
+"""
+Conditional GET support (ETag / If-None-Match, Last-Modified / If-Modified-Since).
+
+Validators are derived from data the app already tracks (cache tag versions for
+lists, the ticket row version for ticket detail), so a matching request can be
+answered with 304 before the view queries or serializes anything.
+"""
+import datetime
+import hashlib
+import time
+
+from flask import current_app, request
+
+
+def make_etag(*parts):
+    """Strong entity tag hashed from everything the representation depends on."""
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def last_modified_from_versions(versions):
+    """
+    Newest tag version token (a time_ns() stamp) as an aware UTC datetime.
+
+    HTTP dates have one-second resolution, so a version from the current second
+    could be followed by another bump with the same Last-Modified; a client
+    revalidating with If-Modified-Since would then get a false 304. Return None
+    (send and honor no Last-Modified, leaving the ETag) until it is a second old.
+    """
+    newest = max(int(v) for v in versions.values())
+    if time.time_ns() - newest < 1_000_000_000:
+        return None
+    return datetime.datetime.fromtimestamp(newest // 1_000_000_000, tz=datetime.timezone.utc)
+
+
+def not_modified(etag, last_modified=None):
+    """
+    304 response when the client's validators match, else None.
+
+    If-None-Match wins over If-Modified-Since when both are sent (RFC 9110 13.2.2).
+    """
+    if request.if_none_match:
+        matched = request.if_none_match.contains(etag)
+    elif last_modified is not None and request.if_modified_since is not None:
+        matched = last_modified <= request.if_modified_since
+    else:
+        matched = False
+
+    if not matched:
+        return None
+    response = current_app.response_class(status=304)
+    return set_validators(response, etag, last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
@@ -1,8 +1,41 @@
 from functools import wraps
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
 from utils.auth import decode_token
 
 
+def bearer_token():
+    """The token from an "Authorization: Bearer <token>" header, or None."""
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return None
+    return auth_header.split(" ", 1)[1]
+
+
+def authenticate(*roles):
+    """
+    Verify the request's bearer token and, if `roles` are given, the caller's role.
+
+    Returns (payload, None) on success or (None, (error response, status)) on
+    failure. The decorators below use it, as do request hooks that need the
+    caller's identity outside a view (admin-only profiling in utils/profiling.py).
+    """
+    token = bearer_token()
+    if token is None:
+        return None, (jsonify({"error": "Missing or invalid token"}), 401)
+
+    payload = decode_token(token)
+    if isinstance(payload, dict) and "error" in payload:
+        return None, (jsonify(payload), 401)
+
+    if roles and payload.get("role") not in roles:
+        return None, (jsonify({"error": "Forbidden"}), 403)
+
+    # For the access log (utils/access_log.py)
+    g.user_id = payload.get("sub")
+    g.user_role = payload.get("role")
+    return payload, None
+
+
 def auth_required(*roles):
     """Decorator to enforce role-based access control for staff/admin users."""
     def wrapper(fn):
@@ -13,23 +46,11 @@ def auth_required(*roles):
             if current_app.config.get("TESTING"):
                 return fn(None, None, *args, **kwargs)
 
-            auth_header = request.headers.get("Authorization", "")
-            if not auth_header.startswith("Bearer "):
-                return jsonify({"error": "Missing or invalid token"}), 401
-
-            token = auth_header.split(" ", 1)[1]
-            payload = decode_token(token)
-
-            if isinstance(payload, dict) and "error" in payload:
-                return jsonify(payload), 401
-
-            user_id = payload.get("sub")
-            role = payload.get("role")
+            payload, error = authenticate(*roles)
+            if error:
+                return error
 
-            if roles and role not in roles:
-                return jsonify({"error": "Forbidden"}), 403
-
-            return fn(user_id, role, *args, **kwargs)
+            return fn(payload.get("sub"), payload.get("role"), *args, **kwargs)
         return inner
     return wrapper
 
@@ -42,17 +63,42 @@ def token_required(fn):
         # DO NOT bypass token auth in tests
         # Customers must provide a token even in TESTING mode
 
-        auth_header = request.headers.get("Authorization", "")
-        if not auth_header.startswith("Bearer "):
-            return jsonify({"error": "Missing or invalid token"}), 401
-
-        token = auth_header.split(" ", 1)[1]
-        payload = decode_token(token)
-
-        if isinstance(payload, dict) and "error" in payload:
-            return jsonify(payload), 401
+        payload, error = authenticate()
+        if error:
+            return error
 
         customer_id = payload.get("sub")
         return fn(customer_id, *args, **kwargs)
 
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in QUERY_BUDGET_STRICT mode when a route runs more SQL than declared."""
+
+
+def query_budget(max_queries):
+    """
+    Declare the most SQL statements a route may run per request.
+
+    Put it directly under @bp.route so the count covers the whole view. Uses the
+    per-request count kept by utils/metrics.py: an overrun is logged, or raised
+    as QueryBudgetExceeded when QUERY_BUDGET_STRICT is set (as in the tests).
+    The budget is also exposed as `view.query_budget` for the test helpers.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            response = fn(*args, **kwargs)
+
+            used = g.get("metrics_queries")
+            if used is not None and used > max_queries:
+                message = f"{request.method} {request.path} ran {used} queries (budget {max_queries})"
+                if current_app.config.get("QUERY_BUDGET_STRICT"):
+                    raise QueryBudgetExceeded(message)
+                current_app.logger.warning("query budget exceeded: %s", message)
+            return response
+
+        inner.query_budget = max_queries
+        return inner
+    return wrapper
@@ -0,0 +1,179 @@
+# utils/entity_cache.py
+"""
+Second-level cache for primary-key lookups.
+
+entity_cache.get(Model, pk) replaces db.session.get(Model, pk) on read paths.
+Column values of loaded rows are kept in a bounded, per-process LRU keyed by
+(model, primary key); a hit rebuilds a clean persistent instance in the current
+session without touching the database. Entries are evicted when a transaction
+that flushed changes to (or bulk-updated/deleted) the row ends, and expire after
+ENTITY_CACHE_TTL seconds to bound staleness from writes made by other workers.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from extensions import db
+
+_PENDING_KEYS = "entity_cache_pending_keys"
+_PENDING_MODELS = "entity_cache_pending_models"
+
+
+class _LRUStore:
+    """Thread-safe bounded LRU of {(model, pk): (expires_at, column values)}."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, values):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, values)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, keys=(), models=()):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+            if models:
+                for key in [k for k in self._data if k[0] in models]:
+                    del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class EntityCache:
+    """Flask extension exposing the per-app primary-key cache."""
+
+    def init_app(self, app):
+        app.config.setdefault("ENTITY_CACHE_ENABLED", True)
+        app.config.setdefault("ENTITY_CACHE_SIZE", 2048)
+        app.config.setdefault("ENTITY_CACHE_TTL", 30)
+        app.extensions["entity_cache"] = _LRUStore(
+            app.config["ENTITY_CACHE_SIZE"], app.config["ENTITY_CACHE_TTL"]
+        )
+
+    @property
+    def store(self):
+        if not has_app_context() or not current_app.config.get("ENTITY_CACHE_ENABLED"):
+            return None
+        return current_app.extensions.get("entity_cache")
+
+    def get(self, model, pk):
+        """Drop-in for db.session.get(model, pk) backed by the LRU."""
+        session = db.session
+        store = self.store
+        if store is None:
+            return session.get(model, pk)
+
+        key = (model, pk)
+        # Already in this request's session: the identity map is cheaper than us
+        if session.identity_key(model, pk) not in session.identity_map:
+            values = store.get(key)
+            if values is not None:
+                obj = model(**values)
+                make_transient_to_detached(obj)
+                session.add(obj)
+                return obj
+
+        obj = session.get(model, pk)
+        # Never publish state this transaction changed but has not committed
+        if obj is not None and not session.is_modified(obj) and not _touched(session, key):
+            store.put(key, _column_values(obj))
+        return obj
+
+    def stats(self):
+        store = self.store
+        return store.stats() if store is not None else {}
+
+    def clear(self):
+        store = self.store
+        if store is not None:
+            store.clear()
+
+
+entity_cache = EntityCache()
+
+
+def _column_values(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def _touched(session, key):
+    return (key in session.info.get(_PENDING_KEYS, ())
+            or key[0] in session.info.get(_PENDING_MODELS, ()))
+
+
+def _cache_key(obj):
+    state = inspect(obj)
+    if state.identity is None:
+        return None
+    pk = state.identity[0] if len(state.identity) == 1 else state.identity
+    return (type(obj), pk)
+
+
+# Session events: collect what a transaction touched, evict it once committed
+
+@event.listens_for(db.session, "after_flush")
+def _collect_flushed(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEYS, set())
+    for obj in list(session.dirty) + list(session.deleted):
+        key = _cache_key(obj)
+        if key is not None:
+            pending.add(key)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _collect_bulk(orm_execute_state):
+    # Bulk UPDATE/DELETE statements bypass the flush; evict the whole model
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            orm_execute_state.session.info.setdefault(_PENDING_MODELS, set()).add(mapper.class_)
+
+
+@event.listens_for(db.session, "after_commit")
+@event.listens_for(db.session, "after_rollback")
+def _evict_touched(session):
+    # Evicting on rollback too is cheap and never serves a stale row
+    keys = session.info.pop(_PENDING_KEYS, set())
+    models = session.info.pop(_PENDING_MODELS, set())
+    store = entity_cache.store
+    if store is not None and (keys or models):
+        store.discard(keys, models)
@@ -0,0 +1,73 @@
+# utils/includes.py
+"""
+?include= support for list/detail endpoints.
+
+Relationships are lazy by default; a route declares which dotted relationship
+paths it allows (e.g. "parts", "assignments.mechanic") and translates the ones
+the caller asked for into loader options and a matching schema.
+"""
+from functools import lru_cache
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+
+class IncludeError(ValueError):
+    """Raised when ?include= names a relationship the route does not allow."""
+
+
+def parse_include(args, allowed, default=()):
+    """Return the requested include paths as a frozenset (defaults when absent)."""
+    raw = args.get("include")
+    if raw is None:
+        return frozenset(default)
+
+    paths = {p.strip() for p in raw.split(",") if p.strip()}
+    unknown = paths - set(allowed)
+    if unknown:
+        raise IncludeError(
+            f"Unknown include(s): {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(allowed)}"
+        )
+    return frozenset(paths)
+
+
+def loader_options(model, paths):
+    """
+    Build loader options for the given include paths.
+
+    Collections use selectinload (one extra query per level); many-to-one
+    references use joinedload (folded into the parent query).
+    """
+    options = []
+    for path in sorted(paths):
+        option = None
+        mapper = inspect(model)
+        for name in path.split("."):
+            relationship = mapper.relationships[name]
+            attr = getattr(mapper.class_, name)
+            load = selectinload if relationship.uselist else joinedload
+            option = load(attr) if option is None else getattr(option, load.__name__)(attr)
+            mapper = relationship.mapper
+        options.append(option)
+    return options
+
+
+@lru_cache(maxsize=None)
+def schema_for(schema_cls, includes, relations, many=False):
+    """Schema instance that only dumps the relationship fields in `includes`."""
+    expanded = set()
+    for path in includes:
+        parts = path.split(".")
+        expanded.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+
+    exclude = []
+    for path in sorted(relations):
+        if path in expanded:
+            continue
+        # Excluding a parent already drops its children
+        if any(path.startswith(parent + ".") for parent in exclude):
+            continue
+        exclude.append(path)
+
+    return schema_cls(many=many, exclude=tuple(exclude))
@@ -0,0 +1,220 @@
+# utils/metrics.py
+"""
+Per-request timing and SQL instrumentation.
+
+RequestMetrics times every request and counts the SQL it runs through the
+engine's shared timing hook (utils/sql_timing.py). It reads the view
+cache outcome that cached_view leaves in g.view_cache. Each response gets a
+Server-Timing header:
+
+    Server-Timing: app;dur=12.41, db;dur=3.02;desc="4 queries", cache;desc="miss"
+
+Aggregates are exposed as Prometheus text on METRICS_PATH (default /metrics):
+a latency histogram and request/SQL/cache counters per route template, plus the
+entity and two-tier cache stats as gauges. Counters live in this process only;
+with several gunicorn workers each scrape sees one worker, so scrape them
+individually or sum across instances.
+
+The endpoint needs an admin token, with no TESTING bypass: route names, status
+counts and timings map out the API. Scrapers that cannot renew a JWT send
+METRICS_TOKEN as their bearer token instead; it is unset by default.
+
+    METRICS_ENABLED = True
+    METRICS_PATH = "/metrics"
+    METRICS_TOKEN = None
+    METRICS_BUCKETS = (0.005, 0.01, ..., 5.0)   # latency buckets in seconds
+"""
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from flask import current_app, g, has_request_context, request
+
+from extensions import cache, db
+from utils.decorators import authenticate, bearer_token
+from utils.entity_cache import entity_cache
+from utils.sql_timing import on_timed_statement
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Registry:
+    """Thread-safe per-process counters and latency histograms."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # (method, route) -> [per-bucket counts..., +Inf count], and the sum of seconds
+        self._histograms = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self._latency_sum = defaultdict(float)
+        self._requests = defaultdict(int)        # (method, route, status)
+        self._sql_queries = defaultdict(int)     # (method, route)
+        self._sql_seconds = defaultdict(float)   # (method, route)
+        self._view_cache = defaultdict(int)      # (route, result)
+
+    def observe(self, method, route, status, seconds, queries, sql_seconds, cache_result):
+        key = (method, route)
+        with self._lock:
+            self._histograms[key][bisect_left(self.buckets, seconds)] += 1
+            self._latency_sum[key] += seconds
+            self._requests[(method, route, status)] += 1
+            self._sql_queries[key] += queries
+            self._sql_seconds[key] += sql_seconds
+            if cache_result is not None:
+                self._view_cache[(route, cache_result)] += 1
+
+    def clear(self):
+        with self._lock:
+            for table in (self._histograms, self._latency_sum, self._requests,
+                          self._sql_queries, self._sql_seconds, self._view_cache):
+                table.clear()
+
+    def render(self):
+        with self._lock:
+            histograms = {key: list(counts) for key, counts in self._histograms.items()}
+            latency_sum = dict(self._latency_sum)
+            requests = dict(self._requests)
+            sql_queries = dict(self._sql_queries)
+            sql_seconds = dict(self._sql_seconds)
+            view_cache = dict(self._view_cache)
+
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), counts in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append("http_request_duration_seconds_bucket"
+                             f"{_labels(method=method, route=route, le=bound)} {cumulative}")
+            lines.append("http_request_duration_seconds_sum"
+                         f"{_labels(method=method, route=route)} {latency_sum[(method, route)]}")
+            lines.append("http_request_duration_seconds_count"
+                         f"{_labels(method=method, route=route)} {cumulative}")
+
+        lines += ["# HELP http_requests_total Requests by route and status.",
+                  "# TYPE http_requests_total counter"]
+        for (method, route, status), count in sorted(requests.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+        lines += ["# HELP sql_queries_total SQL statements executed by route.",
+                  "# TYPE sql_queries_total counter"]
+        for (method, route), count in sorted(sql_queries.items()):
+            lines.append(f"sql_queries_total{_labels(method=method, route=route)} {count}")
+
+        lines += ["# HELP sql_duration_seconds_total Time spent in SQL by route.",
+                  "# TYPE sql_duration_seconds_total counter"]
+        for (method, route), seconds in sorted(sql_seconds.items()):
+            lines.append(f"sql_duration_seconds_total{_labels(method=method, route=route)} {seconds}")
+
+        lines += ["# HELP view_cache_requests_total Cached view lookups by route and result.",
+                  "# TYPE view_cache_requests_total counter"]
+        for (route, result), count in sorted(view_cache.items()):
+            lines.append(f"view_cache_requests_total{_labels(route=route, result=result)} {count}")
+
+        lines += _cache_gauges()
+        return "\n".join(lines) + "\n"
+
+
+def _cache_gauges():
+    lines = []
+    sources = [("entity_cache", entity_cache.stats())]
+    backend_stats = getattr(cache.cache, "stats", None)
+    if callable(backend_stats):
+        sources.append(("view_cache_backend", backend_stats()))
+
+    for prefix, stats in sources:
+        for name, value in sorted(stats.items()):
+            if isinstance(value, (int, float)):
+                lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value}"]
+    return lines
+
+
+def _count_statement(conn, statement, parameters, context, executemany, elapsed):
+    if has_request_context() and "metrics_started" in g:
+        g.metrics_queries += 1
+        g.metrics_sql_seconds += elapsed
+
+
+def _is_scraper():
+    expected = current_app.config["METRICS_TOKEN"]
+    token = bearer_token()
+    return bool(expected and token) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+class RequestMetrics:
+    """Flask extension recording per-request latency, SQL and cache metrics."""
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("METRICS_PATH", "/metrics")
+        app.config.setdefault("METRICS_BUCKETS", DEFAULT_BUCKETS)
+        app.config.setdefault("METRICS_TOKEN", None)
+        if not app.config["METRICS_ENABLED"]:
+            return
+
+        app.extensions["request_metrics"] = _Registry(app.config["METRICS_BUCKETS"])
+        with app.app_context():
+            on_timed_statement(db.engine, _count_statement)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule(app.config["METRICS_PATH"], "metrics", self.export)
+
+    @property
+    def registry(self):
+        return current_app.extensions.get("request_metrics")
+
+    def _start(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_sql_seconds = 0.0
+        g.pop("view_cache", None)
+
+    def _finish(self, response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        queries = g.pop("metrics_queries", 0)
+        sql_seconds = g.pop("metrics_sql_seconds", 0.0)
+        cache_result = g.pop("view_cache", None)
+
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        self.registry.observe(request.method, route, response.status_code,
+                              elapsed, queries, sql_seconds, cache_result)
+
+        timings = [f"app;dur={elapsed * 1000:.2f}",
+                   f'db;dur={sql_seconds * 1000:.2f};desc="{queries} queries"']
+        if cache_result is not None:
+            timings.append(f'cache;desc="{cache_result}"')
+        response.headers["Server-Timing"] = ", ".join(timings)
+        return response
+
+    def export(self):
+        if not _is_scraper():
+            _, error = authenticate("admin")
+            if error:
+                return error
+        return current_app.response_class(self.registry.render(), mimetype=None,
+                                          content_type=CONTENT_TYPE)
+
+    def clear(self):
+        registry = self.registry
+        if registry is not None:
+            registry.clear()
+
+
+request_metrics = RequestMetrics()
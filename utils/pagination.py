@@ -0,0 +1,137 @@
+# utils/pagination.py
+"""
+Pagination helpers shared by the list endpoints.
+
+Two modes are supported:
+- keyset (cursor) pagination: ?after=<cursor>&limit=<n>, pushed down to SQL as
+  ORDER BY <keys> + WHERE <keys> > :cursor + LIMIT :n
+- classic page pagination: ?page=<n>&per_page=<n>, pushed down as OFFSET/LIMIT
+
+List endpoints called with neither return their first MAX_LIMIT rows as a
+plain list. When rows were left out, set_next_page_headers() adds
+X-Next-Cursor and a Link rel="next" to the keyset page that follows.
+"""
+import base64
+import datetime
+import json
+from urllib.parse import urlencode
+
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 100
+
+
+class PaginationError(ValueError):
+    """Raised when pagination query parameters cannot be parsed."""
+
+
+def encode_cursor(values):
+    """Encode the sort-key values of the last row into an opaque cursor string."""
+    payload = [v.isoformat() if isinstance(v, datetime.date) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    """Decode a cursor back into typed values matching the given sort columns."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise PaginationError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise PaginationError("Invalid cursor")
+
+    decoded = []
+    for column, value in zip(columns, values):
+        try:
+            python_type = column.type.python_type
+            if python_type is datetime.date:
+                value = datetime.date.fromisoformat(value)
+            elif python_type is int:
+                value = int(value)
+        except (ValueError, TypeError):
+            raise PaginationError("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+
+def parse_int_arg(args, name, default, minimum=1, maximum=None):
+    """Read a positive integer query parameter, clamped to an optional maximum."""
+    raw = args.get(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise PaginationError(f"'{name}' must be an integer")
+    if value < minimum:
+        raise PaginationError(f"'{name}' must be >= {minimum}")
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+
+def is_cursor_request(args):
+    """True when the client asked for keyset pagination."""
+    return "after" in args or "limit" in args
+
+
+def keyset_page(session, query, columns, after=None, limit=DEFAULT_LIMIT, descending=False,
+                scalars=True):
+    """
+    Run `query` as one keyset page ordered by `columns` (last column must be unique).
+
+    Returns (rows, next_cursor); next_cursor is None on the last page. With
+    scalars=False the rows are Core Row tuples (for column-only selects).
+    """
+    if after:
+        values = decode_cursor(after, columns)
+        query = query.where(_after_clause(columns, values, descending))
+
+    order_by = [c.desc() if descending else c.asc() for c in columns]
+    query = query.order_by(*order_by).limit(limit + 1)
+
+    result = session.execute(query)
+    rows = (result.scalars() if scalars else result).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
+
+
+def set_next_page_headers(response, next_cursor, limit=MAX_LIMIT):
+    """Point a capped plain-list response at the keyset page after its last row."""
+    if next_cursor is None:
+        return response
+    args = request.args.copy()
+    args["after"] = next_cursor
+    args["limit"] = str(limit)
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{request.path}?{urlencode(list(args.items(multi=True)))}>; rel="next"'
+    return response
+
+
+def offset_page(session, query, order_column, page, per_page, scalars=True):
+    """Run `query` as one OFFSET/LIMIT page ordered by `order_column`."""
+    query = query.order_by(order_column).offset((page - 1) * per_page).limit(per_page)
+    result = session.execute(query)
+    return (result.scalars() if scalars else result).all()
+
+
+def _after_clause(columns, values, descending):
+    # Expands (a, b, c) > (x, y, z) into portable OR/AND form, since row-value
+    # comparisons are not supported by every backend we deploy on.
+    compare = (lambda c, v: c < v) if descending else (lambda c, v: c > v)
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, compare(column, value)))
+    return or_(*clauses)
@@ -0,0 +1,118 @@
+# utils/passwords.py
+"""
+Password hashing off the request thread.
+
+scrypt/pbkdf2 are deliberately CPU-heavy; run inline, a burst of logins pins
+every worker. Hashes are computed in a small per-process pool instead, with a
+cap on how many may be queued at once:
+
+    PASSWORD_HASH_METHOD = "scrypt:32768:8:1"   # any werkzeug method string
+    PASSWORD_HASH_WORKERS = 2                   # pool processes; 0 = inline
+    PASSWORD_HASH_CONCURRENCY = 4               # hashes in flight per process
+    PASSWORD_HASH_WAIT = 5                      # seconds to wait for a slot
+
+When every slot stays busy for PASSWORD_HASH_WAIT seconds, PasswordHasherBusy
+is raised and the caller should answer 503. needs_rehash() tells login whether
+a stored hash predates the configured method so it can be upgraded in place.
+"""
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app, has_app_context
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash,
+)
+
+DEFAULT_METHOD = "scrypt"
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when no hashing slot frees up within PASSWORD_HASH_WAIT seconds."""
+
+
+def normalize_method(method):
+    """Expand a werkzeug method string to the prefix stored in its hashes."""
+    name, *args = method.split(":")
+    if name == "scrypt":
+        n, r, p = args if args else (2**15, 8, 1)
+        return f"scrypt:{int(n)}:{int(r)}:{int(p)}"
+    if name == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Unsupported password hash method '{method}'")
+
+
+class _HashingPool:
+    def __init__(self, method, workers, concurrency, wait):
+        self.method = method
+        self.prefix = normalize_method(method)
+        self.workers = workers
+        self.wait = wait
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: forking a threaded server can copy held locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                atexit.register(self._executor.shutdown, wait=False, cancel_futures=True)
+            return self._executor
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait):
+            raise PasswordHasherBusy("Password hashing is saturated; retry shortly")
+        try:
+            if not self.workers:
+                return fn(*args)
+            return self._pool().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+
+class PasswordHasher:
+    """Flask extension holding the per-app hashing pool."""
+
+    def init_app(self, app):
+        app.config.setdefault("PASSWORD_HASH_METHOD", DEFAULT_METHOD)
+        app.config.setdefault("PASSWORD_HASH_WORKERS", 2)
+        app.config.setdefault("PASSWORD_HASH_CONCURRENCY", 2 * max(app.config["PASSWORD_HASH_WORKERS"], 1))
+        app.config.setdefault("PASSWORD_HASH_WAIT", 5)
+        app.extensions["password_hasher"] = _HashingPool(
+            app.config["PASSWORD_HASH_METHOD"],
+            app.config["PASSWORD_HASH_WORKERS"],
+            app.config["PASSWORD_HASH_CONCURRENCY"],
+            app.config["PASSWORD_HASH_WAIT"],
+        )
+
+    @property
+    def pool(self):
+        if has_app_context():
+            return current_app.extensions.get("password_hasher")
+        return None
+
+    def hash(self, password):
+        pool = self.pool
+        if pool is None:
+            return generate_password_hash(password, method=DEFAULT_METHOD)
+        return pool.run(generate_password_hash, password, pool.method)
+
+    def verify(self, pwhash, password):
+        pool = self.pool
+        if pool is None:
+            return check_password_hash(pwhash, password)
+        return pool.run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        pool = self.pool
+        prefix = pool.prefix if pool is not None else normalize_method(DEFAULT_METHOD)
+        return pwhash.split("$", 1)[0] != prefix
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,241 @@
+# utils/profiling.py
+"""
+On-demand profiling for admins.
+
+Per request: an admin sends "X-Profile: 1" (or ?_profile=1) and the request
+runs under cProfile. The .prof file is stored in PROFILE_DIR and its id is
+returned in the X-Profile-Id header. GET /admin/profiles/<id> serves the
+report: the top PROFILE_TOP functions by cumulative time as text, or
+?format=raw for the .prof file itself (snakeviz, pstats). Only the newest
+PROFILE_KEEP reports are kept. The flag is silently ignored for anyone
+without an admin token.
+
+Continuous: with PROFILE_SAMPLER_ENABLED, a daemon thread samples the stacks
+of threads that are serving a request every PROFILE_SAMPLER_INTERVAL seconds.
+It aggregates them per worker. GET /admin/flame returns them in folded-stack
+format ("a;b;c 42" per line), which flamegraph.pl and speedscope read.
+?reset=1 starts a fresh aggregation. Sampling walks frames from outside the
+request threads, so requests themselves pay only a set insert and removal.
+
+    PROFILE_ENABLED = True
+    PROFILE_DIR = "<tmp>/mechanicshop-profiles"
+    PROFILE_KEEP = 20
+    PROFILE_TOP = 50
+    PROFILE_SAMPLER_ENABLED = False
+    PROFILE_SAMPLER_INTERVAL = 0.05
+    PROFILE_SAMPLER_MAX_STACKS = 5000
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import wraps
+
+from flask import current_app, g, jsonify, request, send_file
+
+from utils.decorators import authenticate
+
+PROFILE_ID = re.compile(r"[0-9a-f]{8,32}")
+
+
+def _admin_only(view):
+    """Like auth_required("admin") without its TESTING bypass: reports expose code and timings."""
+    @wraps(view)
+    def inner(*args, **kwargs):
+        payload, error = authenticate("admin")
+        if error:
+            return error
+        return view(payload.get("sub"), payload.get("role"), *args, **kwargs)
+    return inner
+
+
+def _profile_requested():
+    return request.headers.get("X-Profile") == "1" or request.args.get("_profile") == "1"
+
+
+class StackSampler:
+    """Daemon thread aggregating the stacks of request-serving threads."""
+
+    def __init__(self, interval, max_stacks):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.stacks = Counter()
+        self.samples = 0
+        self.dropped = 0
+        self._active = set()   # thread idents currently inside a request
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def ensure_running(self):
+        # Threads do not survive fork; (re)start lazily in each worker process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+
+    def enter(self):
+        self._active.add(threading.get_ident())
+
+    def exit(self):
+        self._active.discard(threading.get_ident())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+
+    def sample(self):
+        active = list(self._active)
+        if not active:
+            return
+        # Holding frames keeps their locals (open cursors included) alive; drop them promptly
+        frames = sys._current_frames()
+        folded = [self._fold(frames[ident]) for ident in active if ident in frames]
+        del frames
+        with self._lock:
+            for stack in folded:
+                self.samples += 1
+                if stack in self.stacks or len(self.stacks) < self.max_stacks:
+                    self.stacks[stack] += 1
+                else:
+                    self.dropped += 1
+
+    @staticmethod
+    def _fold(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def folded(self):
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+            self.dropped = 0
+
+
+class Profiler:
+    """Flask extension for admin-triggered cProfile runs and the stack sampler."""
+
+    def init_app(self, app):
+        app.config.setdefault("PROFILE_ENABLED", True)
+        app.config.setdefault("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "mechanicshop-profiles"))
+        app.config.setdefault("PROFILE_KEEP", 20)
+        app.config.setdefault("PROFILE_TOP", 50)
+        app.config.setdefault("PROFILE_SAMPLER_ENABLED", False)
+        app.config.setdefault("PROFILE_SAMPLER_INTERVAL", 0.05)
+        app.config.setdefault("PROFILE_SAMPLER_MAX_STACKS", 5000)
+
+        if app.config["PROFILE_ENABLED"]:
+            app.before_request(self._start_profile)
+            app.after_request(self._finish_profile)
+            app.add_url_rule("/admin/profiles/<profile_id>", "profile_report",
+                             _admin_only(self.report))
+
+        if app.config["PROFILE_SAMPLER_ENABLED"]:
+            app.extensions["stack_sampler"] = StackSampler(
+                app.config["PROFILE_SAMPLER_INTERVAL"], app.config["PROFILE_SAMPLER_MAX_STACKS"]
+            )
+            app.before_request(self._enter_sampler)
+            app.teardown_request(self._exit_sampler)
+            app.add_url_rule("/admin/flame", "flame", _admin_only(self.flame))
+
+    # Per-request cProfile
+
+    def _start_profile(self):
+        if not _profile_requested():
+            return
+        # Same check as the admin endpoints, minus the error response
+        payload, error = authenticate("admin")
+        if error:
+            return
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+    def _finish_profile(self, response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+
+        directory = current_app.config["PROFILE_DIR"]
+        os.makedirs(directory, exist_ok=True)
+        profile_id = uuid.uuid4().hex[:16]
+        profiler.dump_stats(os.path.join(directory, f"{profile_id}.prof"))
+        self._prune(directory, current_app.config["PROFILE_KEEP"])
+
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    @staticmethod
+    def _prune(directory, keep):
+        reports = sorted(
+            (entry for entry in os.scandir(directory) if entry.name.endswith(".prof")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in reports[:-keep] if keep else reports:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def report(self, user_id, role, profile_id):
+        """GET /admin/profiles/<id> - Stored cProfile report (text, or ?format=raw)."""
+        path = os.path.join(current_app.config["PROFILE_DIR"], f"{profile_id}.prof")
+        if not PROFILE_ID.fullmatch(profile_id) or not os.path.exists(path):
+            return jsonify({"error": "Profile not found"}), 404
+
+        if request.args.get("format") == "raw":
+            return send_file(path, mimetype="application/octet-stream",
+                             as_attachment=True, download_name=f"{profile_id}.prof")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(path, stream=stream)
+        stats.sort_stats("cumulative").print_stats(current_app.config["PROFILE_TOP"])
+        return current_app.response_class(stream.getvalue(), mimetype="text/plain")
+
+    # Continuous sampling
+
+    @property
+    def sampler(self):
+        return current_app.extensions.get("stack_sampler")
+
+    def _enter_sampler(self):
+        sampler = self.sampler
+        sampler.ensure_running()
+        sampler.enter()
+
+    def _exit_sampler(self, exc):
+        self.sampler.exit()
+
+    def flame(self, user_id, role):
+        """GET /admin/flame - Folded stacks sampled across this worker's requests."""
+        sampler = self.sampler
+        body = sampler.folded()
+        response = current_app.response_class(body, mimetype="text/plain")
+        response.headers["X-Samples"] = str(sampler.samples)
+        response.headers["X-Dropped-Samples"] = str(sampler.dropped)
+        if request.args.get("reset") == "1":
+            sampler.reset()
+        return response
+
+
+profiler = Profiler()
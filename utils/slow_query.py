@@ -0,0 +1,191 @@
+# utils/slow_query.py
+"""
+Slow-query log for the extensions.db engine.
+
+Statements that take longer than SLOW_QUERY_THRESHOLD_MS are logged as a
+warning on the "<app>.slow_query" logger. Each line carries the SQL, the
+bound parameters, the route and blueprint that issued it and, for SELECTs,
+the query plan (EXPLAIN QUERY PLAN on SQLite, EXPLAIN elsewhere). Writes are
+never re-run to explain them. The EXPLAIN runs inside a savepoint on the same
+connection, so a failing one cannot abort the request's transaction.
+
+Parameters are redacted. Numbers, booleans, dates and NULLs are kept because
+they are usually ids, flags and ranges. Strings and bytes show only their
+type and length, since they may hold emails, names or password hashes.
+
+Logging is rate-limited per SLOW_QUERY_LOG_WINDOW seconds: at most
+SLOW_QUERY_LOG_LIMIT lines per statement and SLOW_QUERY_LOG_TOTAL_LIMIT lines
+overall. When a window closes, one summary line reports how many occurrences
+it suppressed and across how many statements; the counts then start over.
+
+    SLOW_QUERY_ENABLED = True
+    SLOW_QUERY_THRESHOLD_MS = 250
+    SLOW_QUERY_EXPLAIN = True
+    SLOW_QUERY_LOG_LIMIT = 5
+    SLOW_QUERY_LOG_WINDOW = 60
+    SLOW_QUERY_LOG_TOTAL_LIMIT = 50
+"""
+import datetime
+import decimal
+import logging
+import threading
+import time
+
+from flask import has_request_context, request
+from extensions import db
+from utils.sql_timing import on_timed_statement
+
+
+def redact(value):
+    if value is None or isinstance(value, (bool, int, float, decimal.Decimal,
+                                           datetime.date, datetime.time)):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters, context=None, executemany=False):
+    """Redacted copy of DBAPI parameters, named where the compiled statement allows."""
+    if executemany:
+        rows = list(parameters)
+        first = redact_parameters(rows[0], context) if rows else None
+        return {"rows": len(rows), "first": first}
+    if isinstance(parameters, dict):
+        return {name: redact(value) for name, value in parameters.items()}
+
+    names = getattr(getattr(context, "compiled", None), "positiontup", None)
+    values = [redact(value) for value in parameters or ()]
+    if names and len(names) == len(values):
+        return dict(zip(names, values))
+    return values
+
+
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+
+def explain_prefix(dialect_name):
+    return "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+
+
+class _SlowQueryRecorder:
+    def __init__(self, logger, threshold_ms, explain, limit, window, total_limit):
+        self.logger = logger
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.limit = limit
+        self.window = window
+        self.total_limit = total_limit
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._logged = {}       # statement -> lines logged this window
+        self._logged_total = 0
+        self._suppressed = {}   # statement -> occurrences dropped this window
+
+    def record(self, conn, statement, parameters, context, executemany, elapsed):
+        if elapsed < self.threshold:
+            return
+
+        if not self._admit(statement):
+            return
+
+        record = {
+            "duration_ms": round(elapsed * 1000, 2),
+            "statement": statement,
+            "parameters": redact_parameters(parameters, context, executemany),
+            "route": None,
+            "blueprint": None,
+            "method": None,
+            "plan": None,
+        }
+        if has_request_context():
+            record["route"] = request.url_rule.rule if request.url_rule is not None else request.path
+            record["blueprint"] = request.blueprint
+            record["method"] = request.method
+        if self.explain and not executemany and statement.lstrip()[:6].upper() == "SELECT":
+            record["plan"] = self._explain(conn, statement, parameters)
+
+        self.logger.warning(
+            "slow query %.1f ms on %s %s (blueprint %s)\n%s\nparameters: %s%s",
+            record["duration_ms"], record["method"] or "-", record["route"] or "-",
+            record["blueprint"] or "-", statement, record["parameters"],
+            "\nplan:\n" + "\n".join(record["plan"]) if record["plan"] else "",
+            extra={"slow_query": record},
+        )
+
+    def _admit(self, statement):
+        """True if this occurrence may be logged, False if it is rate-limited."""
+        with self._lock:
+            now = time.monotonic()
+            closed = None
+            if now - self._window_start >= self.window:
+                if self._suppressed:
+                    closed = (sum(self._suppressed.values()), len(self._suppressed))
+                self._window_start = now
+                self._logged.clear()
+                self._logged_total = 0
+                self._suppressed.clear()
+
+            admitted = (self._logged.get(statement, 0) < self.limit
+                        and self._logged_total < self.total_limit)
+            if admitted:
+                self._logged[statement] = self._logged.get(statement, 0) + 1
+                self._logged_total += 1
+            else:
+                self._suppressed[statement] = self._suppressed.get(statement, 0) + 1
+
+        if closed:
+            self.logger.warning(
+                "slow query log suppressed %d occurrences of %d statements in the last window",
+                *closed, extra={"slow_query_suppressed": {"occurrences": closed[0], "statements": closed[1]}},
+            )
+        return admitted
+
+    def _explain(self, conn, statement, parameters):
+        # Raw DBAPI cursor: bypasses engine events, so the EXPLAIN is not itself timed.
+        # It runs inside the request's transaction, and on PostgreSQL a failed statement
+        # aborts that transaction, so wrap it in a savepoint and roll back to it on error.
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            try:
+                cursor.execute(explain_prefix(conn.dialect.name) + statement, parameters)
+                plan = [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+            except Exception as exc:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+                plan = [f"EXPLAIN failed: {exc}"]
+            cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            return plan
+        except Exception as exc:
+            return [f"EXPLAIN skipped: {exc}"]
+        finally:
+            cursor.close()
+
+
+class SlowQueryLog:
+    """Flask extension logging slow statements on the app's engine."""
+
+    def init_app(self, app):
+        app.config.setdefault("SLOW_QUERY_ENABLED", True)
+        app.config.setdefault("SLOW_QUERY_THRESHOLD_MS", 250)
+        app.config.setdefault("SLOW_QUERY_EXPLAIN", True)
+        app.config.setdefault("SLOW_QUERY_LOG_LIMIT", 5)
+        app.config.setdefault("SLOW_QUERY_LOG_WINDOW", 60)
+        app.config.setdefault("SLOW_QUERY_LOG_TOTAL_LIMIT", 50)
+        if not app.config["SLOW_QUERY_ENABLED"]:
+            return
+
+        recorder = _SlowQueryRecorder(
+            logging.getLogger(f"{app.name}.slow_query"),
+            app.config["SLOW_QUERY_THRESHOLD_MS"],
+            app.config["SLOW_QUERY_EXPLAIN"],
+            app.config["SLOW_QUERY_LOG_LIMIT"],
+            app.config["SLOW_QUERY_LOG_WINDOW"],
+            app.config["SLOW_QUERY_LOG_TOTAL_LIMIT"],
+        )
+        app.extensions["slow_query_log"] = recorder
+        with app.app_context():
+            on_timed_statement(db.engine, recorder.record)
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,44 @@
+# utils/sql_timing.py
+"""
+One timing hook per engine, shared by the SQL instrumentation.
+
+on_timed_statement(engine, callback) calls
+callback(conn, statement, parameters, context, executemany, elapsed) after
+every statement that completes, with `elapsed` in seconds. Per-request metrics
+(utils/metrics.py) and the slow-query log (utils/slow_query.py) both use it, so
+each statement is timed once.
+
+The start time is kept on the statement's execution context, which is
+discarded with the statement. A statement that raises never reaches
+after_cursor_execute, and its start time goes away with the context.
+"""
+import time
+import weakref
+
+from sqlalchemy import event
+
+_callbacks = weakref.WeakKeyDictionary()   # engine -> [callback, ...]
+
+
+def on_timed_statement(engine, callback):
+    callbacks = _callbacks.get(engine)
+    if callbacks is None:
+        callbacks = _callbacks[engine] = []
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    callbacks.append(callback)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._sql_timing_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_sql_timing_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    del context._sql_timing_start
+    for callback in _callbacks.get(conn.engine, ()):
+        callback(conn, statement, parameters, context, executemany, elapsed)
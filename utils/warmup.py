@@ -0,0 +1,78 @@
+# utils/warmup.py
+"""
+Worker warm-up for servers, not for every create_app.
+
+create_app also runs for `flask db upgrade`, other CLI commands and the test
+suite, so it never warms up by itself. Instead:
+
+- gunicorn.conf.py calls warm_up_worker(app) from post_worker_init, after each
+  worker has loaded the app, when CACHE_WARMUP is set;
+- `flask warm-up` runs it on demand, e.g. to fill a shared cache after deploy.
+
+The warm-up configures SQLAlchemy mappers and resolves marshmallow schemas up
+front. It then requests each URL in CACHE_WARMUP_URLS through the test
+client. That fills the view cache under the same keys real requests use and
+pulls the hot pages into the DB cache. Failures are logged, never raised: a
+cold cache must not stop a worker booting.
+"""
+import time
+
+import click
+
+from flask_marshmallow.sqla import SQLAlchemyAutoSchema
+from marshmallow import fields
+from sqlalchemy.orm import configure_mappers
+
+DEFAULT_WARMUP_URLS = ("/tickets", "/mechanics", "/vehicles", "/assignments")
+
+
+def _schema_classes(base=SQLAlchemyAutoSchema):
+    for cls in base.__subclasses__():
+        yield cls
+        yield from _schema_classes(cls)
+
+
+def prepare_schemas():
+    """Instantiate every auto schema and resolve its nested schemas (string references included)."""
+    for cls in _schema_classes():
+        for field in cls().fields.values():
+            if isinstance(field, fields.Nested):
+                field.schema
+
+
+def warm_up(app):
+    logger = app.logger
+    started = time.perf_counter()
+
+    with app.app_context():
+        configure_mappers()
+        prepare_schemas()
+    logger.info("warm-up: mappers and schemas configured in %.1f ms",
+                (time.perf_counter() - started) * 1000)
+
+    client = app.test_client()
+    for url in app.config.get("CACHE_WARMUP_URLS", DEFAULT_WARMUP_URLS):
+        url_started = time.perf_counter()
+        try:
+            status = client.get(url).status_code
+        except Exception:
+            logger.warning("warm-up: %s failed", url, exc_info=True)
+            continue
+        logger.info("warm-up: %s -> %s in %.1f ms", url, status,
+                    (time.perf_counter() - url_started) * 1000)
+
+    logger.info("warm-up: finished in %.1f ms", (time.perf_counter() - started) * 1000)
+
+
+def warm_up_worker(app):
+    """Server start hook: warm up when CACHE_WARMUP is set."""
+    if app.config.get("CACHE_WARMUP"):
+        warm_up(app)
+
+
+def register_warmup_command(app):
+    @app.cli.command("warm-up")
+    def warm_up_command():
+        """Prime mappers, schemas and the view cache for CACHE_WARMUP_URLS."""
+        warm_up(app)
+        click.echo("warm-up finished")